@@ -0,0 +1,135 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, List, Literal, Optional
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.models.show import Show
+from app.schemas.booking import BookingCreate, BookingResponse, GroupBookingRequest
+from app.schemas.seat import SeatLayoutResponse
+from app.schemas.show import ShowResponse
+from app.api import bookings, seats
+from app.utils.booking_utils import execute_booking_async, seat_map_backoff_async
+from app.utils.idempotency import IdempotencyClaim, IdempotencyKeyInProgress
+
+# Async versions of the hottest routes, served on the async engine.
+# Checks, pricing and layouts are shared with the sync routes through AsyncSession.run_sync,
+# which runs the same code with its database I/O awaited on the event loop. Booking writes
+# use the async variants of execute_booking and execute_write, so seat-map retry backoff
+# and waits on the booking executor are awaited instead of blocking the loop.
+router = APIRouter(prefix="/aio", tags=["async"])
+
+async def idempotent(
+    db: AsyncSession,
+    scope: str,
+    idempotency_key: Optional[str],
+    payload: Any,
+    response: Response,
+    handler: Callable[[Optional[IdempotencyClaim]], Awaitable[Any]]
+):
+    """bookings.idempotent for async handlers."""
+    if idempotency_key is None:
+        return await handler(None)
+    
+    claim, replayed = await db.run_sync(
+        lambda session: bookings.begin_idempotent(session, scope, idempotency_key, payload, response)
+    )
+    if claim is None:
+        return replayed
+    with bookings.settle_claim(claim):
+        return await handler(claim)
+
+async def place_booking(booking: BookingCreate, user_id: int, db: AsyncSession, claim: Optional[IdempotencyClaim] = None):
+    write = await db.run_sync(lambda session: bookings.prepare_booking(booking, user_id, session, claim))
+    with bookings.booking_errors():
+        return await execute_booking_async(db, booking.show_id, write)
+
+async def place_group_booking(group_booking: GroupBookingRequest, db: AsyncSession, claim: Optional[IdempotencyClaim] = None):
+    try:
+        write = await db.run_sync(lambda session: bookings.prepare_group_booking(group_booking, session, claim))
+        with bookings.booking_errors():
+            return await execute_booking_async(db, group_booking.show_id, write)
+    except (HTTPException, IdempotencyKeyInProgress):
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.post("/bookings/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
+async def create_booking(
+    booking: BookingCreate,
+    user_id: int,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a single booking."""
+    return await idempotent(
+        db,
+        "POST /bookings/",
+        idempotency_key,
+        {"user_id": user_id, **booking.model_dump()},
+        response,
+        lambda claim: place_booking(booking, user_id, db, claim)
+    )
+
+@router.post("/bookings/group", response_model=List[BookingResponse], status_code=status.HTTP_201_CREATED)
+async def create_group_booking(
+    group_booking: GroupBookingRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a group booking for multiple seats together."""
+    return await idempotent(
+        db,
+        "POST /bookings/group",
+        idempotency_key,
+        group_booking.model_dump(),
+        response,
+        lambda claim: place_group_booking(group_booking, db, claim)
+    )
+
+@router.post("/bookings/group/consecutive", response_model=List[BookingResponse], status_code=status.HTTP_201_CREATED)
+async def create_consecutive_group_booking(
+    show_id: int,
+    num_seats: int,
+    user_id: int,
+    mode: Literal["first", "best"] = "first",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Find and book consecutive seats for a group."""
+    for attempt in range(settings.SEAT_MAP_MAX_RETRIES + 1):
+        try:
+            group_booking = await db.run_sync(
+                lambda session: bookings.pick_consecutive_seats(show_id, num_seats, user_id, mode, session)
+            )
+            with bookings.picked_block_taken():
+                return await place_group_booking(group_booking, db)
+        except HTTPException as e:
+            if e.status_code != status.HTTP_409_CONFLICT or attempt == settings.SEAT_MAP_MAX_RETRIES:
+                raise
+        await seat_map_backoff_async(attempt + 1)
+
+@router.get("/seats/layout/{hall_id}", response_model=SeatLayoutResponse)
+async def get_hall_layout(hall_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get the complete layout of a hall with seat information."""
+    return await db.run_sync(lambda session: seats.get_hall_layout(hall_id, session))
+
+@router.get("/shows/", response_model=List[ShowResponse])
+async def get_shows(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    """Get all shows with pagination."""
+    result = await db.execute(select(Show).offset(skip).limit(limit))
+    return result.scalars().all()
+
+@router.get("/shows/movie/{movie_id}", response_model=List[ShowResponse])
+async def get_shows_by_movie(movie_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get all shows for a specific movie."""
+    result = await db.execute(select(Show).filter(Show.movie_id == movie_id))
+    return result.scalars().all()
+
+@router.get("/shows/hall/{hall_id}", response_model=List[ShowResponse])
+async def get_shows_by_hall(hall_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get all shows for a specific hall."""
+    result = await db.execute(select(Show).filter(Show.hall_id == hall_id))
+    return result.scalars().all()
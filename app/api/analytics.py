@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, desc, extract
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, date, timedelta
 from app.core.database import get_db
 from app.models.booking import Booking
@@ -20,6 +20,17 @@ from app.schemas.analytics import (
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+def revenue_per_show(db: Session, show_ids: List[int]) -> Dict[int, float]:
+    """Confirmed booking revenue for each show, in one grouped query."""
+    return dict(
+        db.query(Booking.show_id, func.sum(Booking.amount_paid)).filter(
+            and_(
+                Booking.show_id.in_(show_ids),
+                Booking.status == "confirmed"
+            )
+        ).group_by(Booking.show_id).all()
+    )
+
 @router.get("/movie/{movie_id}", response_model=MovieAnalyticsResponse)
 def get_movie_analytics(
     movie_id: int,
@@ -77,53 +88,35 @@ def get_movie_analytics(
         )
     ).first()
     
-    # Calculate total seats available
+    # Revenue per show in one grouped query; seat counts come from the show counters
+    revenue_by_show = revenue_per_show(db, show_ids)
+    
     total_seats_available = 0
+    total_seats_booked = 0
     shows_data = []
     
     for show in shows:
-        # Get hall for this show
-        hall = db.query(Hall).filter(Hall.id == show.hall_id).first()
-        if hall:
-            # Get total seats in this hall
-            total_seats = db.query(func.count(Booking.id)).filter(
-                Booking.show_id == show.id
-            ).scalar() or 0
-            
-            # Get booked seats for this show
-            booked_seats = db.query(func.count(Booking.id)).filter(
-                and_(
-                    Booking.show_id == show.id,
-                    Booking.status == "confirmed"
-                )
-            ).scalar() or 0
-            
-            # Get revenue for this show
-            show_revenue = db.query(func.sum(Booking.amount_paid)).filter(
-                and_(
-                    Booking.show_id == show.id,
-                    Booking.status == "confirmed"
-                )
-            ).scalar() or 0.0
-            
-            # Calculate occupancy
-            occupancy = (booked_seats / total_seats * 100) if total_seats > 0 else 0
-            
-            shows_data.append({
-                "show_id": show.id,
-                "show_date": show.show_date,
-                "start_time": show.start_time,
-                "total_seats": total_seats,
-                "booked_seats": booked_seats,
-                "revenue": float(show_revenue),
-                "occupancy_percentage": round(occupancy, 2)
-            })
-            
-            total_seats_available += total_seats
+        total_seats = show.hall_capacity
+        booked_seats = show.seats_sold
+        
+        # Calculate occupancy
+        occupancy = (booked_seats / total_seats * 100) if total_seats > 0 else 0
+        
+        shows_data.append({
+            "show_id": show.id,
+            "show_date": show.show_date,
+            "start_time": str(show.start_time),
+            "total_seats": total_seats,
+            "booked_seats": booked_seats,
+            "revenue": float(revenue_by_show.get(show.id, 0.0)),
+            "occupancy_percentage": round(occupancy, 2)
+        })
+        
+        total_seats_available += total_seats
+        total_seats_booked += booked_seats
     
     # Calculate average occupancy
-    total_booked = booking_stats.total_bookings or 0
-    average_occupancy = (total_booked / total_seats_available * 100) if total_seats_available > 0 else 0
+    average_occupancy = (total_seats_booked / total_seats_available * 100) if total_seats_available > 0 else 0
     
     return MovieAnalyticsResponse(
         movie_id=movie_id,
@@ -131,9 +124,9 @@ def get_movie_analytics(
         period_start=start_date,
         period_end=end_date,
         total_shows=len(shows),
-        total_bookings=total_booked,
+        total_bookings=booking_stats.total_bookings or 0,
         total_revenue=float(booking_stats.total_revenue or 0),
-        total_tickets=total_booked,
+        total_tickets=booking_stats.total_tickets or 0,
         average_occupancy=round(average_occupancy, 2),
         shows_data=shows_data
     )
@@ -217,32 +210,17 @@ def get_theater_analytics(
     total_seats_available = 0
     total_booked_seats = 0
     
+    revenue_by_show = revenue_per_show(db, show_ids)
+    
     for hall in halls:
         # Get shows for this hall
         hall_shows = [show for show in shows if show.hall_id == hall.id]
-        hall_show_ids = [show.id for show in hall_shows]
         
-        if hall_show_ids:
-            # Get total seats in this hall
-            total_seats = db.query(func.count(Booking.id)).filter(
-                Booking.show_id.in_(hall_show_ids)
-            ).scalar() or 0
-            
-            # Get booked seats for this hall
-            booked_seats = db.query(func.count(Booking.id)).filter(
-                and_(
-                    Booking.show_id.in_(hall_show_ids),
-                    Booking.status == "confirmed"
-                )
-            ).scalar() or 0
-            
-            # Get revenue for this hall
-            hall_revenue = db.query(func.sum(Booking.amount_paid)).filter(
-                and_(
-                    Booking.show_id.in_(hall_show_ids),
-                    Booking.status == "confirmed"
-                )
-            ).scalar() or 0.0
+        if hall_shows:
+            # Seats offered and sold across the hall's shows, from the show counters
+            total_seats = sum(show.hall_capacity for show in hall_shows)
+            booked_seats = sum(show.seats_sold for show in hall_shows)
+            hall_revenue = sum(revenue_by_show.get(show.id, 0.0) for show in hall_shows)
             
             # Calculate occupancy
             occupancy = (booked_seats / total_seats * 100) if total_seats > 0 else 0
@@ -554,21 +532,11 @@ def get_seat_utilization(
     for hall in halls:
         # Get shows for this hall
         hall_shows = [show for show in shows if show.hall_id == hall.id]
-        hall_show_ids = [show.id for show in hall_shows]
         
-        if hall_show_ids:
-            # Get total seats in this hall
-            total_seats = db.query(func.count(Booking.id)).filter(
-                Booking.show_id.in_(hall_show_ids)
-            ).scalar() or 0
-            
-            # Get booked seats for this hall
-            booked_seats = db.query(func.count(Booking.id)).filter(
-                and_(
-                    Booking.show_id.in_(hall_show_ids),
-                    Booking.status == "confirmed"
-                )
-            ).scalar() or 0
+        if hall_shows:
+            # Seats offered and sold across the hall's shows, from the show counters
+            total_seats = sum(show.hall_capacity for show in hall_shows)
+            booked_seats = sum(show.seats_sold for show in hall_shows)
             
             # Calculate utilization
             utilization = (booked_seats / total_seats * 100) if total_seats > 0 else 0
@@ -1,26 +1,203 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from contextlib import contextmanager
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from typing import List
-from app.core.database import get_db
+from typing import Any, Callable, Iterator, List, Literal, Optional, Tuple
+from app.core.database import get_db, commit
+from app.core.config import settings
 from app.models.booking import Booking
 from app.models.show import Show
 from app.models.movie import Movie
-from app.schemas.booking import BookingCreate, BookingResponse, GroupBookingRequest, BookingSuggestion
+from app.schemas.booking import (
+    BookingCreate,
+    BookingResponse,
+    GroupBookingRequest,
+    BookingSuggestion,
+    SeatHoldCreate,
+    SeatHoldResponse,
+    BookingCancellationRequest,
+    BookingCancellationResponse,
+    WaitlistJoin,
+    WaitlistEntryResponse
+)
 from app.utils.booking_utils import (
-    generate_unique_booking_reference, 
+    SeatConflictError,
+    SeatMapVersionConflict,
+    SeatsHeldError,
+    ShowNotBookable,
+    book_seats,
+    cancel_bookings,
     check_seat_availability, 
+    check_show_bookable,
+    execute_booking,
+    seat_map_backoff,
     find_consecutive_seats,
+    find_best_seats,
     find_alternative_bookings,
-    calculate_booking_amount,
     validate_seats_in_same_show
 )
+from app.utils.pricing import pricing
+from app.utils.booking_executor import execute_write
+from app.utils.seat_holds import seat_holds, SeatHoldError
+from app.utils.waitlist import WaitlistEntry, waitlist
+from app.utils.idempotency import (
+    IdempotencyClaim,
+    IdempotencyKeyInProgress,
+    IdempotencyKeyReused,
+    idempotency_keys
+)
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
+def seat_conflict(error: SeatConflictError) -> HTTPException:
+    """Build the 409 response for seats lost to a concurrent booking or hold."""
+    taken_by = "held by another customer" if isinstance(error, SeatsHeldError) else "booked by another request"
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": f"Seats were {taken_by}: {error.seat_ids}",
+            "unavailable_seats": error.seat_ids
+        }
+    )
+
+def show_not_bookable(error: ShowNotBookable) -> HTTPException:
+    """Build the response for a booking on a show that is missing, cancelled or already started."""
+    if error.reason == "not_found":
+        return HTTPException(status_code=404, detail="Show not found")
+    if error.reason == "inactive":
+        return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Show is {error.status} and can't be booked")
+    return HTTPException(status_code=400, detail="Show has already started")
+
+def require_bookable_show(db: Session, show_id: int):
+    """Raise the show_not_bookable response unless the show exists and can be booked."""
+    try:
+        check_show_bookable(db, show_id)
+    except ShowNotBookable as e:
+        raise show_not_bookable(e)
+
+@contextmanager
+def booking_errors() -> Iterator[None]:
+    """Turn the errors of a booking write into their HTTP responses."""
+    try:
+        yield
+    except SeatConflictError as e:
+        raise seat_conflict(e)
+    except SeatMapVersionConflict as e:
+        raise seat_map_busy(e)
+    except ShowNotBookable as e:
+        raise show_not_bookable(e)
+
+class RetryableConflict(HTTPException):
+    """A transient 409 the client should retry as is; never stored against an Idempotency-Key."""
+
+def seat_map_busy(error: SeatMapVersionConflict) -> HTTPException:
+    """Build the 409 response for a booking that kept losing the race for a show's seat map."""
+    return RetryableConflict(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Show {error.show_id} is busy, please retry the booking",
+        headers={"Retry-After": "1"}
+    )
+
+# Set on responses replayed from an earlier request with the same Idempotency-Key
+REPLAY_HEADER = "Idempotent-Replayed"
+
+def begin_idempotent(
+    db: Session,
+    scope: str,
+    idempotency_key: str,
+    payload: Any,
+    response: Response
+) -> Tuple[Optional[IdempotencyClaim], Any]:
+    """
+    Claim an Idempotency-Key. Returns (claim, None) when the request should run, or
+    (None, body) with the first response's body when it is a replay.
+    """
+    try:
+        claim, stored = idempotency_keys.begin(db, scope, idempotency_key, payload)
+    except IdempotencyKeyReused:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    except IdempotencyKeyInProgress:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    
+    if stored is not None:
+        if stored.status_code >= 400:
+            raise HTTPException(status_code=stored.status_code, detail=stored.body, headers={REPLAY_HEADER: "true"})
+        response.headers[REPLAY_HEADER] = "true"
+        return None, stored.body
+    return claim, None
+
+@contextmanager
+def settle_claim(claim: IdempotencyClaim) -> Iterator[None]:
+    """
+    Store the outcome of the request run under a claim.
+    Only final outcomes are stored; after a transient conflict or a server error the key
+    is released so a retry with it runs the booking again.
+    """
+    try:
+        yield
+    except IdempotencyKeyInProgress:
+        # Another worker stored a response for this key first; our write was rolled back
+        idempotency_keys.abandon(claim)
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    except RetryableConflict:
+        idempotency_keys.abandon(claim)
+        raise
+    except HTTPException as e:
+        if e.status_code < 500:
+            idempotency_keys.complete(claim, e.status_code, e.detail)
+        else:
+            idempotency_keys.abandon(claim)
+        raise
+    except Exception:
+        idempotency_keys.abandon(claim)
+        raise
+    
+    idempotency_keys.complete(claim)
+
+def idempotent(
+    db: Session,
+    scope: str,
+    idempotency_key: Optional[str],
+    payload: Any,
+    response: Response,
+    handler: Callable[[Optional[IdempotencyClaim]], Any]
+):
+    """
+    Run handler at most once per Idempotency-Key.
+    Retries with the same key get the first response back without touching seat state.
+    """
+    if idempotency_key is None:
+        return handler(None)
+    
+    claim, replayed = begin_idempotent(db, scope, idempotency_key, payload, response)
+    if claim is None:
+        return replayed
+    with settle_claim(claim):
+        return handler(claim)
+
 @router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
-def create_booking(booking: BookingCreate, user_id: int, db: Session = Depends(get_db)):
-    """Create a single booking."""
+def create_booking(
+    booking: BookingCreate,
+    user_id: int,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db)
+):
+    """Create a single booking. Send an Idempotency-Key header to make retries safe."""
+    return idempotent(
+        db,
+        "POST /bookings/",
+        idempotency_key,
+        {"user_id": user_id, **booking.model_dump()},
+        response,
+        lambda claim: place_booking(booking, user_id, db, claim)
+    )
+
+def prepare_booking(booking: BookingCreate, user_id: int, db: Session, claim: Optional[IdempotencyClaim] = None):
+    """Check and price a single-seat booking. Returns its write for execute_booking."""
+    require_bookable_show(db, booking.show_id)
+    
     # Check seat availability
     is_available, unavailable_seats = check_seat_availability(db, booking.show_id, [booking.seat_id])
     
@@ -34,132 +211,302 @@ def create_booking(booking: BookingCreate, user_id: int, db: Session = Depends(g
     if not validate_seats_in_same_show(db, booking.show_id, [booking.seat_id]):
         raise HTTPException(status_code=400, detail="Seat does not belong to this show's hall")
     
-    # Calculate amount
-    amount = calculate_booking_amount(db, booking.show_id, 1)
+    # Price the seat from the show's cached price table
+    prices = pricing.quote(db, booking.show_id, [booking.seat_id])
+    if prices is None:
+        raise HTTPException(status_code=404, detail="Show not found")
     
     # Create booking
-    db_booking = Booking(
-        user_id=user_id,
-        show_id=booking.show_id,
-        seat_id=booking.seat_id,
-        booking_reference=generate_unique_booking_reference(db),
-        amount_paid=amount
-    )
-    
-    db.add(db_booking)
-    db.commit()
-    db.refresh(db_booking)
+    def write(session: Session, version: Optional[int]):
+        created = book_seats(session, booking.show_id, user_id, [booking.seat_id], prices, version)
+        idempotency_keys.record(session, claim, status.HTTP_201_CREATED, jsonable_encoder(BookingResponse.model_validate(created[0])))
+        return created[0]
     
-    return db_booking
+    return write
+
+def place_booking(booking: BookingCreate, user_id: int, db: Session, claim: Optional[IdempotencyClaim] = None):
+    """Book a single seat."""
+    write = prepare_booking(booking, user_id, db, claim)
+    with booking_errors():
+        return execute_booking(db, booking.show_id, write)
 
 @router.post("/group", response_model=List[BookingResponse], status_code=status.HTTP_201_CREATED)
-def create_group_booking(group_booking: GroupBookingRequest, db: Session = Depends(get_db)):
-    """Create a group booking for multiple seats together."""
-    try:
-        # Validate all seats belong to the same show
-        if not validate_seats_in_same_show(db, group_booking.show_id, group_booking.seat_ids):
-            raise HTTPException(status_code=400, detail="All seats must belong to the same show")
-        
-        # Check seat availability
-        is_available, unavailable_seats = check_seat_availability(db, group_booking.show_id, group_booking.seat_ids)
-        
-        if not is_available:
-            # Find alternative booking options
-            show = db.query(Show).filter(Show.id == group_booking.show_id).first()
-            if show:
-                alternatives = find_alternative_bookings(
-                    db, 
-                    show.movie_id, 
-                    len(group_booking.seat_ids),
-                    show.show_date
-                )
-                
-                raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "message": f"Requested seats are not available. Unavailable seats: {unavailable_seats}",
-                        "alternatives": alternatives
-                    }
-                )
-            else:
-                raise HTTPException(status_code=400, detail="Show not found")
-        
-        # Calculate total amount
-        total_amount = calculate_booking_amount(db, group_booking.show_id, len(group_booking.seat_ids))
-        
-        # Create bookings for all seats
-        created_bookings = []
-        
-        for seat_id in group_booking.seat_ids:
-            # Generate unique reference for each booking
-            booking_reference = generate_unique_booking_reference(db)
+def create_group_booking(
+    group_booking: GroupBookingRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db)
+):
+    """Create a group booking for multiple seats together. Send an Idempotency-Key header to make retries safe."""
+    return idempotent(
+        db,
+        "POST /bookings/group",
+        idempotency_key,
+        group_booking.model_dump(),
+        response,
+        lambda claim: place_group_booking(group_booking, db, claim)
+    )
+
+def prepare_group_booking(group_booking: GroupBookingRequest, db: Session, claim: Optional[IdempotencyClaim] = None):
+    """Check and price a group booking. Returns its write for execute_booking."""
+    require_bookable_show(db, group_booking.show_id)
+    
+    if len(set(group_booking.seat_ids)) != len(group_booking.seat_ids):
+        raise HTTPException(status_code=400, detail="Seat IDs must not contain duplicates")
+    
+    # Validate all seats belong to the same show
+    if not validate_seats_in_same_show(db, group_booking.show_id, group_booking.seat_ids):
+        raise HTTPException(status_code=400, detail="All seats must belong to the same show")
+    
+    # Check seat availability
+    is_available, unavailable_seats = check_seat_availability(db, group_booking.show_id, group_booking.seat_ids)
+    
+    if not is_available:
+        # Find alternative booking options
+        show = db.query(Show).filter(Show.id == group_booking.show_id).first()
+        if show:
+            alternatives = find_alternative_bookings(
+                db, 
+                show.movie_id, 
+                len(group_booking.seat_ids),
+                show.show_date,
+                exclude_show_id=show.id
+            )
             
-            db_booking = Booking(
-                user_id=group_booking.user_id,
-                show_id=group_booking.show_id,
-                seat_id=seat_id,
-                booking_reference=booking_reference,
-                amount_paid=total_amount / len(group_booking.seat_ids)  # Split amount equally
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "message": f"Requested seats are not available. Unavailable seats: {unavailable_seats}",
+                    "alternatives": jsonable_encoder(alternatives)
+                }
             )
-            db.add(db_booking)
-            created_bookings.append(db_booking)
-        
-        db.commit()
-        
-        # Refresh all bookings
-        for booking in created_bookings:
-            db.refresh(booking)
-        
-        return created_bookings
-        
-    except HTTPException:
+        else:
+            raise HTTPException(status_code=400, detail="Show not found")
+    
+    # Price each seat by its type from the show's cached price table
+    prices = pricing.quote(db, group_booking.show_id, group_booking.seat_ids)
+    if prices is None:
+        raise HTTPException(status_code=404, detail="Show not found")
+    
+    # Create bookings for all seats in one atomic multi-row insert
+    def write(session: Session, version: Optional[int]):
+        created = book_seats(
+            session,
+            group_booking.show_id,
+            group_booking.user_id,
+            group_booking.seat_ids,
+            prices,
+            version
+        )
+        idempotency_keys.record(
+            session, claim, status.HTTP_201_CREATED,
+            jsonable_encoder([BookingResponse.model_validate(row) for row in created])
+        )
+        return created
+    
+    return write
+
+def place_group_booking(group_booking: GroupBookingRequest, db: Session, claim: Optional[IdempotencyClaim] = None):
+    """Book several seats for one show in a single atomic write."""
+    try:
+        write = prepare_group_booking(group_booking, db, claim)
+        with booking_errors():
+            return execute_booking(db, group_booking.show_id, write)
+    except (HTTPException, IdempotencyKeyInProgress):
         raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/group/consecutive", response_model=List[BookingResponse], status_code=status.HTTP_201_CREATED)
-def create_consecutive_group_booking(show_id: int, num_seats: int, user_id: int, db: Session = Depends(get_db)):
-    """Find and book consecutive seats for a group."""
+def create_consecutive_group_booking(
+    show_id: int,
+    num_seats: int,
+    user_id: int,
+    mode: Literal["first", "best"] = "first",
+    db: Session = Depends(get_db)
+):
+    """
+    Find and book consecutive seats for a group.
+    mode=first takes the first block in row order; mode=best takes the highest-scoring block.
+    If the chosen block is taken concurrently, a new block is picked, up to SEAT_MAP_MAX_RETRIES times.
+    """
+    for attempt in range(settings.SEAT_MAP_MAX_RETRIES + 1):
+        try:
+            return book_consecutive_seats(show_id, num_seats, user_id, mode, db)
+        except HTTPException as e:
+            if e.status_code != status.HTTP_409_CONFLICT or attempt == settings.SEAT_MAP_MAX_RETRIES:
+                raise
+        seat_map_backoff(attempt + 1)
+
+def pick_consecutive_seats(show_id: int, num_seats: int, user_id: int, mode: str, db: Session) -> GroupBookingRequest:
+    """Pick a block of consecutive seats from the seat index, as a group booking to place."""
     try:
         # Find consecutive seats
-        consecutive_seats = find_consecutive_seats(db, show_id, num_seats)
+        if mode == "best":
+            consecutive_seats = find_best_seats(db, show_id, num_seats)
+        else:
+            consecutive_seats = find_consecutive_seats(db, show_id, num_seats)
         
         if not consecutive_seats:
             # Find alternative booking options
             show = db.query(Show).filter(Show.id == show_id).first()
             if show:
-                alternatives = find_alternative_bookings(db, show.movie_id, num_seats, show.show_date)
+                alternatives = find_alternative_bookings(
+                    db,
+                    show.movie_id,
+                    num_seats,
+                    show.show_date,
+                    exclude_show_id=show.id
+                )
                 raise HTTPException(
                     status_code=400,
                     detail={
                         "message": f"No consecutive seats available for {num_seats} people",
-                        "alternatives": alternatives
+                        "alternatives": jsonable_encoder(alternatives)
                     }
                 )
             else:
                 raise HTTPException(status_code=400, detail="Show not found")
         
-        # Create group booking with consecutive seats
-        group_booking = GroupBookingRequest(
-            show_id=show_id,
-            seat_ids=consecutive_seats,
-            user_id=user_id
-        )
-        
-        return create_group_booking(group_booking, db)
+        return GroupBookingRequest(show_id=show_id, seat_ids=consecutive_seats, user_id=user_id)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@contextmanager
+def picked_block_taken() -> Iterator[None]:
+    """Booking a picked block fails with 400 only if another booking just took it; report that as 409."""
+    try:
+        yield
+    except HTTPException as e:
+        if e.status_code != status.HTTP_400_BAD_REQUEST:
+            raise
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.detail)
+
+def book_consecutive_seats(show_id: int, num_seats: int, user_id: int, mode: str, db: Session):
+    """Pick a block of consecutive seats from the seat index and book it."""
+    group_booking = pick_consecutive_seats(show_id, num_seats, user_id, mode, db)
+    with picked_block_taken():
+        return place_group_booking(group_booking, db)
+
 @router.get("/alternatives/{movie_id}", response_model=List[BookingSuggestion])
-def get_alternative_bookings(movie_id: int, num_seats: int, db: Session = Depends(get_db)):
+def get_alternative_bookings(movie_id: int, num_seats: int, limit: int = settings.ALTERNATIVES_LIMIT, db: Session = Depends(get_db)):
     """Get alternative booking options for a movie."""
-    alternatives = find_alternative_bookings(db, movie_id, num_seats)
+    alternatives = find_alternative_bookings(db, movie_id, num_seats, limit=limit)
     return alternatives
 
+@router.post("/holds", response_model=SeatHoldResponse, status_code=status.HTTP_201_CREATED)
+def create_seat_hold(hold_request: SeatHoldCreate, db: Session = Depends(get_db)):
+    """Hold seats for a show while the customer pays. Held seats are unavailable to others until the hold expires."""
+    seat_ids = hold_request.seat_ids
+    if seat_ids is None:
+        seat_ids = find_consecutive_seats(db, hold_request.show_id, hold_request.num_seats)
+        if not seat_ids:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No consecutive seats available for {hold_request.num_seats} people"
+            )
+    elif len(set(seat_ids)) != len(seat_ids):
+        raise HTTPException(status_code=400, detail="Seat IDs must not contain duplicates")
+    
+    if not validate_seats_in_same_show(db, hold_request.show_id, seat_ids):
+        raise HTTPException(status_code=400, detail="All seats must belong to the show's hall")
+    
+    try:
+        hold = seat_holds.create(db, hold_request.show_id, hold_request.user_id, seat_ids, hold_request.ttl_seconds)
+    except SeatHoldError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": f"Seats are not available: {e.seat_ids}",
+                "unavailable_seats": e.seat_ids
+            }
+        )
+    
+    if hold is None:
+        raise HTTPException(status_code=404, detail="Show not found")
+    
+    return hold
+
+@router.get("/holds/{hold_token}", response_model=SeatHoldResponse)
+def get_seat_hold(hold_token: str):
+    """Get a live seat hold."""
+    hold = seat_holds.get(hold_token)
+    if hold is None:
+        raise HTTPException(status_code=404, detail="Hold not found or expired")
+    return hold
+
+@router.post("/holds/{hold_token}/confirm", response_model=List[BookingResponse], status_code=status.HTTP_201_CREATED)
+def confirm_seat_hold(hold_token: str, db: Session = Depends(get_db)):
+    """Turn a live hold into confirmed bookings."""
+    hold = seat_holds.take(hold_token)
+    if hold is None:
+        raise HTTPException(status_code=404, detail="Hold not found or expired")
+    
+    try:
+        prices = pricing.quote(db, hold.show_id, hold.seat_ids)
+        if prices is None:
+            raise HTTPException(status_code=404, detail="Show not found")
+        with booking_errors():
+            return execute_booking(
+                db,
+                hold.show_id,
+                lambda session, version: book_seats(
+                    session, hold.show_id, hold.user_id, hold.seat_ids, prices, version, hold.hold_token
+                )
+            )
+    except Exception:
+        # End the failed write's transaction before settle() deletes the hold's rows
+        db.rollback()
+        raise
+    finally:
+        # Booked seats stay taken through the booked bitmap; otherwise they become free again
+        seat_holds.settle(hold)
+
+@router.delete("/holds/{hold_token}", status_code=status.HTTP_204_NO_CONTENT)
+def release_seat_hold(hold_token: str):
+    """Release a hold before it expires."""
+    if seat_holds.release(hold_token) is None:
+        raise HTTPException(status_code=404, detail="Hold not found or expired")
+    return None
+
+def waitlist_entry_response(entry: WaitlistEntry) -> WaitlistEntryResponse:
+    response = WaitlistEntryResponse.model_validate(entry)
+    response.position = waitlist.position(entry)
+    return response
+
+@router.post("/waitlist", response_model=WaitlistEntryResponse, status_code=status.HTTP_201_CREATED)
+def join_waitlist(waitlist_request: WaitlistJoin, db: Session = Depends(get_db)):
+    """
+    Wait for adjacent seats in a sold-out show. When seats are freed the entry is offered
+    a hold (hold_token) in FIFO order; confirm it through /bookings/holds/{hold_token}/confirm.
+    """
+    try:
+        entry = waitlist.join(db, waitlist_request.show_id, waitlist_request.user_id, waitlist_request.num_seats)
+    except ShowNotBookable as e:
+        raise show_not_bookable(e)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Show not found")
+    return waitlist_entry_response(entry)
+
+@router.get("/waitlist/{entry_id}", response_model=WaitlistEntryResponse)
+def get_waitlist_entry(entry_id: str):
+    """Get a waitlist entry's queue position or offered seats."""
+    entry = waitlist.get(entry_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Waitlist entry not found or offer expired")
+    return waitlist_entry_response(entry)
+
+@router.delete("/waitlist/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+def leave_waitlist(entry_id: str):
+    """Leave a waitlist, releasing any seats offered but not yet confirmed."""
+    if waitlist.leave(entry_id) is None:
+        raise HTTPException(status_code=404, detail="Waitlist entry not found or offer expired")
+    return None
+
 @router.get("/", response_model=List[BookingResponse])
 def get_bookings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """Get all bookings with pagination."""
@@ -186,6 +533,30 @@ def get_booking(booking_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Booking not found")
     return booking
 
+@router.put("/cancel", response_model=BookingCancellationResponse)
+def cancel_bookings_bulk(cancellation: BookingCancellationRequest, db: Session = Depends(get_db)):
+    """Cancel many bookings at once by ID and/or booking reference."""
+    # Resolve references to IDs first, so a booking named both ways is counted once
+    booking_ids = set(cancellation.booking_ids)
+    if cancellation.booking_references:
+        booking_ids.update(
+            booking_id for (booking_id,) in
+            db.query(Booking.id).filter(Booking.booking_reference.in_(cancellation.booking_references)).all()
+        )
+    
+    # The bookings may span many shows, so this runs as one statement on the request's
+    # session rather than through the per-show writer; the status guard in the UPDATE
+    # already makes it safe against concurrent cancellations
+    cancelled = cancel_bookings(db, Booking.id.in_(booking_ids))
+    commit(db)
+    
+    return BookingCancellationResponse(
+        requested=len(booking_ids),
+        cancelled=len(cancelled),
+        refund_total=round(sum(row.amount_paid for row in cancelled), 2),
+        cancelled_booking_ids=sorted(row.id for row in cancelled)
+    )
+
 @router.put("/{booking_id}/cancel", response_model=BookingResponse)
 def cancel_booking(booking_id: int, db: Session = Depends(get_db)):
     """Cancel a booking."""
@@ -193,11 +564,14 @@ def cancel_booking(booking_id: int, db: Session = Depends(get_db)):
     if booking is None:
         raise HTTPException(status_code=404, detail="Booking not found")
     
-    if booking.status == "cancelled":
-        raise HTTPException(status_code=400, detail="Booking is already cancelled")
-    
-    booking.status = "cancelled"
-    db.commit()
-    db.refresh(booking)
+    def cancel(session: Session) -> Booking:
+        # The status guard in cancel_bookings makes the check and the update one atomic step
+        if not cancel_bookings(session, Booking.id == booking_id):
+            status_now = session.query(Booking.status).filter(Booking.id == booking_id).scalar()
+            if status_now == "cancelled":
+                raise HTTPException(status_code=400, detail="Booking is already cancelled")
+            raise HTTPException(status_code=400, detail=f"Only confirmed bookings can be cancelled (status: {status_now})")
+        
+        return session.query(Booking).populate_existing().filter(Booking.id == booking_id).first()
     
-    return booking
+    return execute_write(db, booking.show_id, cancel)
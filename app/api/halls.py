@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date, time
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.theater import Hall
-from app.schemas.theater import HallCreate, HallUpdate, HallResponse
+from app.schemas.theater import HallCreate, HallUpdate, HallResponse, HallGeometryCacheStats
+from app.schemas.show import FreeSlotResponse
+from app.utils.hall_caches import invalidate_hall_caches
+from app.utils.hall_geometry import hall_geometry
+from app.utils.show_schedule import show_schedule
+from app.utils.timetable import timetable
 
 router = APIRouter(prefix="/halls", tags=["halls"])
 
@@ -22,6 +29,11 @@ def get_halls(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     halls = db.query(Hall).offset(skip).limit(limit).all()
     return halls
 
+@router.get("/geometry-cache", response_model=HallGeometryCacheStats)
+def get_geometry_cache_stats():
+    """Hit/miss counters of this worker's hall seat-geometry cache."""
+    return hall_geometry.stats()
+
 @router.get("/{hall_id}", response_model=HallResponse)
 def get_hall(hall_id: int, db: Session = Depends(get_db)):
     """Get a specific hall by ID."""
@@ -30,6 +42,29 @@ def get_hall(hall_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Hall not found")
     return hall
 
+@router.get("/{hall_id}/free-slots", response_model=List[FreeSlotResponse])
+def get_hall_free_slots(
+    hall_id: int,
+    show_date: date,
+    duration_minutes: int = Query(..., gt=0, le=24 * 60),
+    open_time: Optional[time] = None,
+    close_time: Optional[time] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Open windows in a hall on a day, between open_time and close_time (default
+    HALL_OPENING_TIME / HALL_CLOSING_TIME), long enough for a show of duration_minutes
+    plus the cleaning buffer.
+    """
+    if db.query(Hall.id).filter(Hall.id == hall_id).first() is None:
+        raise HTTPException(status_code=404, detail="Hall not found")
+    
+    windows = show_schedule.free_windows(
+        db, hall_id, show_date, duration_minutes,
+        open_time or settings.HALL_OPENING_TIME, close_time or settings.HALL_CLOSING_TIME
+    )
+    return [{"start_time": start, "end_time": end} for start, end in windows]
+
 @router.get("/theater/{theater_id}", response_model=List[HallResponse])
 def get_halls_by_theater(theater_id: int, db: Session = Depends(get_db)):
     """Get all halls for a specific theater."""
@@ -49,6 +84,8 @@ def update_hall(hall_id: int, hall: HallUpdate, db: Session = Depends(get_db)):
     
     db.commit()
     db.refresh(db_hall)
+    invalidate_hall_caches(hall_id)
+    timetable.clear()
     return db_hall
 
 @router.delete("/{hall_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -60,4 +97,6 @@ def delete_hall(hall_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_hall)
     db.commit()
+    invalidate_hall_caches(hall_id)
+    timetable.clear()
     return None
@@ -4,6 +4,8 @@ from typing import List
 from app.core.database import get_db
 from app.models.movie import Movie
 from app.schemas.movie import MovieCreate, MovieUpdate, MovieResponse
+from app.utils.pricing import pricing
+from app.utils.timetable import timetable
 
 router = APIRouter(prefix="/movies", tags=["movies"])
 
@@ -43,6 +45,8 @@ def update_movie(movie_id: int, movie: MovieUpdate, db: Session = Depends(get_db
     
     db.commit()
     db.refresh(db_movie)
+    pricing.invalidate_movie(movie_id)
+    timetable.clear()
     return db_movie
 
 @router.delete("/{movie_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -54,4 +58,6 @@ def delete_movie(movie_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_movie)
     db.commit()
+    pricing.invalidate_movie(movie_id)
+    timetable.clear()
     return None
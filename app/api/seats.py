@@ -1,10 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, Optional
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.seat import Seat
 from app.models.theater import Hall
-from app.schemas.seat import SeatCreate, SeatResponse, SeatLayoutResponse
+from app.schemas.seat import (
+    SeatCreate,
+    SeatResponse,
+    SeatLayoutResponse,
+    BulkLayoutRequest,
+    BulkLayoutResponse,
+    CloneLayoutRequest,
+    HallLayoutResult
+)
+from app.utils.hall_caches import invalidate_hall_caches
+from app.utils.hall_geometry import hall_geometry
+from app.utils.show_counters import adjust_hall_capacity
+from app.utils.seat_layout import clear_layout_spec, create_layouts, layout_rows, layout_spec
 from sqlalchemy import and_
 
 router = APIRouter(prefix="/seats", tags=["seats"])
@@ -29,15 +42,128 @@ def create_seat(seat: SeatCreate, db: Session = Depends(get_db)):
     
     db_seat = Seat(**seat.dict())
     db.add(db_seat)
+    adjust_hall_capacity(db, seat.hall_id, 1)
+    clear_layout_spec(db, seat.hall_id)
     db.commit()
     db.refresh(db_seat)
+    invalidate_hall_caches(seat.hall_id)
     return db_seat
 
+def validate_layout(seats_per_row: Dict[int, int]):
+    """Reject rows narrower than LAYOUT_MIN_SEATS_PER_ROW."""
+    for row_num, num_seats in seats_per_row.items():
+        if num_seats < settings.LAYOUT_MIN_SEATS_PER_ROW:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Row {row_num} must have at least {settings.LAYOUT_MIN_SEATS_PER_ROW} seats (got {num_seats})"
+            )
+
+@router.post("/layout/bulk", response_model=BulkLayoutResponse, status_code=status.HTTP_201_CREATED)
+def create_bulk_layout(layout: BulkLayoutRequest, db: Session = Depends(get_db)):
+    """
+    Create seat layouts for many halls (e.g. a whole multiplex) in one transaction.
+    All seats are inserted with a single multi-row INSERT ... RETURNING.
+    """
+    hall_ids = [hall.hall_id for hall in layout.halls]
+    if len(set(hall_ids)) != len(hall_ids):
+        raise HTTPException(status_code=400, detail="Each hall may appear only once")
+    
+    found = {hall_id for (hall_id,) in db.query(Hall.id).filter(Hall.id.in_(hall_ids)).all()}
+    missing = [hall_id for hall_id in hall_ids if hall_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Halls not found: {missing}")
+    
+    layouts = []
+    for hall in layout.halls:
+        validate_layout(hall.seats_per_row)
+        for band in hall.seat_type_bands:
+            if band.first_row > band.last_row:
+                raise HTTPException(status_code=400, detail=f"Seat type band {band.first_row}-{band.last_row} is empty")
+        spec = layout_spec(hall.seats_per_row, hall.aisle_seats, [band.model_dump() for band in hall.seat_type_bands])
+        layouts.append((hall.hall_id, layout_rows(hall.hall_id, spec), spec))
+    
+    return create_layouts_response(db, layouts)
+
+def create_layouts_response(db: Session, layouts: list) -> BulkLayoutResponse:
+    """Insert (hall_id, rows, spec) layouts, commit, and summarize the new seat IDs per hall."""
+    total = sum(len(rows) for _, rows, _ in layouts)
+    if total > settings.LAYOUT_BULK_MAX_SEATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.LAYOUT_BULK_MAX_SEATS} seats per request (got {total})"
+        )
+    
+    created = create_layouts(db, layouts)
+    db.commit()
+    for hall_id in created:
+        invalidate_hall_caches(hall_id)
+    
+    return BulkLayoutResponse(
+        seats_created=total,
+        halls=[
+            HallLayoutResult(hall_id=hall_id, seats_created=len(seats), seat_ids=[seat.id for seat in seats])
+            for hall_id, seats in created.items()
+        ]
+    )
+
+@router.post("/layout/{hall_id}/clone", response_model=BulkLayoutResponse, status_code=status.HTTP_201_CREATED)
+def clone_hall_layout(hall_id: int, clone: CloneLayoutRequest, db: Session = Depends(get_db)):
+    """Copy a hall's seat layout to other halls that have no seats yet, in one multi-row insert."""
+    source = db.query(Hall.id, Hall.layout_spec).filter(Hall.id == hall_id).first()
+    if source is None:
+        raise HTTPException(status_code=404, detail="Hall not found")
+    
+    target_ids = list(dict.fromkeys(clone.hall_ids))
+    if hall_id in target_ids:
+        raise HTTPException(status_code=400, detail="A hall can't be cloned onto itself")
+    found = {target_id for (target_id,) in db.query(Hall.id).filter(Hall.id.in_(target_ids)).all()}
+    missing = [target_id for target_id in target_ids if target_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Halls not found: {missing}")
+    occupied = [
+        target_id for (target_id,) in db.query(Seat.hall_id).filter(Seat.hall_id.in_(target_ids)).group_by(Seat.hall_id).all()
+    ]
+    if occupied:
+        raise HTTPException(status_code=400, detail=f"Halls already have seats: {sorted(occupied)}")
+    
+    if source.layout_spec is not None:
+        # Regenerate from the spec; the clones get specs of their own
+        spec = layout_spec(
+            {int(row): count for row, count in source.layout_spec["seats_per_row"].items()},
+            source.layout_spec["aisle_seats"],
+            source.layout_spec["seat_type_bands"]
+        )
+        layouts = [(target_id, layout_rows(target_id, spec), spec) for target_id in target_ids]
+    else:
+        # Copy the seats one for one from the cached hall geometry
+        geometry = hall_geometry.get(db, hall_id)
+        layouts = [
+            (target_id, [
+                {
+                    "hall_id": target_id,
+                    "row_number": row_number,
+                    "seat_number": seat_number,
+                    "seat_type": seat_type,
+                    "is_aisle": geometry.is_aisle(seat_id)
+                }
+                for seat_id, row_number, seat_number, seat_type in geometry.seats()
+            ], None)
+            for target_id in target_ids
+        ]
+    
+    return create_layouts_response(db, layouts)
+
 @router.post("/layout/{hall_id}", response_model=List[SeatResponse], status_code=status.HTTP_201_CREATED)
-def create_hall_layout(hall_id: int, seats_per_row: Dict[int, int], db: Session = Depends(get_db)):
+def create_hall_layout(
+    hall_id: int,
+    seats_per_row: Dict[int, int],
+    aisle_seats: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_db)
+):
     """
     Create seat layout for a hall.
     seats_per_row: Dict where key is row number and value is number of seats in that row
+    aisle_seats: seat numbers next to an aisle (defaults to LAYOUT_DEFAULT_AISLE_SEATS)
     """
     # Verify hall exists
     hall = db.query(Hall).filter(Hall.id == hall_id).first()
@@ -45,42 +171,19 @@ def create_hall_layout(hall_id: int, seats_per_row: Dict[int, int], db: Session
         raise HTTPException(status_code=404, detail="Hall not found")
     
     # Validate that each row has at least 6 seats (3 columns as per requirement)
-    for row_num, num_seats in seats_per_row.items():
-        if num_seats < 6:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Row {row_num} must have at least 6 seats (got {num_seats})"
-            )
-    
-    created_seats = []
-    
-    for row_num, num_seats in seats_per_row.items():
-        for seat_num in range(1, num_seats + 1):
-            # Determine if it's an aisle seat (seats 3 and 4 are aisle seats)
-            is_aisle = seat_num in [3, 4]
-            
-            seat = Seat(
-                hall_id=hall_id,
-                row_number=row_num,
-                seat_number=seat_num,
-                is_aisle=is_aisle
-            )
-            db.add(seat)
-            created_seats.append(seat)
+    validate_layout(seats_per_row)
     
+    spec = layout_spec(seats_per_row, aisle_seats)
+    created_seats = create_layouts(db, [(hall_id, layout_rows(hall_id, spec), spec)])[hall_id]
     db.commit()
-    
-    # Refresh all created seats
-    for seat in created_seats:
-        db.refresh(seat)
+    invalidate_hall_caches(hall_id)
     
     return created_seats
 
 @router.get("/hall/{hall_id}", response_model=List[SeatResponse])
 def get_seats_by_hall(hall_id: int, db: Session = Depends(get_db)):
     """Get all seats for a specific hall."""
-    seats = db.query(Seat).filter(Seat.hall_id == hall_id).order_by(Seat.row_number, Seat.seat_number).all()
-    return seats
+    return hall_geometry.get(db, hall_id).seat_dicts()
 
 @router.get("/layout/{hall_id}", response_model=SeatLayoutResponse)
 def get_hall_layout(hall_id: int, db: Session = Depends(get_db)):
@@ -90,38 +193,26 @@ def get_hall_layout(hall_id: int, db: Session = Depends(get_db)):
     if not hall:
         raise HTTPException(status_code=404, detail="Hall not found")
     
-    # Get all seats for this hall
-    seats = db.query(Seat).filter(Seat.hall_id == hall_id).order_by(Seat.row_number, Seat.seat_number).all()
-    
-    # Group seats by row
-    seats_per_row = {}
-    for seat in seats:
-        if seat.row_number not in seats_per_row:
-            seats_per_row[seat.row_number] = 0
-        seats_per_row[seat.row_number] += 1
+    # Seats of this hall from the cached hall geometry
+    geometry = hall_geometry.get(db, hall_id)
+    seats_per_row = geometry.seats_per_row()
     
-    # Get all bookings for this hall's shows
+    # Get seats booked for any of this hall's shows (GET /shows/{show_id}/seatmap has a single show)
     from app.models.booking import Booking
     from app.models.show import Show
     
-    # Get all shows for this hall
-    shows = db.query(Show).filter(Show.hall_id == hall_id).all()
-    show_ids = [show.id for show in shows]
-    
-    # Get booked seats
-    booked_seats = []
-    if show_ids:
-        bookings = db.query(Booking).filter(
+    booked_seats = [
+        seat_id for (seat_id,) in db.query(Booking.seat_id).join(Show, Show.id == Booking.show_id).filter(
             and_(
-                Booking.show_id.in_(show_ids),
+                Show.hall_id == hall_id,
                 Booking.status == "confirmed"
             )
         ).all()
-        booked_seats = [booking.seat_id for booking in bookings]
+    ]
     
     # Get available seats (all seats minus booked seats)
-    all_seat_ids = [seat.id for seat in seats]
-    available_seats = [seat_id for seat_id in all_seat_ids if seat_id not in booked_seats]
+    booked = set(booked_seats)
+    available_seats = [seat_id for seat_id in geometry.seat_ids if seat_id not in booked]
     
     return SeatLayoutResponse(
         hall_id=hall_id,
@@ -147,6 +238,10 @@ def delete_seat(seat_id: int, db: Session = Depends(get_db)):
     if db_seat is None:
         raise HTTPException(status_code=404, detail="Seat not found")
     
+    hall_id = db_seat.hall_id
     db.delete(db_seat)
+    adjust_hall_capacity(db, hall_id, -1)
+    clear_layout_spec(db, hall_id)
     db.commit()
+    invalidate_hall_caches(hall_id)
     return None
@@ -1,14 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import base64
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, insert, tuple_, update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
+from datetime import date, datetime, time, timedelta
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.show import Show
+from app.models.booking import Booking
 from app.models.movie import Movie
-from app.models.theater import Hall
-from app.schemas.show import ShowCreate, ShowUpdate, ShowResponse
+from app.models.theater import Hall, Theater
+from app.schemas.show import (
+    ShowCreate, ShowUpdate, ShowResponse, ShowScheduleTemplate, BulkShowResponse, ShowSearchResponse,
+    SeatMapContentionResponse, SeatMapResponse
+)
+from app.schemas.booking import ShowCancellationResponse
+from app.utils.seat_index import seat_index
+from app.utils.pricing import pricing
+from app.utils.booking_utils import cancel_bookings
+from app.utils.booking_executor import execute_write
+from app.utils.show_counters import hall_capacities, hall_capacity
+from app.utils.contention import contention_stats
+from app.utils.seat_map import encode_seat_map, seat_map_etag
+from app.utils.seat_stream import seat_map_stream
+from app.utils.show_schedule import ShowConflictError, show_schedule
+from app.utils.timetable import timetable
+from app.utils.waitlist import waitlist
 
 router = APIRouter(prefix="/shows", tags=["shows"])
 
+shows_table = Show.__table__
+
+def claim_schedule_slot(db: Session, show: Show):
+    """Place a flushed show in its hall's schedule; roll back and answer 409 if it overlaps another show."""
+    try:
+        show_schedule.claim(db, show.hall_id, show.show_date, show.start_time, show.end_time, show.id)
+    except ShowConflictError as error:
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Show overlaps other shows in this hall", "conflicting_show_ids": error.show_ids}
+        )
+
+def commit_schedule_change(db: Session, show: Show, *show_dates):
+    """Commit a show change; if that fails, reload the affected schedule days from the database."""
+    try:
+        db.commit()
+    except Exception:
+        show_schedule.discard(show.id)
+        for show_date in show_dates:
+            show_schedule.forget(show.hall_id, show_date)
+        raise
+
 @router.post("/", response_model=ShowResponse, status_code=status.HTTP_201_CREATED)
 def create_show(show: ShowCreate, db: Session = Depends(get_db)):
     """Create a new show."""
@@ -22,12 +66,101 @@ def create_show(show: ShowCreate, db: Session = Depends(get_db)):
     if not hall:
         raise HTTPException(status_code=404, detail="Hall not found")
     
-    db_show = Show(**show.dict())
+    db_show = Show(**show.dict(), hall_capacity=hall_capacity(db, show.hall_id))
     db.add(db_show)
-    db.commit()
+    db.flush()
+    if db_show.status != "cancelled":
+        claim_schedule_slot(db, db_show)
+    commit_schedule_change(db, db_show, show.show_date)
     db.refresh(db_show)
+    timetable.shows_changed(db, [db_show.id])
     return db_show
 
+@router.post("/bulk", response_model=BulkShowResponse, status_code=status.HTTP_201_CREATED)
+def create_bulk_shows(template: ShowScheduleTemplate, db: Session = Depends(get_db)):
+    """
+    Create a schedule of shows from a template: on every date from start_date to end_date,
+    each hall runs the template's movies in turn through its daily start times. Movies and
+    halls are checked with one query each, the whole schedule is checked for overlaps
+    (including the cleaning buffer), and every show is inserted with a single multi-row INSERT.
+    """
+    if template.end_date < template.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    if len(set(template.hall_ids)) != len(template.hall_ids):
+        raise HTTPException(status_code=400, detail="Each hall may appear only once")
+    
+    days = (template.end_date - template.start_date).days + 1
+    total = days * len(template.hall_ids) * len(template.start_times)
+    if total > settings.SHOW_BULK_MAX_SHOWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.SHOW_BULK_MAX_SHOWS} shows per request (got {total})"
+        )
+    
+    durations = dict(db.query(Movie.id, Movie.duration_minutes).filter(Movie.id.in_(set(template.movie_ids))).all())
+    missing = sorted(set(template.movie_ids) - durations.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Movies not found: {missing}")
+    found = {hall_id for (hall_id,) in db.query(Hall.id).filter(Hall.id.in_(template.hall_ids)).all()}
+    missing = [hall_id for hall_id in template.hall_ids if hall_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Halls not found: {missing}")
+    capacities = hall_capacities(db, template.hall_ids)
+    
+    rows = []
+    start_times = sorted(template.start_times)
+    for offset in range(days):
+        show_date = datetime.combine(template.start_date + timedelta(days=offset), time.min)
+        for hall_id in template.hall_ids:
+            for slot, start_time in enumerate(start_times):
+                movie_id = template.movie_ids[slot % len(template.movie_ids)]
+                rows.append({
+                    "movie_id": movie_id,
+                    "hall_id": hall_id,
+                    "show_date": show_date,
+                    "start_time": start_time,
+                    "end_time": (datetime.combine(show_date, start_time) + timedelta(minutes=durations[movie_id])).time(),
+                    "price_multiplier": template.price_multiplier,
+                    "status": "active",
+                    "hall_capacity": capacities.get(hall_id, 0)
+                })
+    
+    created = []
+    
+    def insert_shows() -> list:
+        # RETURNING carries each show's slot, so rows needn't come back in parameter order
+        # (which would make SQLite fall back to one INSERT per row)
+        created.extend(db.execute(
+            insert(shows_table).returning(
+                shows_table.c.id, shows_table.c.hall_id, shows_table.c.show_date,
+                shows_table.c.start_time, shows_table.c.end_time
+            ),
+            rows
+        ).all())
+        db.commit()
+        return created
+    
+    try:
+        show_schedule.schedule_many(
+            db,
+            [(row["hall_id"], row["show_date"], row["start_time"], row["end_time"]) for row in rows],
+            insert_shows
+        )
+    except ShowConflictError as error:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Schedule overlaps shows in these halls", "conflicts": error.conflicts}
+        )
+    
+    timetable.shows_changed(db, [row.id for row in created])
+    ranges: List[List[int]] = []
+    for show_id in sorted(row.id for row in created):
+        if ranges and show_id == ranges[-1][1] + 1:
+            ranges[-1][1] = show_id
+        else:
+            ranges.append([show_id, show_id])
+    return BulkShowResponse(shows_created=len(created), days=days, show_id_ranges=ranges)
+
 @router.get("/", response_model=List[ShowResponse])
 def get_shows(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """Get all shows with pagination."""
@@ -46,6 +179,97 @@ def get_shows_by_hall(hall_id: int, db: Session = Depends(get_db)):
     shows = db.query(Show).filter(Show.hall_id == hall_id).all()
     return shows
 
+def encode_search_cursor(show_date: datetime, start_time: time, show_id: int) -> str:
+    """Opaque keyset cursor: the sort key of the last show on a page."""
+    key = f"{show_date.date().isoformat()}|{start_time.isoformat()}|{show_id}"
+    return base64.urlsafe_b64encode(key.encode()).decode("ascii")
+
+def decode_search_cursor(cursor: str) -> tuple:
+    try:
+        show_date, start_time, show_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode().split("|")
+        return datetime.combine(date.fromisoformat(show_date), time.min), time.fromisoformat(start_time), int(show_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/search", response_model=ShowSearchResponse)
+def search_shows(
+    movie_id: Optional[int] = None,
+    city: Optional[str] = None,
+    theater_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    genre: Optional[str] = None,
+    language: Optional[str] = None,
+    min_available_seats: int = Query(0, ge=0),
+    show_status: str = Query("active", alias="status"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Find shows by movie, city, theater, date range (inclusive), genre, language and
+    minimum free seats, ordered by date and start time. Pages are keyset-paginated:
+    pass the returned next_cursor to get the next page.
+    """
+    available = Show.hall_capacity - Show.seats_sold
+    query = db.query(
+        Show.id, Show.movie_id, Show.hall_id, Show.show_date, Show.start_time, Show.end_time,
+        Show.price_multiplier, Show.status, Show.hall_capacity, available.label("available_seats"),
+        Movie.title.label("movie_title"), Movie.genre, Movie.language,
+        Hall.name.label("hall_name"), Theater.id.label("theater_id"), Theater.name.label("theater_name"), Theater.city
+    ).join(Movie, Movie.id == Show.movie_id).join(Hall, Hall.id == Show.hall_id).join(Theater, Theater.id == Hall.theater_id)
+    
+    if movie_id is not None:
+        query = query.filter(Show.movie_id == movie_id)
+    if theater_id is not None:
+        query = query.filter(Hall.theater_id == theater_id)
+    if city:
+        query = query.filter(func.lower(Theater.city) == city.lower())
+    if genre:
+        query = query.filter(func.lower(Movie.genre) == genre.lower())
+    if language:
+        query = query.filter(func.lower(Movie.language) == language.lower())
+    if date_from is not None:
+        query = query.filter(Show.show_date >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        query = query.filter(Show.show_date < datetime.combine(date_to + timedelta(days=1), time.min))
+    if min_available_seats:
+        query = query.filter(available >= min_available_seats)
+    if show_status:
+        query = query.filter(Show.status == show_status)
+    if cursor:
+        query = query.filter(tuple_(Show.show_date, Show.start_time, Show.id) > tuple_(*decode_search_cursor(cursor)))
+    
+    rows = query.order_by(Show.show_date, Show.start_time, Show.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_search_cursor(rows[-1].show_date, rows[-1].start_time, rows[-1].id)
+    return ShowSearchResponse(shows=[row._asdict() for row in rows], next_cursor=next_cursor)
+
+@router.get("/timetable", response_class=Response)
+def get_timetable(
+    city: str,
+    show_date: Optional[date] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    "Now showing" in a city on a day (default today): movies, each with its theaters and
+    their showtimes, with free seats and an availability badge (available, filling_fast,
+    sold_out). Served from memory; send the ETag back in If-None-Match to get 304.
+    """
+    body, etag = timetable.get(db, city, show_date or date.today())
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and {etag, "*"} & {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/contention", response_model=List[SeatMapContentionResponse])
+def get_seat_map_contention(limit: int = 10):
+    """Shows whose seat maps saw the most concurrent booking conflicts in this worker."""
+    return contention_stats.top(limit)
+
 @router.get("/{show_id}", response_model=ShowResponse)
 def get_show(show_id: int, db: Session = Depends(get_db)):
     """Get a specific show by ID."""
@@ -54,6 +278,63 @@ def get_show(show_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Show not found")
     return show
 
+@router.get("/{show_id}/seatmap", response_model=SeatMapResponse)
+def get_show_seat_map(
+    show_id: int,
+    response: Response,
+    encoding: Literal["base64", "rle"] = "base64",
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Compact seat availability for one show: row geometry plus one flag per seat.
+    Send the returned ETag back in If-None-Match to get 304 Not Modified while nothing changed.
+    """
+    state = seat_index.get(db, show_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Show not found")
+    # The ETag names the seat_map_version, so catch up first if this process is behind
+    # the database or still waiting for some of its own writes to be reported
+    version = db.query(Show.seat_map_version).filter(Show.id == show_id).scalar()
+    if version != state.version or state.missing:
+        seat_index.refresh(db, show_id)
+        state = seat_index.get(db, show_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail="Show not found")
+    
+    headers = {"Cache-Control": "no-cache"}
+    etag = seat_map_etag(state, encoding)
+    if if_none_match and {etag, "*"} & {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **headers})
+    
+    seat_map = encode_seat_map(state, encoding)
+    response.headers.update({"ETag": seat_map["etag"], **headers})
+    return seat_map
+
+@router.get("/{show_id}/seatmap/stream")
+async def stream_show_seat_map(show_id: int):
+    """
+    Server-sent events for one show's seat map: a `snapshot` event (same body as
+    GET /shows/{show_id}/seatmap), then a `seats` event with the current availability of
+    the seats involved whenever seats are booked, freed, held or released.
+    """
+    queue = seat_map_stream.subscribe(show_id)
+    state = await seat_map_stream.state(show_id)
+    if state is None:
+        seat_map_stream.unsubscribe(show_id, queue)
+        raise HTTPException(status_code=404, detail="Show not found")
+    
+    return StreamingResponse(
+        seat_map_stream.events(show_id, queue, state),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{show_id}/contention", response_model=SeatMapContentionResponse)
+def get_show_contention(show_id: int):
+    """Booking write and conflict counts for one show's seat map in this worker."""
+    return contention_stats.get(show_id)
+
 @router.put("/{show_id}", response_model=ShowResponse)
 def update_show(show_id: int, show: ShowUpdate, db: Session = Depends(get_db)):
     """Update a show."""
@@ -61,14 +342,51 @@ def update_show(show_id: int, show: ShowUpdate, db: Session = Depends(get_db)):
     if db_show is None:
         raise HTTPException(status_code=404, detail="Show not found")
     
+    previous_date = db_show.show_date
     update_data = show.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_show, field, value)
     
-    db.commit()
+    # Rescheduling (or reactivating) a show must not make it overlap another one in the hall
+    if db_show.status != "cancelled" and {"show_date", "start_time", "end_time", "status"} & update_data.keys():
+        db.flush()
+        claim_schedule_slot(db, db_show)
+    commit_schedule_change(db, db_show, previous_date, db_show.show_date)
+    if db_show.status == "cancelled":
+        show_schedule.discard(show_id)
     db.refresh(db_show)
+    pricing.invalidate_show(show_id)
+    timetable.shows_changed(db, [show_id])
     return db_show
 
+@router.post("/{show_id}/cancel", response_model=ShowCancellationResponse)
+def cancel_show(show_id: int, db: Session = Depends(get_db)):
+    """Cancel a show and every confirmed booking for it in one transaction."""
+    db_show = db.query(Show).filter(Show.id == show_id).first()
+    if db_show is None:
+        raise HTTPException(status_code=404, detail="Show not found")
+    if db_show.status == "cancelled":
+        raise HTTPException(status_code=400, detail="Show is already cancelled")
+    
+    def cancel(session: Session) -> list:
+        session.execute(update(Show.__table__).where(Show.id == show_id).values(status="cancelled"))
+        return cancel_bookings(session, Booking.show_id == show_id)
+    
+    # Drop the waitlist first so seats freed by the cancellation aren't offered to it,
+    # and again afterwards for anyone who joined while the cancellation ran
+    waitlist.drop_show(show_id)
+    cancelled = execute_write(db, show_id, cancel)
+    waitlist.drop_show(show_id)
+    seat_index.invalidate(show_id)
+    show_schedule.discard(show_id)
+    timetable.remove_show(show_id)
+    return ShowCancellationResponse(
+        show_id=show_id,
+        status="cancelled",
+        cancelled_bookings=len(cancelled),
+        refund_total=round(sum(row.amount_paid for row in cancelled), 2)
+    )
+
 @router.delete("/{show_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_show(show_id: int, db: Session = Depends(get_db)):
     """Delete a show."""
@@ -78,4 +396,9 @@ def delete_show(show_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_show)
     db.commit()
+    waitlist.drop_show(show_id)
+    seat_index.invalidate(show_id)
+    pricing.invalidate_show(show_id)
+    show_schedule.discard(show_id)
+    timetable.remove_show(show_id)
     return None
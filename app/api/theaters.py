@@ -4,6 +4,7 @@ from typing import List
 from app.core.database import get_db
 from app.models.theater import Theater
 from app.schemas.theater import TheaterCreate, TheaterUpdate, TheaterResponse
+from app.utils.timetable import timetable
 
 router = APIRouter(prefix="/theaters", tags=["theaters"])
 
@@ -14,6 +15,7 @@ def create_theater(theater: TheaterCreate, db: Session = Depends(get_db)):
     db.add(db_theater)
     db.commit()
     db.refresh(db_theater)
+    timetable.clear()
     return db_theater
 
 @router.get("/", response_model=List[TheaterResponse])
@@ -43,6 +45,7 @@ def update_theater(theater_id: int, theater: TheaterUpdate, db: Session = Depend
     
     db.commit()
     db.refresh(db_theater)
+    timetable.clear()
     return db_theater
 
 @router.delete("/{theater_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -54,4 +57,5 @@ def delete_theater(theater_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_theater)
     db.commit()
+    timetable.clear()
     return None
@@ -1,10 +1,12 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
+from datetime import time
 import os
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./movie_booking.db"
+    ASYNC_DATABASE_ENABLED: bool = False  # Also serve async routes under /aio (needs aiosqlite or asyncpg)
     
     # JWT Settings
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
@@ -15,6 +17,65 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Movie Booking System"
     
+    # Booking Settings
+    BOOKING_NODE_ID: int = 0  # 0-255, must differ per host when running several API hosts
+    SEAT_INDEX_MAX_SHOWS: int = 5000  # seat maps cached per process; least recently used are dropped first
+    SEAT_HOLD_TTL_SECONDS: int = 300  # holds live in the seat_holds table and block bookings on every worker; only the holding worker's seat maps show them
+    SEAT_HOLD_MAX_TTL_SECONDS: int = 900
+    WAITLIST_OFFER_TTL_SECONDS: int = 600  # how long a waitlisted user has to confirm offered seats
+    ALTERNATIVES_WINDOW_DAYS: int = 14
+    ALTERNATIVES_LIMIT: int = 10
+    
+    # Pricing: seat price = movie base price x show multiplier x seat type multiplier (x surge)
+    SEAT_TYPE_PRICE_MULTIPLIERS: Dict[str, float] = {"standard": 1.0, "premium": 1.5}
+    PRICE_SURGE_ENABLED: bool = False
+    PRICE_SURGE_TIERS: Dict[float, float] = {0.7: 1.1, 0.9: 1.25}  # occupancy reached -> multiplier
+    PRICE_TABLE_TTL_SECONDS: int = 60  # bounds staleness when another process changes prices
+    PRICE_TABLE_MAX_SHOWS: int = 5000  # price tables cached per process; least recently used are dropped first
+    
+    # Idempotency-Key replay for booking POSTs
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_MAX_KEYS: int = 100000  # per process; oldest keys are evicted first
+    IDEMPOTENCY_PERSIST: bool = False  # also store successful responses in the idempotency_keys table
+    
+    # Optimistic concurrency on Show.seat_map_version: retries with exponential backoff and full jitter
+    SEAT_MAP_MAX_RETRIES: int = 5
+    SEAT_MAP_RETRY_BASE_MS: float = 5.0
+    SEAT_MAP_RETRY_MAX_MS: float = 200.0
+    
+    # Per-show serialized booking writes (see app/utils/booking_executor.py)
+    BOOKING_EXECUTOR_ENABLED: bool = False
+    BOOKING_EXECUTOR_SHARDS: int = 4
+    BOOKING_EXECUTOR_BATCH_SIZE: int = 64
+    BOOKING_EXECUTOR_TICK_MS: float = 2.0
+    
+    # Server-sent seat map streams (GET /shows/{show_id}/seatmap/stream)
+    SEAT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    SEAT_STREAM_QUEUE_SIZE: int = 64  # pending deltas per subscriber before it is resent a snapshot
+    
+    # Seat layouts
+    LAYOUT_MIN_SEATS_PER_ROW: int = 6  # 3 columns as per requirement
+    LAYOUT_DEFAULT_AISLE_SEATS: List[int] = [3, 4]  # seat numbers next to an aisle when a layout doesn't say
+    LAYOUT_BULK_MAX_SEATS: int = 50000  # per bulk layout request
+    
+    # Show scheduling: shows in one hall may not overlap, including cleaning time after each show
+    SHOW_CLEANING_BUFFER_MINUTES: int = 15
+    SHOW_SCHEDULE_TTL_SECONDS: int = 60  # bounds staleness when another process schedules shows
+    HALL_OPENING_TIME: time = time(9, 0)  # default window for GET /halls/{hall_id}/free-slots
+    HALL_CLOSING_TIME: time = time(23, 59)
+    SHOW_BULK_MAX_SHOWS: int = 10000  # per POST /shows/bulk
+    
+    # "Now showing" timetables per city and date (GET /shows/timetable)
+    TIMETABLE_TTL_SECONDS: int = 60  # bounds staleness when another process changes shows or bookings
+    TIMETABLE_FILLING_FAST_RATIO: float = 0.2  # "filling_fast" badge at or below this share of free seats
+    
+    # Best-available seat scoring
+    SEAT_QUALITY_CENTER_WEIGHT: float = 1.0
+    SEAT_QUALITY_ROW_WEIGHT: float = 1.0
+    SEAT_QUALITY_IDEAL_ROW_DEPTH: float = 0.66  # 0 = front row, 1 = back row
+    SEAT_QUALITY_TYPE_BONUS: Dict[str, float] = {"premium": 0.25}
+    SEAT_QUALITY_AISLE_BONUS: float = 0.0
+    
     class Config:
         env_file = ".env"
 
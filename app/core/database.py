@@ -1,17 +1,43 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-# Create SQLite engine
+is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+
+# Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    connect_args={"check_same_thread": False} if is_sqlite else {}  # Needed for SQLite
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers used for the optional async engine, keyed by URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching async driver."""
+    scheme, rest = url.split("://", 1)
+    backend = scheme.split("+", 1)[0]
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database scheme '{scheme}'")
+    return f"{ASYNC_DRIVERS[backend]}://{rest}"
+
+# Optional async engine (aiosqlite for SQLite, asyncpg for PostgreSQL)
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DATABASE_ENABLED:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    
+    async_engine = create_async_engine(async_database_url(settings.DATABASE_URL))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
 # Create Base class
 Base = declarative_base()
 
@@ -22,3 +48,64 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def on_commit(db, callback):
+    """Run callback after the session's current transaction commits (see commit below)."""
+    db.info.setdefault("on_commit", []).append(callback)
+
+def commit(db):
+    """Commit the session, then run callbacks registered with on_commit."""
+    try:
+        db.commit()
+    except Exception:
+        db.info.pop("on_commit", None)
+        raise
+    for callback in db.info.pop("on_commit", []):
+        callback()
+
+async def commit_async(db):
+    """commit() for an AsyncSession; callbacks registered on its sync session run the same way."""
+    try:
+        await db.commit()
+    except Exception:
+        db.info.pop("on_commit", None)
+        raise
+    for callback in db.info.pop("on_commit", []):
+        callback()
+
+def create_missing_indexes():
+    """Create indexes declared on models whose tables already existed (create_all skips them)."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+def add_missing_columns() -> set:
+    """
+    Add model columns missing from tables that already existed (create_all skips them).
+    Columns are added with their server default so existing rows get a value.
+    Returns the added columns as "table.column" names.
+    """
+    inspector = inspect(engine)
+    added = set()
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    ddl += f" DEFAULT {getattr(default, 'text', default)}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                connection.execute(text(ddl))
+                added.add(f"{table.name}.{column.name}")
+    return added
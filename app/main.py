@@ -1,13 +1,22 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from app.core.database import engine, get_db
-from app.core.database import Base
+from app.core.database import engine, async_engine, get_db, create_missing_indexes, add_missing_columns
+from app.core.database import Base, SessionLocal
 from app.api import movies, theaters, halls, seats, shows, bookings, users, analytics
 from app.core.config import settings
+from app.utils.show_counters import recount_show_counters
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+added_columns = add_missing_columns()
+create_missing_indexes()
+
+# Backfill the show counters when upgrading a database created before they existed
+if added_columns & {"shows.seats_sold", "shows.hall_capacity"}:
+    with SessionLocal() as db:
+        recount_show_counters(db)
+        db.commit()
 
 # Create FastAPI app
 app = FastAPI(
@@ -35,6 +44,11 @@ app.include_router(bookings.router, prefix=settings.API_V1_STR, tags=["bookings"
 app.include_router(users.router, prefix=settings.API_V1_STR, tags=["users"])
 app.include_router(analytics.router, prefix=settings.API_V1_STR, tags=["analytics"])
 
+# Async routes are only served when the async engine is enabled
+if async_engine is not None:
+    from app.api import aio
+    app.include_router(aio.router, prefix=settings.API_V1_STR, tags=["async"])
+
 @app.get("/")
 async def root():
     return {
@@ -4,6 +4,8 @@ from .seat import Seat
 from .show import Show
 from .booking import Booking
 from .user import User
+from .idempotency_key import IdempotencyRecord
+from .seat_hold import SeatHoldRecord
 
 __all__ = [
     "Movie",
@@ -12,5 +14,7 @@ __all__ = [
     "Seat",
     "Show",
     "Booking",
-    "User"
+    "User",
+    "IdempotencyRecord",
+    "SeatHoldRecord"
 ]
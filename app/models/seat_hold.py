@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.core.database import Base
+
+class SeatHoldRecord(Base):
+    """One held seat. Rows live until their hold is confirmed, released or expires."""
+    __tablename__ = "seat_holds"
+    __table_args__ = (
+        Index("ix_seat_holds_show_seat", "show_id", "seat_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    hold_token = Column(String(32), nullable=False, index=True)
+    show_id = Column(Integer, ForeignKey("shows.id", ondelete="CASCADE"), nullable=False)
+    seat_id = Column(Integer, ForeignKey("seats.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<SeatHoldRecord(hold_token={self.hold_token}, show_id={self.show_id}, seat_id={self.seat_id})>"
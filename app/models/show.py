@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Time
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Time, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class Show(Base):
     __tablename__ = "shows"
+    __table_args__ = (
+        # Show search and the schedule index look shows up by movie or by hall, then date
+        Index("ix_shows_movie_date_start", "movie_id", "show_date", "start_time"),
+        Index("ix_shows_hall_date", "hall_id", "show_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     movie_id = Column(Integer, ForeignKey("movies.id"), nullable=False)
@@ -14,6 +19,11 @@ class Show(Base):
     end_time = Column(Time, nullable=False)
     price_multiplier = Column(Float, default=1.0)  # Multiplier for base movie price
     status = Column(String(20), default="active")  # active, cancelled, completed
+    # Denormalized counters, kept in step with bookings and seats in the same transaction
+    seats_sold = Column(Integer, nullable=False, default=0, server_default="0")
+    hall_capacity = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped on every booking or cancellation; booking writes are conditional on it
+    seat_map_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
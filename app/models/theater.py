@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -28,6 +28,9 @@ class Hall(Base):
     name = Column(String(100), nullable=False)
     theater_id = Column(Integer, ForeignKey("theaters.id"), nullable=False)
     total_rows = Column(Integer, nullable=False)
+    # Compact layout (seats per row, aisle seats, seat-type bands; see app/utils/seat_layout.py).
+    # NULL once seats were added or removed one by one; the seats table is authoritative then.
+    layout_spec = Column(JSON(none_as_null=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
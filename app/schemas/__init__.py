@@ -1,8 +1,18 @@
 from .movie import MovieCreate, MovieUpdate, MovieResponse
-from .theater import TheaterCreate, TheaterUpdate, TheaterResponse, HallCreate, HallUpdate, HallResponse
-from .booking import BookingCreate, BookingResponse, GroupBookingRequest, BookingSuggestion
-from .seat import SeatCreate, SeatResponse, SeatLayoutResponse
-from .show import ShowCreate, ShowUpdate, ShowResponse
+from .theater import TheaterCreate, TheaterUpdate, TheaterResponse, HallCreate, HallUpdate, HallResponse, HallGeometryCacheStats
+from .booking import (
+    BookingCreate, BookingResponse, GroupBookingRequest, BookingSuggestion, SeatHoldCreate, SeatHoldResponse,
+    BookingCancellationRequest, BookingCancellationResponse, ShowCancellationResponse,
+    WaitlistJoin, WaitlistEntryResponse
+)
+from .seat import (
+    SeatCreate, SeatResponse, SeatLayoutResponse, HallLayout, BulkLayoutRequest, HallLayoutResult, BulkLayoutResponse,
+    SeatTypeBand, HallLayoutSpec, CloneLayoutRequest
+)
+from .show import (
+    ShowCreate, ShowUpdate, ShowResponse, ShowScheduleTemplate, BulkShowResponse, ShowSearchResult, ShowSearchResponse,
+    SeatMapContentionResponse, SeatMapResponse, FreeSlotResponse
+)
 from .user import UserCreate, UserUpdate, UserResponse, UserLogin
 from .analytics import (
     MovieAnalyticsResponse,
@@ -18,9 +28,16 @@ from .analytics import (
 __all__ = [
     "MovieCreate", "MovieUpdate", "MovieResponse",
     "TheaterCreate", "TheaterUpdate", "TheaterResponse",
-    "HallCreate", "HallUpdate", "HallResponse",
+    "HallCreate", "HallUpdate", "HallResponse", "HallGeometryCacheStats",
     "SeatCreate", "SeatResponse", "SeatLayoutResponse",
-    "ShowCreate", "ShowUpdate", "ShowResponse",
+    "HallLayout", "BulkLayoutRequest", "HallLayoutResult", "BulkLayoutResponse",
+    "SeatTypeBand", "HallLayoutSpec", "CloneLayoutRequest",
+    "ShowCreate", "ShowUpdate", "ShowResponse", "ShowScheduleTemplate", "BulkShowResponse",
+    "ShowSearchResult", "ShowSearchResponse",
+    "SeatMapContentionResponse", "SeatMapResponse", "FreeSlotResponse",
     "BookingCreate", "BookingResponse", "GroupBookingRequest", "BookingSuggestion",
+    "SeatHoldCreate", "SeatHoldResponse",
+    "BookingCancellationRequest", "BookingCancellationResponse", "ShowCancellationResponse",
+    "WaitlistJoin", "WaitlistEntryResponse",
     "UserCreate", "UserUpdate", "UserResponse", "UserLogin"
 ]
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 from datetime import datetime, date, time
+from app.core.config import settings
 
 class BookingBase(BaseModel):
     show_id: int = Field(..., gt=0)
@@ -39,3 +40,68 @@ class BookingSuggestion(BaseModel):
     
     class Config:
         from_attributes = True
+
+class SeatHoldCreate(BaseModel):
+    show_id: int = Field(..., gt=0)
+    user_id: int = Field(..., gt=0)
+    seat_ids: Optional[List[int]] = Field(None, min_items=1)
+    num_seats: Optional[int] = Field(None, gt=0)  # hold the first consecutive block instead of specific seats
+    ttl_seconds: int = Field(default=settings.SEAT_HOLD_TTL_SECONDS, gt=0, le=settings.SEAT_HOLD_MAX_TTL_SECONDS)
+    
+    @model_validator(mode="after")
+    def check_seats(self):
+        if (self.seat_ids is None) == (self.num_seats is None):
+            raise ValueError("Provide exactly one of seat_ids or num_seats")
+        return self
+
+class SeatHoldResponse(BaseModel):
+    hold_token: str
+    show_id: int
+    user_id: int
+    seat_ids: List[int]
+    expires_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class BookingCancellationRequest(BaseModel):
+    booking_ids: List[int] = Field(default_factory=list)
+    booking_references: List[str] = Field(default_factory=list)
+    
+    @model_validator(mode="after")
+    def check_bookings(self):
+        if not self.booking_ids and not self.booking_references:
+            raise ValueError("Provide booking_ids and/or booking_references")
+        return self
+
+class BookingCancellationResponse(BaseModel):
+    requested: int
+    cancelled: int
+    refund_total: float
+    cancelled_booking_ids: List[int]
+
+class ShowCancellationResponse(BaseModel):
+    show_id: int
+    status: str
+    cancelled_bookings: int
+    refund_total: float
+
+class WaitlistJoin(BaseModel):
+    show_id: int = Field(..., gt=0)
+    user_id: int = Field(..., gt=0)
+    num_seats: int = Field(..., gt=0)
+
+class WaitlistEntryResponse(BaseModel):
+    entry_id: str
+    show_id: int
+    user_id: int
+    num_seats: int
+    status: str  # waiting, offered
+    position: Optional[int] = None  # place in the queue while waiting
+    hold_token: Optional[str] = None  # set once seats are offered; confirm it like any hold
+    seat_ids: Optional[List[int]] = None
+    expires_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -29,3 +29,35 @@ class SeatLayoutResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class SeatTypeBand(BaseModel):
+    first_row: int = Field(..., gt=0)
+    last_row: int = Field(..., gt=0)
+    seat_type: str = Field(..., max_length=20)
+
+class HallLayout(BaseModel):
+    hall_id: int = Field(..., gt=0)
+    seats_per_row: Dict[int, int]  # row_number -> number of seats
+    aisle_seats: Optional[List[int]] = None  # seat numbers next to an aisle; defaults to LAYOUT_DEFAULT_AISLE_SEATS
+    seat_type_bands: List[SeatTypeBand] = Field(default_factory=list)  # rows outside every band are standard
+
+class HallLayoutSpec(BaseModel):
+    seats_per_row: Dict[int, int]
+    aisle_seats: List[int]
+    seat_type_bands: List[SeatTypeBand]
+    first_seat_id: Optional[int] = None  # seats were created with consecutive IDs from here, row-major
+
+class CloneLayoutRequest(BaseModel):
+    hall_ids: List[int] = Field(..., min_items=1)  # target halls, which must have no seats yet
+
+class BulkLayoutRequest(BaseModel):
+    halls: List[HallLayout] = Field(..., min_items=1)
+
+class HallLayoutResult(BaseModel):
+    hall_id: int
+    seats_created: int
+    seat_ids: List[int]  # row-major order
+
+class BulkLayoutResponse(BaseModel):
+    seats_created: int
+    halls: List[HallLayoutResult]
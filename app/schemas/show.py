@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional, Union
 from datetime import datetime, date, time
 
 class ShowBase(BaseModel):
@@ -21,10 +21,75 @@ class ShowUpdate(BaseModel):
     price_multiplier: Optional[float] = Field(None, ge=0.0)
     status: Optional[str] = Field(None, max_length=20)
 
+class ShowScheduleTemplate(BaseModel):
+    movie_ids: List[int] = Field(..., min_items=1)  # each hall runs these in turn through the day's start times
+    hall_ids: List[int] = Field(..., min_items=1)
+    start_times: List[time] = Field(..., min_items=1)  # daily; end times follow from the movie's duration
+    start_date: date
+    end_date: date  # inclusive
+    price_multiplier: float = Field(default=1.0, ge=0.0)
+
+class BulkShowResponse(BaseModel):
+    shows_created: int
+    days: int
+    show_id_ranges: List[List[int]]  # [first_id, last_id] runs of the new show IDs
+
 class ShowResponse(ShowBase):
     id: int
+    seats_sold: int = 0
+    hall_capacity: int = 0
+    seat_map_version: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
+
+class ShowSearchResult(BaseModel):
+    id: int
+    movie_id: int
+    movie_title: str
+    genre: Optional[str] = None
+    language: Optional[str] = None
+    hall_id: int
+    hall_name: str
+    theater_id: int
+    theater_name: str
+    city: str
+    show_date: date
+    start_time: time
+    end_time: time
+    price_multiplier: float
+    status: str
+    hall_capacity: int
+    available_seats: int  # hall_capacity - seats_sold; seats on hold are not subtracted
+
+class ShowSearchResponse(BaseModel):
+    shows: List[ShowSearchResult]
+    next_cursor: Optional[str] = None  # pass as `cursor` for the next page; None on the last page
+
+class SeatMapContentionResponse(BaseModel):
+    show_id: int
+    writes: int  # conditional booking writes attempted
+    conflicts: int  # attempts rejected because the seat map version had moved on
+    exhausted: int  # bookings that gave up after SEAT_MAP_MAX_RETRIES retries
+    conflict_rate: float
+
+class SeatMapResponse(BaseModel):
+    show_id: int
+    hall_id: int
+    version: int  # Show.seat_map_version
+    etag: str
+    encoding: str  # base64 or rle
+    rows: List[List[int]]  # [row_number, first_seat_id, first_seat_number, count] runs, row-major
+    total_seats: int
+    available_seats: int
+    # One flag per seat in `rows` order (1 = available): base64 bitset, first seat in the
+    # most significant bit, or run lengths alternating available/unavailable, starting with available
+    availability: Union[str, List[int]]
+
+class FreeSlotResponse(BaseModel):
+    # A show of the requested duration may start anywhere from start_time until
+    # end_time minus the duration and cleaning buffer
+    start_time: time
+    end_time: time
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+from .seat import HallLayoutSpec
 
 class TheaterBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -41,8 +42,16 @@ class HallUpdate(BaseModel):
 
 class HallResponse(HallBase):
     id: int
+    layout_spec: Optional[HallLayoutSpec] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
+
+class HallGeometryCacheStats(BaseModel):
+    halls: int  # halls currently cached
+    seats: int
+    hits: int
+    misses: int
+    hit_rate: float
@@ -0,0 +1,137 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, commit, commit_async, is_sqlite
+
+BookingWrite = Callable[[Session], Any]
+
+class BookingShard:
+    """
+    One writer thread. Each tick it drains up to batch_size queued writes and runs
+    them in a single transaction; every write gets its own savepoint so one failing
+    write (e.g. a seat conflict) doesn't undo the others in the batch.
+    """
+
+    def __init__(self, index: int, batch_size: int, tick_seconds: float):
+        self.batch_size = batch_size
+        self.tick_seconds = tick_seconds
+        self.queue: "queue.Queue[Tuple[BookingWrite, Future]]" = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=f"booking-shard-{index}", daemon=True)
+        self.thread.start()
+
+    def _collect(self) -> List[Tuple[BookingWrite, Future]]:
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.tick_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            outcomes = []
+            db = SessionLocal(expire_on_commit=False)
+            try:
+                if is_sqlite:
+                    # pysqlite only opens a transaction before DML, which would turn each
+                    # savepoint into its own commit; take the write lock once for the batch
+                    db.execute(text("BEGIN IMMEDIATE"))
+
+                for write, future in batch:
+                    pending = len(db.info.get("on_commit", []))
+                    savepoint = db.begin_nested()
+                    try:
+                        result = write(db)
+                        if savepoint.is_active:
+                            savepoint.commit()
+                        outcomes.append((future, result, None))
+                    except Exception as e:
+                        if savepoint.is_active:
+                            savepoint.rollback()
+                        # Drop after-commit callbacks registered by the failed write
+                        del db.info.get("on_commit", [])[pending:]
+                        outcomes.append((future, None, e))
+
+                commit(db)
+            except Exception as e:
+                db.rollback()
+                outcomes = [(future, None, e) for _, future in batch]
+            finally:
+                db.close()
+
+            for future, result, error in outcomes:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+class BookingExecutor:
+    """
+    Serializes booking writes per show. Every write for a show_id goes to the same
+    shard (show_id modulo the shard count), so each show's seat state has a single
+    writer in this process and many small writes share one commit per tick.
+    To keep a single writer across several API processes, route requests for a show
+    to the same process (e.g. hash on show_id at the load balancer).
+    """
+
+    def __init__(self, shards: int, batch_size: int, tick_seconds: float):
+        self.shards = [BookingShard(index, batch_size, tick_seconds) for index in range(shards)]
+
+    def submit(self, show_id: int, write: BookingWrite) -> Future:
+        future: Future = Future()
+        self.shards[show_id % len(self.shards)].queue.put((write, future))
+        return future
+
+    def run(self, show_id: int, write: BookingWrite) -> Any:
+        """Submit a write and block until its batch has committed."""
+        return self.submit(show_id, write).result()
+
+# Optional per-process executor; None unless BOOKING_EXECUTOR_ENABLED is set
+booking_executor: Optional[BookingExecutor] = None
+if settings.BOOKING_EXECUTOR_ENABLED:
+    booking_executor = BookingExecutor(
+        settings.BOOKING_EXECUTOR_SHARDS,
+        settings.BOOKING_EXECUTOR_BATCH_SIZE,
+        settings.BOOKING_EXECUTOR_TICK_MS / 1000
+    )
+
+def execute_write(db: Session, show_id: int, write: BookingWrite) -> Any:
+    """
+    Run a booking write for a show and commit it.
+    With the executor enabled the write runs on the show's shard in a shared batch
+    transaction; otherwise it runs on the request's session and commits immediately.
+    """
+    if booking_executor is not None:
+        # End the request's read transaction first so it doesn't hold a pooled
+        # connection (or an SQLite read lock) while waiting on the shard
+        db.commit()
+        return booking_executor.run(show_id, write)
+
+    result = write(db)
+    commit(db)
+    return result
+
+async def execute_write_async(db, show_id: int, write: BookingWrite) -> Any:
+    """
+    execute_write for an AsyncSession: the write runs through run_sync on the request's
+    session, or on the show's shard with the shard's future awaited instead of blocked on.
+    """
+    if booking_executor is not None:
+        await db.commit()
+        return await asyncio.wrap_future(booking_executor.submit(show_id, write))
+
+    result = await db.run_sync(write)
+    await commit_async(db)
+    return result
@@ -1,88 +1,249 @@
-import uuid
-from typing import List, Dict, Optional, Tuple
+import asyncio
+import random
+import time
+import numpy as np
+from collections import defaultdict
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from app.models import Show, Seat, Booking, Movie, Theater, Hall
+from sqlalchemy import and_, insert, update
+from sqlalchemy.exc import IntegrityError
+from app.models import Show, Booking, Movie, Theater, Hall
 from app.schemas.booking import BookingSuggestion
+from app.utils.seat_index import seat_index
+from app.utils.hall_geometry import hall_geometry
+from app.utils.seat_holds import delete_hold, held_seats, seat_holds
+from app.utils.seat_quality import quality_maps
+from app.utils.reference_generator import BookingReferenceGenerator
+from app.utils.show_counters import record_seat_change
+from app.utils.booking_executor import booking_executor, execute_write, execute_write_async
+from app.utils.contention import contention_stats
+from app.core.config import settings
+from app.core.database import on_commit
 from datetime import datetime, timedelta
 
-def generate_unique_booking_reference(db: Session) -> str:
-    """Generate a unique booking reference that doesn't exist in the database."""
-    from app.models.booking import Booking
-    import time
-    import uuid
-    import random
+reference_generator = BookingReferenceGenerator(node_id=settings.BOOKING_NODE_ID)
+
+# Candidate shows whose seat state is loaded together when looking for alternatives
+ALTERNATIVES_BATCH_SIZE = 20
+
+def generate_booking_reference() -> str:
+    """Generate a unique booking reference without touching the database."""
+    return reference_generator.next()
+
+class SeatConflictError(Exception):
+    """Raised when seats were booked by a concurrent request between the check and the insert."""
     
-    max_attempts = 20
+    def __init__(self, seat_ids: List[int]):
+        self.seat_ids = seat_ids
+        super().__init__(f"Seats already booked: {seat_ids}")
+
+class SeatsHeldError(SeatConflictError):
+    """Raised when seats are under another customer's hold, possibly taken in another process."""
+
+class SeatMapVersionConflict(Exception):
+    """Raised when a show's seat map changed since the version a booking write was based on."""
     
-    for attempt in range(max_attempts):
-        # Add a small delay to ensure uniqueness
-        if attempt > 0:
-            time.sleep(0.001)  # 1 millisecond delay
-        
-        # Method 1: UUID + timestamp + random
-        if attempt < 10:
-            unique_id = str(uuid.uuid4()).replace('-', '')[:12].upper()
-            timestamp = int(time.time() * 1000000)  # Microseconds
-            random_chars = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=6))
-            reference = f"BK{timestamp}{unique_id}{random_chars}"
-        
-        # Method 2: Nanosecond timestamp + longer random string
-        elif attempt < 15:
-            timestamp = int(time.time() * 1000000000)  # Nanoseconds
-            random_chars = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=15))
-            reference = f"BK{timestamp}{random_chars}"
-        
-        # Method 3: Maximum uniqueness approach
-        else:
-            timestamp = int(time.time() * 1000000000000)  # Picoseconds
-            random_chars = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=20))
-            reference = f"BK{timestamp}{random_chars}"
-        
-        # Check if this reference already exists
-        existing = db.query(Booking).filter(Booking.booking_reference == reference).first()
-        if not existing:
-            return reference
-    
-    # If we still can't generate a unique one, use a completely different approach
-    import hashlib
-    timestamp = int(time.time() * 1000000000000000)  # Femtoseconds
-    random_data = str(uuid.uuid4()) + str(random.random()) + str(time.time())
-    hash_object = hashlib.md5(random_data.encode())
-    hash_hex = hash_object.hexdigest().upper()[:20]
-    return f"BK{timestamp}{hash_hex}"
+    def __init__(self, show_id: int):
+        self.show_id = show_id
+        super().__init__(f"Seat map of show {show_id} changed concurrently")
 
-def generate_booking_reference() -> str:
-    """Generate a unique booking reference."""
-    import time
-    import random
+class ShowNotBookable(Exception):
+    """Raised when a show can't take bookings: it doesn't exist, isn't active or has already started."""
     
-    # Get current timestamp in milliseconds
-    timestamp = int(time.time() * 1000)
+    def __init__(self, show_id: int, reason: str, status: Optional[str] = None):
+        self.show_id = show_id
+        self.reason = reason  # not_found, inactive or started
+        self.status = status
+        super().__init__(f"Show {show_id} can't be booked ({reason})")
+
+def check_show_bookable(db: Session, show_id: int):
+    """Raise ShowNotBookable unless the show is active and hasn't started yet."""
+    show = db.query(Show.status, Show.show_date, Show.start_time).filter(Show.id == show_id).first()
+    if show is None:
+        raise ShowNotBookable(show_id, "not_found")
+    if show.status != "active":
+        raise ShowNotBookable(show_id, "inactive", show.status)
+    if datetime.combine(show.show_date.date(), show.start_time) <= datetime.now():
+        raise ShowNotBookable(show_id, "started")
+
+def book_seats(db: Session, show_id: int, user_id: int, seat_ids: List[int], seat_prices: Dict[int, float],
+               expected_version: Optional[int] = None, hold_token: Optional[str] = None) -> list:
+    """
+    Book seats for a show with a single multi-row INSERT ... RETURNING inside a savepoint.
+    The partial unique index on active (show_id, seat_id) makes this all-or-nothing:
+    if any seat was taken concurrently the savepoint is rolled back and
+    SeatConflictError lists exactly which seats were lost.
+    With expected_version the write also requires the show's seat_map_version to be
+    unchanged, raising SeatMapVersionConflict otherwise (see execute_booking).
+    Raises ShowNotBookable if the show was cancelled or has started (checked in the same
+    transaction, so a hold or quote taken earlier can't outlive the show), and
+    SeatsHeldError if any seat is under a live hold other than hold_token's. The show row
+    is locked before that check, so it can't race a hold being taken; the rows of
+    hold_token's hold are deleted with the bookings that confirm it.
+    The caller commits (see execute_write); the seat index is updated once it does.
+    Returns the inserted booking rows.
+    """
+    rows = [
+        {
+            "user_id": user_id,
+            "show_id": show_id,
+            "seat_id": seat_id,
+            "booking_reference": generate_booking_reference(),
+            "amount_paid": seat_prices[seat_id],
+            "status": "confirmed"
+        }
+        for seat_id in seat_ids
+    ]
     
-    # Generate random string
-    random_chars = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=8))
+    check_show_bookable(db, show_id)
+    bookings_table = Booking.__table__
+    savepoint = db.begin_nested()
+    try:
+        version = record_seat_change(db, show_id, len(rows), expected_version)
+        if version is None:
+            savepoint.rollback()
+            raise SeatMapVersionConflict(show_id)
+        held = held_seats(db, show_id, seat_ids, hold_token)
+        if held:
+            savepoint.rollback()
+            raise SeatsHeldError(held)
+        created = db.execute(insert(bookings_table).returning(*bookings_table.c), rows).all()
+        if hold_token is not None:
+            delete_hold(db, hold_token)
+        savepoint.commit()
+    except IntegrityError:
+        savepoint.rollback()
+        taken = db.query(Booking.seat_id).filter(
+            and_(
+                Booking.show_id == show_id,
+                Booking.seat_id.in_(seat_ids),
+                Booking.status == "confirmed"
+            )
+        ).all()
+        if not taken:
+            raise
+        lost_seats = sorted(seat_id for (seat_id,) in taken)
+        # Another request (possibly in another worker) holds these; bring the index up to date
+        seat_index.mark_booked(show_id, lost_seats)
+        raise SeatConflictError(lost_seats)
     
-    # Combine timestamp and random string
-    reference = f"BK{timestamp}{random_chars}"
+    on_commit(db, lambda: seat_index.mark_booked(show_id, seat_ids, version))
+    return created
+
+def seat_map_backoff_seconds(attempt: int) -> float:
+    """Delay before retrying a contended seat-map write: exponential backoff with full jitter."""
+    backoff_ms = min(settings.SEAT_MAP_RETRY_MAX_MS, settings.SEAT_MAP_RETRY_BASE_MS * 2 ** attempt)
+    return random.uniform(0, backoff_ms) / 1000
+
+def seat_map_backoff(attempt: int):
+    time.sleep(seat_map_backoff_seconds(attempt))
+
+async def seat_map_backoff_async(attempt: int):
+    await asyncio.sleep(seat_map_backoff_seconds(attempt))
+
+def execute_booking(db: Session, show_id: int, write: Callable[[Session, Optional[int]], Any]) -> Any:
+    """
+    Run and commit a booking write conditional on the show's seat-map version.
+    write(session, expected_version) is passed the version the seat index last saw; when
+    another writer (in this or another worker) got there first the seat state is reloaded
+    and the write retried with exponential backoff and full jitter, up to
+    SEAT_MAP_MAX_RETRIES times. Every attempt is counted in contention_stats.
+    With the booking executor the show already has a single writer, so the write is
+    not made conditional.
+    """
+    if booking_executor is not None:
+        return execute_write(db, show_id, lambda session: write(session, None))
     
-    return reference
+    conflicts = 0
+    while True:
+        state = seat_index.get(db, show_id)
+        expected_version = state.version if state is not None else None
+        try:
+            result = execute_write(db, show_id, lambda session: write(session, expected_version))
+        except SeatMapVersionConflict:
+            db.rollback()
+            if conflicts == settings.SEAT_MAP_MAX_RETRIES:
+                contention_stats.record(show_id, conflicts + 1, exhausted=True)
+                raise
+            conflicts += 1
+            seat_index.refresh(db, show_id)
+            seat_map_backoff(conflicts)
+            continue
+        contention_stats.record(show_id, conflicts)
+        return result
+
+async def execute_booking_async(db, show_id: int, write: Callable[[Session, Optional[int]], Any]) -> Any:
+    """execute_booking for an AsyncSession: the same retries, with the backoff awaited."""
+    if booking_executor is not None:
+        return await execute_write_async(db, show_id, lambda session: write(session, None))
+    
+    conflicts = 0
+    while True:
+        state = await db.run_sync(lambda session: seat_index.get(session, show_id))
+        expected_version = state.version if state is not None else None
+        try:
+            result = await execute_write_async(db, show_id, lambda session: write(session, expected_version))
+        except SeatMapVersionConflict:
+            await db.rollback()
+            if conflicts == settings.SEAT_MAP_MAX_RETRIES:
+                contention_stats.record(show_id, conflicts + 1, exhausted=True)
+                raise
+            conflicts += 1
+            await db.run_sync(lambda session: seat_index.refresh(session, show_id))
+            await seat_map_backoff_async(conflicts)
+            continue
+        contention_stats.record(show_id, conflicts)
+        return result
+
+def cancel_bookings(db: Session, *criteria) -> list:
+    """
+    Cancel every confirmed booking matching criteria with one set-based UPDATE ... RETURNING.
+    Bookings that are already cancelled are left alone, so repeating a cancellation is harmless.
+    Show.seats_sold and seat_map_version are updated in the same transaction. The caller commits;
+    the seat index frees the seats once it does.
+    Returns (id, show_id, seat_id, amount_paid) rows for the bookings that were cancelled.
+    """
+    bookings_table = Booking.__table__
+    cancelled = db.execute(
+        update(bookings_table)
+        .where(bookings_table.c.status == "confirmed", *criteria)
+        .values(status="cancelled")
+        .returning(
+            bookings_table.c.id,
+            bookings_table.c.show_id,
+            bookings_table.c.seat_id,
+            bookings_table.c.amount_paid
+        )
+    ).all()
+    
+    freed = defaultdict(list)
+    for row in cancelled:
+        freed[row.show_id].append(row.seat_id)
+    versions = {
+        show_id: record_seat_change(db, show_id, -len(seat_ids))
+        for show_id, seat_ids in freed.items()
+    }
+    
+    def free_seats():
+        for show_id, seat_ids in freed.items():
+            seat_index.mark_free(show_id, seat_ids, versions[show_id])
+    
+    on_commit(db, free_seats)
+    return cancelled
 
 def check_seat_availability(db: Session, show_id: int, seat_ids: List[int]) -> Tuple[bool, List[int]]:
     """
     Check if seats are available for booking.
     Returns (is_available, unavailable_seats)
     """
-    # Get existing bookings for this show and seats
-    existing_bookings = db.query(Booking).filter(
-        and_(
-            Booking.show_id == show_id,
-            Booking.seat_id.in_(seat_ids),
-            Booking.status == "confirmed"
-        )
-    ).all()
+    # Served from the in-memory seat index; only the first check for a show hits the database.
+    # Seats held by another customer count as unavailable.
+    seat_holds.expire()
+    state = seat_index.get(db, show_id)
+    if state is None:
+        return True, []
     
-    unavailable_seats = [booking.seat_id for booking in existing_bookings]
+    unavailable_seats = state.unavailable(seat_ids)
     is_available = len(unavailable_seats) == 0
     
     return is_available, unavailable_seats
@@ -92,129 +253,115 @@ def find_consecutive_seats(db: Session, show_id: int, num_seats: int) -> List[in
     Find consecutive available seats for a group booking.
     Returns list of seat IDs if found, empty list otherwise.
     """
-    # Get all seats for this show's hall
-    show = db.query(Show).filter(Show.id == show_id).first()
-    if not show:
+    # The seat index keeps a free-run tree per show, so this is a logarithmic lookup
+    # rather than a scan over every seat in the hall. Held seats are not free.
+    seat_holds.expire()
+    state = seat_index.get(db, show_id)
+    if state is None:
         return []
     
-    # Get all seats in the hall, ordered by row and seat number
-    hall_seats = db.query(Seat).filter(Seat.hall_id == show.hall_id).order_by(
-        Seat.row_number, Seat.seat_number
-    ).all()
+    return state.find_block(num_seats)
+
+def find_best_seats(db: Session, show_id: int, num_seats: int) -> List[int]:
+    """
+    Find the best-scoring block of consecutive available seats for a group,
+    using the hall's precomputed seat-quality map.
+    Returns list of seat IDs if found, empty list otherwise.
+    """
+    seat_holds.expire()
+    state = seat_index.get(db, show_id)
+    if state is None:
+        return []
     
-    # Get booked seats for this show
-    booked_seat_ids = set()
-    bookings = db.query(Booking).filter(
-        and_(
-            Booking.show_id == show_id,
-            Booking.status == "confirmed"
-        )
-    ).all()
-    booked_seat_ids = {booking.seat_id for booking in bookings}
-    
-    # Group seats by row
-    seats_by_row = {}
-    for seat in hall_seats:
-        if seat.row_number not in seats_by_row:
-            seats_by_row[seat.row_number] = []
-        seats_by_row[seat.row_number].append(seat)
-    
-    # Find consecutive seats in each row
-    for row_num, row_seats in seats_by_row.items():
-        # Sort seats by seat number within the row
-        row_seats.sort(key=lambda x: x.seat_number)
-        
-        # Get available seats in this row
-        available_seats = [seat for seat in row_seats if seat.id not in booked_seat_ids]
-        
-        if len(available_seats) >= num_seats:
-            # Check for consecutive seats by seat number
-            for i in range(len(available_seats) - num_seats + 1):
-                consecutive_seats = available_seats[i:i + num_seats]
-                
-                # Check if these seats are actually consecutive by seat number
-                seat_numbers = [seat.seat_number for seat in consecutive_seats]
-                if seat_numbers == list(range(seat_numbers[0], seat_numbers[0] + num_seats)):
-                    seat_ids = [seat.id for seat in consecutive_seats]
-                    
-                    # Verify these seats are still available (double-check)
-                    is_available, _ = check_seat_availability(db, show_id, seat_ids)
-                    if is_available:
-                        return seat_ids
-    
-    return []
+    quality_map = quality_maps.get(db, state)
+    start = quality_map.best_block(np.array(state.free_mask(), dtype=bool), num_seats)
+    if start < 0:
+        return []
+    
+    return state.cells[start:start + num_seats]
 
 def find_alternative_bookings(db: Session, movie_id: int, num_seats: int, 
-                            preferred_date: Optional[datetime] = None) -> List[BookingSuggestion]:
+                            preferred_date: Optional[datetime] = None,
+                            exclude_show_id: Optional[int] = None,
+                            limit: int = settings.ALTERNATIVES_LIMIT) -> List[BookingSuggestion]:
     """
     Find alternative booking options when requested seats are not available.
+    Candidate shows in the next ALTERNATIVES_WINDOW_DAYS are fetched together with their
+    hall and theater in one joined query, ranked by distance from preferred_date and then
+    by start time, and checked against the seat index in batches (one seats query and one
+    bookings query per batch at most) until `limit` suggestions are found.
     """
-    suggestions = []
+    if limit <= 0 or num_seats <= 0:
+        return []
     
-    # Get all shows for this movie
-    shows = db.query(Show).filter(
+    movie = db.query(Movie.title).filter(Movie.id == movie_id).first()
+    if not movie:
+        return []
+    
+    window_start = datetime.combine(datetime.now().date(), datetime.min.time())
+    window_end = window_start + timedelta(days=settings.ALTERNATIVES_WINDOW_DAYS + 1)
+    
+    candidates = db.query(
+        Show.id,
+        Show.hall_id,
+        Show.show_date,
+        Show.start_time,
+        Hall.name.label("hall_name"),
+        Theater.name.label("theater_name")
+    ).join(Hall, Hall.id == Show.hall_id).join(Theater, Theater.id == Hall.theater_id).filter(
         and_(
             Show.movie_id == movie_id,
             Show.status == "active",
-            Show.show_date >= datetime.now().date()
+            Show.show_date >= window_start,
+            Show.show_date < window_end
         )
     ).order_by(Show.show_date, Show.start_time).all()
     
-    for show in shows:
-        # Skip if it's the same show that was already tried
-        if preferred_date and show.show_date == preferred_date.date():
-            continue
-            
-        consecutive_seats = find_consecutive_seats(db, show.id, num_seats)
-        if consecutive_seats:
-            # Get movie and theater details
-            movie = db.query(Movie).filter(Movie.id == movie_id).first()
-            hall = db.query(Hall).filter(Hall.id == show.hall_id).first()
-            theater = db.query(Theater).filter(Theater.id == hall.theater_id).first()
+    # Skip the show that was already tried
+    candidates = [show for show in candidates if show.id != exclude_show_id]
+    
+    if preferred_date:
+        # Stable sort: shows closest to the preferred day first, each day still in start time order
+        target = preferred_date.date() if isinstance(preferred_date, datetime) else preferred_date
+        candidates.sort(key=lambda show: abs((show.show_date.date() - target).days))
+    
+    seat_holds.expire()
+    suggestions = []
+    batch_size = max(limit, ALTERNATIVES_BATCH_SIZE)
+    
+    for offset in range(0, len(candidates), batch_size):
+        batch = candidates[offset:offset + batch_size]
+        states = seat_index.get_many(db, [(show.id, show.hall_id) for show in batch])
+        
+        for show in batch:
+            consecutive_seats = states[show.id].find_block(num_seats)
+            if not consecutive_seats:
+                continue
             
-            suggestion = BookingSuggestion(
+            suggestions.append(BookingSuggestion(
                 show_id=show.id,
                 movie_title=movie.title,
-                theater_name=theater.name,
-                hall_name=hall.name,
+                theater_name=show.theater_name,
+                hall_name=show.hall_name,
                 show_date=show.show_date,
                 start_time=show.start_time,
                 available_seats=consecutive_seats,
                 total_available=len(consecutive_seats)
-            )
-            suggestions.append(suggestion)
+            ))
+            if len(suggestions) >= limit:
+                return suggestions
     
     return suggestions
 
-def calculate_booking_amount(db: Session, show_id: int, num_seats: int) -> float:
-    """Calculate the total amount for booking."""
-    show = db.query(Show).filter(Show.id == show_id).first()
-    if not show:
-        return 0.0
-    
-    movie = db.query(Movie).filter(Movie.id == show.movie_id).first()
-    if not movie:
-        return 0.0
-    
-    base_price = movie.base_price
-    price_multiplier = show.price_multiplier
-    total_amount = base_price * price_multiplier * num_seats
-    
-    return round(total_amount, 2)
-
 def validate_seats_in_same_show(db: Session, show_id: int, seat_ids: List[int]) -> bool:
     """Validate that all seats belong to the same show's hall."""
     if not seat_ids:
         return False
     
-    show = db.query(Show).filter(Show.id == show_id).first()
-    if not show:
+    state = seat_index.get(db, show_id)
+    if state is None:
         return False
     
-    # Check if all seats belong to the same hall
-    seats = db.query(Seat).filter(Seat.id.in_(seat_ids)).all()
-    for seat in seats:
-        if seat.hall_id != show.hall_id:
-            return False
-    
-    return True
+    # Check if all seats belong to the show's hall, using the cached hall geometry
+    geometry = hall_geometry.get(db, state.hall_id)
+    return all(seat_id in geometry for seat_id in seat_ids)
@@ -0,0 +1,40 @@
+import threading
+from typing import Dict, List
+
+class ContentionStats:
+    """
+    Per-show counters for conditional seat-map writes. A high conflict rate on a show
+    means several writers keep racing for it (a hot spot), e.g. during a flash sale.
+    """
+
+    def __init__(self):
+        # show_id -> [writes, conflicts, exhausted]
+        self._shows: Dict[int, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, show_id: int, conflicts: int, exhausted: bool = False):
+        """Record one booking: the conflicts it retried through and whether it gave up."""
+        with self._lock:
+            counters = self._shows.setdefault(show_id, [0, 0, 0])
+            counters[0] += conflicts + (0 if exhausted else 1)
+            counters[1] += conflicts
+            counters[2] += 1 if exhausted else 0
+
+    def get(self, show_id: int) -> dict:
+        writes, conflicts, exhausted = self._shows.get(show_id, (0, 0, 0))
+        return {
+            "show_id": show_id,
+            "writes": writes,
+            "conflicts": conflicts,
+            "exhausted": exhausted,
+            "conflict_rate": round(conflicts / writes, 4) if writes else 0.0
+        }
+
+    def top(self, limit: int) -> List[dict]:
+        """Shows with the most conflicts first."""
+        with self._lock:
+            show_ids = sorted(self._shows, key=lambda show_id: self._shows[show_id][1], reverse=True)[:limit]
+        return [self.get(show_id) for show_id in show_ids]
+
+# Shared per-process stats, filled by execute_booking
+contention_stats = ContentionStats()
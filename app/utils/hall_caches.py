@@ -0,0 +1,9 @@
+from app.utils.hall_geometry import hall_geometry
+from app.utils.seat_index import seat_index
+from app.utils.seat_quality import quality_maps
+
+def invalidate_hall_caches(hall_id: int):
+    """Drop every in-memory structure derived from a hall's seats. Call after seat or hall changes are committed."""
+    hall_geometry.invalidate(hall_id)
+    seat_index.invalidate_hall(hall_id)
+    quality_maps.invalidate(hall_id)
@@ -0,0 +1,155 @@
+import threading
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models import Seat, Hall
+from app.utils.seat_layout import spec_geometry
+
+class HallGeometry:
+    """
+    Immutable seat geometry of one hall: parallel arrays sorted by (row_number, seat_number).
+    Seat types are stored as small codes into `type_names`; aisle flags as one byte per seat.
+    """
+
+    __slots__ = ("hall_id", "seat_ids", "row_numbers", "seat_numbers", "type_codes", "type_names",
+                 "aisles", "created_at", "_index")
+
+    def __init__(self, hall_id: int, seats: Iterable[Tuple[int, int, int, Optional[str], bool, Optional[datetime]]]):
+        ordered = sorted(seats, key=lambda seat: (seat[1], seat[2]))
+        type_names: List[Optional[str]] = []
+        codes: Dict[Optional[str], int] = {}
+        for seat in ordered:
+            if seat[3] not in codes:
+                codes[seat[3]] = len(type_names)
+                type_names.append(seat[3])
+
+        self.hall_id = hall_id
+        self.seat_ids = array("q", (seat[0] for seat in ordered))
+        self.row_numbers = array("i", (seat[1] for seat in ordered))
+        self.seat_numbers = array("i", (seat[2] for seat in ordered))
+        self.type_codes = bytes(codes[seat[3]] for seat in ordered)
+        self.type_names: Tuple[Optional[str], ...] = tuple(type_names)
+        self.aisles = bytes(1 if seat[4] else 0 for seat in ordered)
+        self.created_at: Tuple[Optional[datetime], ...] = tuple(seat[5] for seat in ordered)
+        # seat_id -> position in the arrays
+        self._index: Dict[int, int] = {seat_id: position for position, seat_id in enumerate(self.seat_ids)}
+
+    def __len__(self) -> int:
+        return len(self.seat_ids)
+
+    def __contains__(self, seat_id: int) -> bool:
+        return seat_id in self._index
+
+    def seat_type(self, seat_id: int) -> Optional[str]:
+        return self.type_names[self.type_codes[self._index[seat_id]]]
+
+    def is_aisle(self, seat_id: int) -> bool:
+        return bool(self.aisles[self._index[seat_id]])
+
+    def seats(self) -> Iterator[Tuple[int, int, int, Optional[str]]]:
+        """(seat_id, row_number, seat_number, seat_type) in row-major order."""
+        for position, seat_id in enumerate(self.seat_ids):
+            yield seat_id, self.row_numbers[position], self.seat_numbers[position], self.type_names[self.type_codes[position]]
+
+    def seat_dicts(self) -> List[dict]:
+        """Every seat as a dict matching SeatResponse, in row-major order."""
+        return [
+            {
+                "id": seat_id,
+                "hall_id": self.hall_id,
+                "row_number": self.row_numbers[position],
+                "seat_number": self.seat_numbers[position],
+                "seat_type": self.type_names[self.type_codes[position]],
+                "is_aisle": bool(self.aisles[position]),
+                "created_at": self.created_at[position]
+            }
+            for position, seat_id in enumerate(self.seat_ids)
+        ]
+
+    def seats_per_row(self) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        for row_number in self.row_numbers:
+            counts[row_number] = counts.get(row_number, 0) + 1
+        return counts
+
+class HallGeometryCache:
+    """
+    Process-local HallGeometry per hall. Seat layouts almost never change, so every
+    request that needs a hall's seats reads them from here; entries are dropped by
+    invalidate_hall_caches whenever seats or the hall change.
+    """
+
+    def __init__(self):
+        self._halls: Dict[int, HallGeometry] = {}
+        # Bumped on every invalidation so a load racing with a layout change is not cached
+        self._epochs: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db: Session, hall_id: int) -> HallGeometry:
+        """Return a hall's geometry, loading it on first use (a hall without seats has empty geometry)."""
+        return self.get_many(db, [hall_id])[hall_id]
+
+    def get_many(self, db: Session, hall_ids: Iterable[int]) -> Dict[int, HallGeometry]:
+        """Return geometries for many halls, loading every missing one with a single query."""
+        geometries: Dict[int, HallGeometry] = {}
+        missing = set()
+        for hall_id in hall_ids:
+            geometry = self._halls.get(hall_id)
+            if geometry is not None:
+                geometries[hall_id] = geometry
+            else:
+                missing.add(hall_id)
+
+        with self._lock:
+            self.hits += len(geometries)
+            self.misses += len(missing)
+            epochs = {hall_id: self._epochs.get(hall_id, 0) for hall_id in missing}
+        if not missing:
+            return geometries
+
+        # Halls laid out from a spec are derived from it; only the rest read the seats table
+        seats_by_hall: Dict[int, list] = {hall_id: [] for hall_id in missing}
+        for hall_id, spec in db.query(Hall.id, Hall.layout_spec).filter(
+            Hall.id.in_(missing), Hall.layout_spec.isnot(None)
+        ).all():
+            derived = spec_geometry(spec)
+            if derived is not None:
+                seats_by_hall[hall_id] = derived
+        unspecified = [hall_id for hall_id, seats in seats_by_hall.items() if not seats]
+        if unspecified:
+            for hall_id, *seat in db.query(
+                Seat.hall_id, Seat.id, Seat.row_number, Seat.seat_number, Seat.seat_type, Seat.is_aisle, Seat.created_at
+            ).filter(Seat.hall_id.in_(unspecified)).all():
+                seats_by_hall[hall_id].append(seat)
+
+        for hall_id, seats in seats_by_hall.items():
+            geometry = HallGeometry(hall_id, seats)
+            with self._lock:
+                if self._epochs.get(hall_id, 0) != epochs[hall_id]:
+                    # Seats changed while we were loading; serve this copy but don't cache it
+                    geometries[hall_id] = geometry
+                else:
+                    geometries[hall_id] = self._halls.setdefault(hall_id, geometry)
+        return geometries
+
+    def invalidate(self, hall_id: int):
+        with self._lock:
+            self._epochs[hall_id] = self._epochs.get(hall_id, 0) + 1
+            self._halls.pop(hall_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "halls": len(self._halls),
+                "seats": sum(len(geometry) for geometry in self._halls.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+# Shared per-process cache of hall seat layouts
+hall_geometry = HallGeometryCache()
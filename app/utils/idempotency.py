@@ -0,0 +1,180 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import IdempotencyRecord
+
+class StoredResponse:
+    """The first response produced for an idempotency key."""
+
+    def __init__(self, fingerprint: str, status_code: int, body: Any, deadline: float):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.body = body
+        self.deadline = deadline
+
+class IdempotencyClaim:
+    """An idempotency key reserved by the request that is executing it."""
+
+    def __init__(self, scope: str, key: str, fingerprint: str):
+        self.scope = scope
+        self.key = key
+        self.fingerprint = fingerprint
+        self.status_code: Optional[int] = None
+        self.body: Any = None
+
+class IdempotencyKeyReused(Exception):
+    """Raised when a key is sent again with a different request payload."""
+
+class IdempotencyKeyInProgress(Exception):
+    """Raised when a key is sent again while the first request is still running."""
+
+class IdempotencyStore:
+    """
+    Bounded, TTL-evicting store of responses keyed by (scope, Idempotency-Key).
+    Entries are kept in insertion order, so expired and overflowing keys are always
+    evicted from the front. With persist=True successful responses are also written
+    to the idempotency_keys table in the same transaction as the booking, so replays
+    survive restarts and work across API processes.
+    """
+
+    def __init__(self, max_keys: int, ttl_seconds: int, persist: bool = False):
+        self.max_keys = max_keys
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self._responses: "OrderedDict[Tuple[str, str], StoredResponse]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(payload: Any) -> str:
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def begin(self, db: Session, scope: str, key: str, payload: Any) -> Tuple[Optional[IdempotencyClaim], Optional[StoredResponse]]:
+        """
+        Look up a key before running a request.
+        Returns (None, stored) when the key already has a response to replay,
+        or (claim, None) when the caller should run the request and then call complete().
+        """
+        fingerprint = self.fingerprint(payload)
+        slot = (scope, key)
+        with self._lock:
+            self._evict_expired()
+            stored = self._responses.get(slot)
+            if stored is None:
+                if slot in self._in_flight:
+                    if self._in_flight[slot] != fingerprint:
+                        raise IdempotencyKeyReused(key)
+                    raise IdempotencyKeyInProgress(key)
+                self._in_flight[slot] = fingerprint
+
+        if stored is None and self.persist:
+            try:
+                stored = self._load(db, scope, key)
+            except Exception:
+                with self._lock:
+                    self._in_flight.pop(slot, None)
+                raise
+            if stored is not None:
+                with self._lock:
+                    self._in_flight.pop(slot, None)
+                    self._remember(slot, stored)
+
+        if stored is None:
+            return IdempotencyClaim(scope, key, fingerprint), None
+        if stored.fingerprint != fingerprint:
+            raise IdempotencyKeyReused(key)
+        return None, stored
+
+    def record(self, db: Session, claim: Optional[IdempotencyClaim], status_code: int, body: Any):
+        """
+        Attach a successful response to a claim inside the write's transaction.
+        If another process already stored a response for the key, raises
+        IdempotencyKeyInProgress so the write is rolled back instead of repeated.
+        """
+        if claim is None:
+            return
+        if self.persist:
+            self._persist(db, claim, status_code, body)
+        claim.status_code = status_code
+        claim.body = body
+
+    def _persist(self, db: Session, claim: IdempotencyClaim, status_code: int, body: Any):
+        now = datetime.now(timezone.utc)
+        table = IdempotencyRecord.__table__
+        savepoint = db.begin_nested()
+        try:
+            db.execute(delete(table).where(table.c.expires_at <= now))
+            db.execute(insert(table).values(
+                scope=claim.scope,
+                key=claim.key,
+                fingerprint=claim.fingerprint,
+                status_code=status_code,
+                response_body=json.dumps(body),
+                expires_at=now + timedelta(seconds=self.ttl_seconds)
+            ))
+            savepoint.commit()
+        except IntegrityError:
+            savepoint.rollback()
+            raise IdempotencyKeyInProgress(claim.key)
+
+    def complete(self, claim: IdempotencyClaim, status_code: Optional[int] = None, body: Any = None):
+        """Release a claim and store its response (the recorded one unless given here) for replay."""
+        if status_code is not None:
+            claim.status_code = status_code
+            claim.body = body
+        slot = (claim.scope, claim.key)
+        with self._lock:
+            self._in_flight.pop(slot, None)
+            if claim.status_code is not None:
+                self._remember(slot, StoredResponse(
+                    claim.fingerprint, claim.status_code, claim.body, time.monotonic() + self.ttl_seconds
+                ))
+
+    def abandon(self, claim: IdempotencyClaim):
+        """Release a claim without storing anything, e.g. after a server error, so the key can be retried."""
+        with self._lock:
+            self._in_flight.pop((claim.scope, claim.key), None)
+
+    def _remember(self, slot: Tuple[str, str], stored: StoredResponse):
+        self._responses[slot] = stored
+        self._responses.move_to_end(slot)
+        while len(self._responses) > self.max_keys:
+            self._responses.popitem(last=False)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        while self._responses:
+            if next(iter(self._responses.values())).deadline > now:
+                break
+            self._responses.popitem(last=False)
+
+    def _load(self, db: Session, scope: str, key: str) -> Optional[StoredResponse]:
+        record = db.query(IdempotencyRecord).filter(
+            IdempotencyRecord.scope == scope,
+            IdempotencyRecord.key == key
+        ).first()
+        if record is None:
+            return None
+
+        expires_at = record.expires_at
+        if expires_at.tzinfo is None:  # SQLite drops the offset; values are stored in UTC
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        if remaining <= 0:
+            return None
+        return StoredResponse(record.fingerprint, record.status_code, json.loads(record.response_body), time.monotonic() + remaining)
+
+# Shared per-process store used by the booking API
+idempotency_keys = IdempotencyStore(
+    settings.IDEMPOTENCY_MAX_KEYS,
+    settings.IDEMPOTENCY_TTL_SECONDS,
+    persist=settings.IDEMPOTENCY_PERSIST
+)
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import Show, Movie
+from app.utils.seat_index import ShowSeatState, seat_index
+
+class PriceTable:
+    """Seat prices for one show, keyed by seat type, before any occupancy surge."""
+
+    def __init__(self, show_id: int, movie_id: int, base_price: float, ttl_seconds: int):
+        self.show_id = show_id
+        self.movie_id = movie_id
+        self.base_price = base_price
+        self.deadline = time.monotonic() + ttl_seconds
+        self.prices: Dict[str, float] = {
+            seat_type: base_price * multiplier
+            for seat_type, multiplier in settings.SEAT_TYPE_PRICE_MULTIPLIERS.items()
+        }
+
+    def price(self, seat_type: Optional[str]) -> float:
+        # Seat types without a configured multiplier are charged the base price
+        return self.prices.get(seat_type, self.base_price)
+
+def surge_multiplier(occupancy: float) -> float:
+    """Multiplier of the highest surge tier whose occupancy threshold has been reached."""
+    if not settings.PRICE_SURGE_ENABLED:
+        return 1.0
+    multiplier = 1.0
+    for threshold, tier_multiplier in sorted(settings.PRICE_SURGE_TIERS.items()):
+        if occupancy >= threshold:
+            multiplier = tier_multiplier
+    return multiplier
+
+class PricingEngine:
+    """
+    Process-local price tables per show, loaded with one Show/Movie query and then reused,
+    so quoting a booking reads only memory: seat types and the sold count come from the
+    seat index. Tables are dropped when the show or its movie is updated, and expire after
+    PRICE_TABLE_TTL_SECONDS in case another process made the change.
+    At most max_shows tables are kept; the least recently used is dropped first.
+    """
+
+    def __init__(self, ttl_seconds: int, max_shows: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_shows = max_shows
+        self._tables: "OrderedDict[int, PriceTable]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def table(self, db: Session, show_id: int) -> Optional[PriceTable]:
+        """Return the price table for a show, loading it if needed. None if the show doesn't exist."""
+        with self._lock:
+            table = self._tables.get(show_id)
+            if table is not None and table.deadline > time.monotonic():
+                self._tables.move_to_end(show_id)
+                return table
+
+        row = db.query(Show.movie_id, Show.price_multiplier, Movie.base_price).join(
+            Movie, Movie.id == Show.movie_id
+        ).filter(Show.id == show_id).first()
+        if row is None:
+            return None
+
+        table = PriceTable(show_id, row.movie_id, row.base_price * (row.price_multiplier or 1.0), self.ttl_seconds)
+        with self._lock:
+            self._tables[show_id] = table
+            self._tables.move_to_end(show_id)
+            while len(self._tables) > self.max_shows:
+                self._tables.popitem(last=False)
+        return table
+
+    def quote(self, db: Session, show_id: int, seat_ids: Iterable[int]) -> Optional[Dict[int, float]]:
+        """Price each seat for a show at the current occupancy. None if the show doesn't exist."""
+        table = self.table(db, show_id)
+        state: Optional[ShowSeatState] = seat_index.get(db, show_id)
+        if table is None or state is None:
+            return None
+
+        surge = surge_multiplier(state.occupancy())
+        return {
+            seat_id: round(table.price(state.seat_types.get(seat_id)) * surge, 2)
+            for seat_id in seat_ids
+        }
+
+    def invalidate_show(self, show_id: int):
+        with self._lock:
+            self._tables.pop(show_id, None)
+
+    def invalidate_movie(self, movie_id: int):
+        with self._lock:
+            for show_id in [show_id for show_id, table in self._tables.items() if table.movie_id == movie_id]:
+                del self._tables[show_id]
+
+# Shared per-process pricing engine used by the booking API
+pricing = PricingEngine(settings.PRICE_TABLE_TTL_SECONDS, settings.PRICE_TABLE_MAX_SHOWS)
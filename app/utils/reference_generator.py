@@ -0,0 +1,68 @@
+import os
+import threading
+import time
+from typing import Optional
+
+# Crockford base32: no I, L, O or U, so references are easy to read out over the phone
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# Custom epoch (2024-01-01 UTC) keeps the timestamp field short
+EPOCH_MS = 1704067200000
+
+TIMESTAMP_BITS = 42  # ~139 years of milliseconds
+NODE_BITS = 8        # host / deployment slot, from settings
+PID_BITS = 22        # Linux pid_max is at most 2**22, so live PIDs never collide on a host
+SEQUENCE_BITS = 16   # references per millisecond per process
+
+# 88 bits rounded up to 18 base32 characters
+REFERENCE_LENGTH = 18
+
+class BookingReferenceGenerator:
+    """
+    Snowflake-style booking reference generator.
+    A reference packs (timestamp, node id, process id, sequence) into one integer,
+    so it is unique by construction across worker processes and hosts without
+    any database lookup, retry or sleep.
+    """
+
+    def __init__(self, node_id: int = 0, prefix: str = "BK"):
+        if not 0 <= node_id < (1 << NODE_BITS):
+            raise ValueError(f"node_id must be between 0 and {(1 << NODE_BITS) - 1}")
+        self.node_id = node_id
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._last_ms = -1
+        self._sequence = 0
+
+    def next(self) -> str:
+        with self._lock:
+            pid = os.getpid()
+            if pid != self._pid:
+                # First call, or we were forked into a new worker: start a fresh sequence
+                self._pid = pid
+                self._last_ms = -1
+                self._sequence = 0
+
+            now_ms = int(time.time() * 1000) - EPOCH_MS
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                # Same millisecond, or the clock stepped backwards: keep counting on the last timestamp
+                self._sequence += 1
+                if self._sequence >> SEQUENCE_BITS:
+                    # Sequence exhausted; borrow the next millisecond instead of sleeping
+                    self._last_ms += 1
+                    self._sequence = 0
+
+            value = self._last_ms
+            value = (value << NODE_BITS) | self.node_id
+            value = (value << PID_BITS) | (pid & ((1 << PID_BITS) - 1))
+            value = (value << SEQUENCE_BITS) | self._sequence
+
+        chars = []
+        for _ in range(REFERENCE_LENGTH):
+            chars.append(ALPHABET[value & 31])
+            value >>= 5
+        return self.prefix + "".join(reversed(chars))
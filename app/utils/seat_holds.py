@@ -0,0 +1,207 @@
+import heapq
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, insert, text
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, is_sqlite
+from app.models import Booking, SeatHoldRecord, Show
+from app.utils.seat_index import ShowSeatState, seat_index
+
+class SeatHold:
+    """Seats reserved for one user while they complete payment."""
+
+    def __init__(self, token: str, show_id: int, user_id: int, seat_ids: List[int], ttl_seconds: float):
+        self.hold_token = token
+        self.show_id = show_id
+        self.user_id = user_id
+        self.seat_ids = seat_ids
+        self.deadline = time.monotonic() + ttl_seconds
+        self.expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        # False for a hold created by another process, whose seats this one never flagged
+        self.local = True
+
+class SeatHoldError(Exception):
+    """Raised when seats cannot be held because some are already booked or held."""
+
+    def __init__(self, seat_ids: List[int]):
+        self.seat_ids = seat_ids
+        super().__init__(f"Seats not available: {seat_ids}")
+
+def held_seats(db: Session, show_id: int, seat_ids: Iterable[int], exclude_token: Optional[str] = None) -> List[int]:
+    """Seats among seat_ids under a live hold in the seat_holds table, other than exclude_token's."""
+    query = db.query(SeatHoldRecord.seat_id).filter(
+        SeatHoldRecord.show_id == show_id,
+        SeatHoldRecord.seat_id.in_(list(seat_ids)),
+        SeatHoldRecord.expires_at > datetime.now(timezone.utc)
+    )
+    if exclude_token is not None:
+        query = query.filter(SeatHoldRecord.hold_token != exclude_token)
+    return sorted(seat_id for (seat_id,) in query.all())
+
+def delete_hold(db: Session, token: str):
+    """Delete a hold's rows in the caller's transaction, e.g. with the bookings confirming it."""
+    db.execute(delete(SeatHoldRecord.__table__).where(SeatHoldRecord.__table__.c.hold_token == token))
+
+class HoldManager:
+    """
+    Seat holds with TTL.
+    Every hold is written to the seat_holds table, which book_seats checks in the booking's
+    transaction, so held seats can't be booked by anyone else in any process. Held seats
+    are also flagged in this process's seat index so availability checks and
+    consecutive-seat search treat them as taken without a query; other processes only see
+    them when a booking is attempted. Expiry uses a min-heap of deadlines: expire() only
+    pops holds that are actually due, so the cost is proportional to the number of expired
+    holds, not the number of live ones.
+    """
+
+    def __init__(self):
+        self._holds: Dict[str, SeatHold] = {}
+        self._deadlines: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def create(self, db: Session, show_id: int, user_id: int, seat_ids: List[int], ttl_seconds: int) -> Optional[SeatHold]:
+        """Hold seats for a show. Returns None if the show doesn't exist."""
+        self.expire()
+
+        state = seat_index.get(db, show_id)
+        if state is None:
+            return None
+        return self.create_on(state, user_id, seat_ids, ttl_seconds)
+
+    def create_on(self, state: ShowSeatState, user_id: int, seat_ids: List[int], ttl_seconds: int) -> SeatHold:
+        """Hold seats on an already loaded seat state."""
+        unavailable = state.hold(seat_ids)
+        if unavailable:
+            raise SeatHoldError(unavailable)
+
+        hold = SeatHold(secrets.token_urlsafe(16), state.show_id, user_id, list(seat_ids), ttl_seconds)
+        try:
+            self._persist(hold)
+        except Exception:
+            state.release(seat_ids)
+            raise
+        seat_index.publish(state.show_id, "held", list(seat_ids))
+        with self._lock:
+            self._holds[hold.hold_token] = hold
+            heapq.heappush(self._deadlines, (hold.deadline, hold.hold_token))
+        return hold
+
+    def _persist(self, hold: SeatHold):
+        """
+        Write a hold's rows, raising SeatHoldError if another process holds or booked any of
+        its seats. The check and insert run with the show locked against booking writes.
+        """
+        db = SessionLocal()
+        try:
+            if is_sqlite:
+                db.execute(text("BEGIN IMMEDIATE"))
+            else:
+                db.query(Show.id).filter(Show.id == hold.show_id).with_for_update().first()
+            holds = SeatHoldRecord.__table__
+            db.execute(delete(holds).where(
+                holds.c.show_id == hold.show_id,
+                holds.c.expires_at <= datetime.now(timezone.utc)
+            ))
+            taken = set(held_seats(db, hold.show_id, hold.seat_ids))
+            taken.update(seat_id for (seat_id,) in db.query(Booking.seat_id).filter(
+                Booking.show_id == hold.show_id,
+                Booking.seat_id.in_(hold.seat_ids),
+                Booking.status == "confirmed"
+            ).all())
+            if taken:
+                db.rollback()
+                raise SeatHoldError(sorted(taken))
+            db.execute(insert(holds), [
+                {
+                    "hold_token": hold.hold_token,
+                    "show_id": hold.show_id,
+                    "seat_id": seat_id,
+                    "user_id": hold.user_id,
+                    "expires_at": hold.expires_at
+                }
+                for seat_id in hold.seat_ids
+            ])
+            db.commit()
+        finally:
+            db.close()
+
+    def _load(self, token: str) -> Optional[SeatHold]:
+        """A live hold created by another process, from its rows."""
+        db = SessionLocal()
+        try:
+            rows = db.query(SeatHoldRecord).filter(
+                SeatHoldRecord.hold_token == token,
+                SeatHoldRecord.expires_at > datetime.now(timezone.utc)
+            ).all()
+        finally:
+            db.close()
+        if not rows:
+            return None
+        expires_at = rows[0].expires_at
+        if expires_at.tzinfo is None:  # SQLite drops the offset; values are stored in UTC
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        hold = SeatHold(
+            token, rows[0].show_id, rows[0].user_id, [row.seat_id for row in rows],
+            (expires_at - datetime.now(timezone.utc)).total_seconds()
+        )
+        hold.local = False
+        return hold
+
+    def _forget(self, hold: SeatHold):
+        db = SessionLocal()
+        try:
+            delete_hold(db, hold.hold_token)
+            db.commit()
+        finally:
+            db.close()
+
+    def get(self, token: str) -> Optional[SeatHold]:
+        self.expire()
+        hold = self._holds.get(token)
+        return hold if hold is not None else self._load(token)
+
+    def take(self, token: str) -> Optional[SeatHold]:
+        """
+        Remove a live hold without freeing its seats, so they can be booked
+        by the holder (see book_seats' hold_token). The caller must call settle() once done.
+        """
+        self.expire()
+        with self._lock:
+            hold = self._holds.pop(token, None)
+        return hold if hold is not None else self._load(token)
+
+    def release(self, token: str) -> Optional[SeatHold]:
+        """Cancel a hold and make its seats available again."""
+        hold = self.take(token)
+        if hold is not None:
+            self.settle(hold)
+        return hold
+
+    def expire(self) -> int:
+        """Release every hold whose TTL has passed. Returns the number released."""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] <= now:
+                _, token = heapq.heappop(self._deadlines)
+                hold = self._holds.pop(token, None)
+                # Holds already confirmed or released leave stale heap entries behind
+                if hold is not None:
+                    expired.append(hold)
+        for hold in expired:
+            self.settle(hold)
+        return len(expired)
+
+    def settle(self, hold: SeatHold):
+        """Clear a hold's seats; any that were booked meanwhile stay taken through the booked bitmap."""
+        self._forget(hold)
+        state = seat_index.peek(hold.show_id)
+        if state is not None and hold.local:
+            state.release(hold.seat_ids)
+            seat_index.publish(hold.show_id, "released", hold.seat_ids)
+
+# Shared per-process hold manager used by the booking API
+seat_holds = HoldManager()
@@ -0,0 +1,480 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_
+from app.core.config import settings
+from app.models import Show, Booking
+from app.utils.hall_geometry import hall_geometry
+
+class FreeRunTree:
+    """
+    Segment tree over a line of cells that tracks runs of free cells.
+    Each node stores the free prefix, free suffix and longest free run of its range,
+    so point updates and "leftmost run of N free cells" queries are O(log n).
+    """
+
+    def __init__(self, free: List[bool]):
+        size = 1
+        while size < len(free):
+            size <<= 1
+        self.size = size
+        self.prefix = [0] * (2 * size)
+        self.suffix = [0] * (2 * size)
+        self.best = [0] * (2 * size)
+
+        for i, is_free in enumerate(free):
+            if is_free:
+                leaf = size + i
+                self.prefix[leaf] = self.suffix[leaf] = self.best[leaf] = 1
+        for node in range(size - 1, 0, -1):
+            self._pull(node)
+
+    def _pull(self, node: int):
+        left, right = 2 * node, 2 * node + 1
+        half = self.size >> node.bit_length()
+        self.prefix[node] = self.prefix[left] if self.prefix[left] < half else half + self.prefix[right]
+        self.suffix[node] = self.suffix[right] if self.suffix[right] < half else half + self.suffix[left]
+        self.best[node] = max(self.best[left], self.best[right], self.suffix[left] + self.prefix[right])
+
+    def set(self, index: int, is_free: bool):
+        node = self.size + index
+        value = 1 if is_free else 0
+        self.prefix[node] = self.suffix[node] = self.best[node] = value
+        node >>= 1
+        while node:
+            self._pull(node)
+            node >>= 1
+
+    def longest_run(self) -> int:
+        return self.best[1]
+
+    def find(self, length: int) -> int:
+        """Return the start index of the leftmost run of `length` free cells, or -1."""
+        if length <= 0 or self.best[1] < length:
+            return -1
+
+        node, start, span = 1, 0, self.size
+        while node < self.size:
+            half = span // 2
+            left, right = 2 * node, 2 * node + 1
+            if self.best[left] >= length:
+                node, span = left, half
+            elif self.suffix[left] + self.prefix[right] >= length:
+                return start + half - self.suffix[left]
+            else:
+                node, start, span = right, start + half, half
+        return start
+
+class ShowSeatState:
+    """
+    Seat occupancy for a single show.
+    Each row is a bitmap where bit N is set when seat number N in that row is booked;
+    a second set of bitmaps tracks seats temporarily held while a customer pays.
+    Seats are also laid out on a single line of cells (row by row, in seat number order,
+    with a blocked cell between rows and for missing seat numbers) backed by a
+    FreeRunTree, so adjacent free seats can be found without scanning the hall.
+    """
+
+    def __init__(self, show_id: int, hall_id: int, seats: Iterable[Tuple[int, int, int, str]]):
+        self.show_id = show_id
+        self.hall_id = hall_id
+        self.lock = threading.Lock()
+
+        # seat_id -> (row_number, seat_number)
+        self.positions: Dict[int, Tuple[int, int]] = {}
+        self.seat_types: Dict[int, str] = {}
+        # Show.seat_map_version this state reflects (highest version reported so far), and
+        # lower versions whose changes haven't been reported yet
+        self.version = 0
+        self.missing: Set[int] = set()
+        # Bumped on every booked/held change
+        self.changes = 0
+        # Encoded seat maps cached by app/utils/seat_map.py: encoding -> (changes, payload)
+        self.encoded: Dict[str, Tuple[int, dict]] = {}
+        # row_number -> bitmap of booked / held seat numbers
+        self.booked_rows: Dict[int, int] = {}
+        self.held_rows: Dict[int, int] = {}
+
+        for seat_id, row_number, seat_number, seat_type in seats:
+            self.positions[seat_id] = (row_number, seat_number)
+            self.seat_types[seat_id] = seat_type
+            self.booked_rows.setdefault(row_number, 0)
+            self.held_rows.setdefault(row_number, 0)
+
+        # Linear cell layout: cells[i] is a seat ID or None for a blocked cell
+        self.cells: List[Optional[int]] = []
+        self.cell_of: Dict[int, int] = {}
+        rows: Dict[int, Dict[int, int]] = {}
+        for seat_id, (row_number, seat_number) in self.positions.items():
+            rows.setdefault(row_number, {})[seat_number] = seat_id
+        for row_number in sorted(rows):
+            row_seats = rows[row_number]
+            if self.cells:
+                self.cells.append(None)
+            for seat_number in range(min(row_seats), max(row_seats) + 1):
+                seat_id = row_seats.get(seat_number)
+                if seat_id is not None:
+                    self.cell_of[seat_id] = len(self.cells)
+                self.cells.append(seat_id)
+
+        self.free_runs = FreeRunTree([seat_id is not None for seat_id in self.cells])
+
+    def _test(self, bitmaps: Dict[int, int], seat_id: int) -> bool:
+        position = self.positions.get(seat_id)
+        if position is None:
+            return False
+        row_number, seat_number = position
+        return bool((bitmaps[row_number] >> seat_number) & 1)
+
+    def _update(self, bitmaps: Dict[int, int], seat_ids: Iterable[int], value: bool):
+        """Set or clear seat bits and keep the free-run tree in step. Caller holds the lock."""
+        for seat_id in seat_ids:
+            position = self.positions.get(seat_id)
+            if position is None:
+                continue
+            row_number, seat_number = position
+            if value:
+                bitmaps[row_number] |= 1 << seat_number
+            else:
+                bitmaps[row_number] &= ~(1 << seat_number)
+            taken = (self.booked_rows[row_number] | self.held_rows[row_number]) >> seat_number & 1
+            self.free_runs.set(self.cell_of[seat_id], not taken)
+        self.changes += 1
+
+    def is_booked(self, seat_id: int) -> bool:
+        return self._test(self.booked_rows, seat_id)
+
+    def is_held(self, seat_id: int) -> bool:
+        return self._test(self.held_rows, seat_id)
+
+    def unavailable(self, seat_ids: Iterable[int]) -> List[int]:
+        """Return the subset of seat_ids that are already booked or held."""
+        return [
+            seat_id for seat_id in seat_ids
+            if self.is_booked(seat_id) or self.is_held(seat_id)
+        ]
+
+    def booked_count(self) -> int:
+        return sum(bitmap.bit_count() for bitmap in self.booked_rows.values())
+
+    def occupancy(self) -> float:
+        """Fraction of the hall's seats that are booked."""
+        if not self.positions:
+            return 0.0
+        return self.booked_count() / len(self.positions)
+
+    def find_block(self, num_seats: int) -> List[int]:
+        """Return the seat IDs of the first block of num_seats adjacent free seats in a row."""
+        with self.lock:
+            start = self.free_runs.find(num_seats)
+            if start < 0:
+                return []
+            return self.cells[start:start + num_seats]
+
+    def free_mask(self) -> List[int]:
+        """Per-cell free flags (1 = free seat), read straight from the free-run tree leaves."""
+        with self.lock:
+            start = self.free_runs.size
+            return self.free_runs.best[start:start + len(self.cells)]
+
+    def _map_key(self) -> str:
+        """
+        Names the seat map by what every process agrees on: Show.seat_map_version, plus a
+        digest of the held seats while there are any, as holds never reach the database.
+        Caller holds the lock.
+        """
+        held = [(row_number, bitmap) for row_number, bitmap in sorted(self.held_rows.items()) if bitmap]
+        if not held:
+            return str(self.version)
+        return f"{self.version}-{hashlib.blake2b(repr(held).encode(), digest_size=6).hexdigest()}"
+
+    def map_key(self) -> str:
+        with self.lock:
+            return self._map_key()
+
+    def availability(self) -> Tuple[int, str, List[int]]:
+        """
+        Return (changes, map key, flags) read atomically: one flag per seat in row-major
+        order, 1 when the seat is neither booked nor held.
+        """
+        with self.lock:
+            leaves = self.free_runs.size
+            free = self.free_runs.best
+            flags = [free[leaves + cell] for cell, seat_id in enumerate(self.cells) if seat_id is not None]
+            return self.changes, self._map_key(), flags
+
+    def free_runs_around(self, seat_ids: Iterable[int]) -> List[List[int]]:
+        """
+        Return [start_cell, length] for each distinct run of free cells containing one of seat_ids.
+        Only the cells of those runs are visited, never the whole hall.
+        """
+        with self.lock:
+            leaves = self.free_runs.size
+            free = self.free_runs.best
+            runs = []
+            covered = set()
+            for seat_id in seat_ids:
+                cell = self.cell_of.get(seat_id)
+                if cell is None or cell in covered or not free[leaves + cell]:
+                    continue
+                start = end = cell
+                while start > 0 and free[leaves + start - 1]:
+                    start -= 1
+                while end + 1 < len(self.cells) and free[leaves + end + 1]:
+                    end += 1
+                covered.update(range(start, end + 1))
+                runs.append([start, end - start + 1])
+            return sorted(runs)
+
+    def mark_booked(self, seat_ids: Iterable[int], version: Optional[int] = None):
+        with self.lock:
+            self._update(self.booked_rows, seat_ids, True)
+            self._advance(version)
+
+    def mark_free(self, seat_ids: Iterable[int], version: Optional[int] = None):
+        with self.lock:
+            self._update(self.booked_rows, seat_ids, False)
+            self._advance(version)
+
+    def reset_booked(self, seat_ids: Iterable[int], version: int):
+        """Replace the booked seats with a fresh snapshot from the database."""
+        with self.lock:
+            for row_number in self.booked_rows:
+                self.booked_rows[row_number] = 0
+            for seat_id in seat_ids:
+                position = self.positions.get(seat_id)
+                if position is not None:
+                    self.booked_rows[position[0]] |= 1 << position[1]
+            self.free_runs = FreeRunTree([
+                seat_id is not None and not self.is_booked(seat_id) and not self.is_held(seat_id)
+                for seat_id in self.cells
+            ])
+            self.changes += 1
+            self.missing = {missed for missed in self.missing if missed > version}
+            self._advance(version)
+
+    def _advance(self, version: Optional[int]):
+        # Commit callbacks can run out of order, so never move the version backwards;
+        # remember the versions skipped over until their changes arrive
+        if version is None:
+            return
+        if version > self.version:
+            self.missing.update(range(self.version + 1, version))
+            self.version = version
+        else:
+            self.missing.discard(version)
+
+    def hold(self, seat_ids: List[int]) -> List[int]:
+        """
+        Atomically hold seats if all of them are free.
+        Returns the seats that were unavailable; nothing is held unless that list is empty.
+        """
+        with self.lock:
+            unavailable = self.unavailable(seat_ids)
+            if not unavailable:
+                self._update(self.held_rows, seat_ids, True)
+            return unavailable
+
+    def release(self, seat_ids: Iterable[int]):
+        with self.lock:
+            self._update(self.held_rows, seat_ids, False)
+
+class SeatIndex:
+    """
+    Process-local cache of ShowSeatState objects, loaded lazily from the bookings table.
+    Callers must report every committed booking/cancellation via mark_booked/mark_free
+    and every seat layout change via invalidate_hall.
+    At most max_shows states are kept: the least recently used show without held seats
+    (or a reason to stay, see retain) is dropped first and reloaded on its next use.
+    """
+
+    def __init__(self, max_shows: int):
+        self.max_shows = max_shows
+        self._states: "OrderedDict[int, ShowSeatState]" = OrderedDict()
+        self._listeners: List[Callable[[int, str, List[int]], None]] = []
+        self._retainers: List[Callable[[int], bool]] = []
+        # show_id -> loads in progress, and an epoch bumped on every change notification
+        # while any are, so a load racing with a write is not cached
+        self._loading: Dict[int, int] = {}
+        self._epochs: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, show_id: int) -> Optional[ShowSeatState]:
+        """Return the seat state for a show, loading it on first use. None if the show doesn't exist."""
+        with self._lock:
+            state = self._states.get(show_id)
+            if state is not None:
+                self._states.move_to_end(show_id)
+                return state
+        return self._load(db, show_id)
+
+    def peek(self, show_id: int) -> Optional[ShowSeatState]:
+        """Return the cached seat state for a show without loading it."""
+        return self._states.get(show_id)
+
+    def get_many(self, db: Session, shows: Iterable[Tuple[int, int]]) -> Dict[int, ShowSeatState]:
+        """
+        Return seat states for many (show_id, hall_id) pairs, loading every missing
+        one with a single seats query and a single bookings query.
+        """
+        states: Dict[int, ShowSeatState] = {}
+        missing: Dict[int, int] = {}
+        with self._lock:
+            for show_id, hall_id in shows:
+                state = self._states.get(show_id)
+                if state is not None:
+                    self._states.move_to_end(show_id)
+                    states[show_id] = state
+                else:
+                    missing[show_id] = hall_id
+
+        if missing:
+            states.update(self._load_many(db, missing))
+        return states
+
+    def _load(self, db: Session, show_id: int) -> Optional[ShowSeatState]:
+        show = db.query(Show.hall_id).filter(Show.id == show_id).first()
+        if not show:
+            return None
+        return self._load_many(db, {show_id: show.hall_id})[show_id]
+
+    def _load_many(self, db: Session, hall_of_show: Dict[int, int]) -> Dict[int, ShowSeatState]:
+        with self._lock:
+            for show_id in hall_of_show:
+                self._loading[show_id] = self._loading.get(show_id, 0) + 1
+                self._epochs.setdefault(show_id, 0)
+            epochs = {show_id: self._epochs[show_id] for show_id in hall_of_show}
+        try:
+            return self._read_states(db, hall_of_show, epochs)
+        finally:
+            with self._lock:
+                for show_id in hall_of_show:
+                    self._loading[show_id] -= 1
+                    if not self._loading[show_id]:
+                        del self._loading[show_id]
+                        del self._epochs[show_id]
+
+    def _read_states(self, db: Session, hall_of_show: Dict[int, int], epochs: Dict[int, int]) -> Dict[int, ShowSeatState]:
+        geometries = hall_geometry.get_many(db, set(hall_of_show.values()))
+
+        versions = dict(db.query(Show.id, Show.seat_map_version).filter(Show.id.in_(hall_of_show.keys())).all())
+
+        booked_by_show: Dict[int, List[int]] = {show_id: [] for show_id in hall_of_show}
+        booked = db.query(Booking.show_id, Booking.seat_id).filter(
+            and_(
+                Booking.show_id.in_(hall_of_show.keys()),
+                Booking.status == "confirmed"
+            )
+        ).all()
+        for show_id, seat_id in booked:
+            booked_by_show[show_id].append(seat_id)
+
+        states: Dict[int, ShowSeatState] = {}
+        for show_id, hall_id in hall_of_show.items():
+            state = ShowSeatState(show_id, hall_id, geometries[hall_id].seats())
+            state.version = versions.get(show_id) or 0
+            state.mark_booked(booked_by_show[show_id])
+            with self._lock:
+                if self._epochs[show_id] != epochs[show_id]:
+                    # A write landed while we were loading; serve this copy but don't cache it
+                    states[show_id] = state
+                else:
+                    states[show_id] = self._states.setdefault(show_id, state)
+
+        for show_id in self._evict():
+            self.publish(show_id, "invalidated", [])
+        return states
+
+    def _evict(self) -> List[int]:
+        """Drop least recently used states beyond max_shows. Returns the dropped show IDs."""
+        evicted = []
+        with self._lock:
+            excess = len(self._states) - self.max_shows
+            if excess <= 0:
+                return evicted
+            for show_id, state in list(self._states.items()):
+                # Holds live only in the seat state, so a show with held seats must stay
+                if any(state.held_rows.values()) or any(retainer(show_id) for retainer in self._retainers):
+                    continue
+                del self._states[show_id]
+                evicted.append(show_id)
+                if len(evicted) == excess:
+                    break
+        return evicted
+
+    def _touch(self, show_id: int) -> Optional[ShowSeatState]:
+        with self._lock:
+            if show_id in self._epochs:
+                self._epochs[show_id] += 1
+            return self._states.get(show_id)
+
+    def mark_booked(self, show_id: int, seat_ids: Iterable[int], version: Optional[int] = None):
+        state = self._touch(show_id)
+        if state is not None:
+            seat_ids = list(seat_ids)
+            state.mark_booked(seat_ids, version)
+            self.publish(show_id, "booked", seat_ids)
+
+    def mark_free(self, show_id: int, seat_ids: Iterable[int], version: Optional[int] = None):
+        state = self._touch(show_id)
+        if state is not None:
+            seat_ids = list(seat_ids)
+            state.mark_free(seat_ids, version)
+            self.publish(show_id, "freed", seat_ids)
+
+    def refresh(self, db: Session, show_id: int):
+        """
+        Reload a cached show's booked seats and seat-map version from the database,
+        e.g. after a conditional write found that another worker changed the show.
+        """
+        state = self._touch(show_id)
+        if state is None:
+            return
+        version = db.query(Show.seat_map_version).filter(Show.id == show_id).scalar()
+        if version is None:
+            self.invalidate(show_id)
+            return
+        booked = db.query(Booking.seat_id).filter(
+            and_(
+                Booking.show_id == show_id,
+                Booking.status == "confirmed"
+            )
+        ).all()
+        state.reset_booked([seat_id for (seat_id,) in booked], version)
+        self.publish(show_id, "refreshed", [])
+
+    def subscribe(self, listener: Callable[[int, str, List[int]], None]):
+        """
+        Call listener(show_id, event, seat_ids) after seats of a cached show change state.
+        Events: booked, freed, held, released; refreshed and invalidated (with no seat_ids)
+        when the whole show was reloaded or dropped.
+        """
+        self._listeners.append(listener)
+
+    def retain(self, predicate: Callable[[int], bool]):
+        """
+        Never evict a show while predicate(show_id) is true, e.g. while a listener needs its
+        events: a show that isn't cached publishes none. Called with the index lock held.
+        """
+        self._retainers.append(predicate)
+
+    def publish(self, show_id: int, event: str, seat_ids: List[int]):
+        for listener in self._listeners:
+            listener(show_id, event, seat_ids)
+
+    def invalidate(self, show_id: int):
+        self._touch(show_id)
+        with self._lock:
+            self._states.pop(show_id, None)
+        self.publish(show_id, "invalidated", [])
+
+    def invalidate_hall(self, hall_id: int):
+        with self._lock:
+            show_ids = [show_id for show_id, state in self._states.items() if state.hall_id == hall_id]
+        for show_id in show_ids:
+            self.invalidate(show_id)
+
+# Shared per-process index used by the booking API
+seat_index = SeatIndex(settings.SEAT_INDEX_MAX_SHOWS)
@@ -0,0 +1,127 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, func, insert, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.seat import Seat
+from app.models.theater import Hall
+from app.utils.show_counters import adjust_hall_capacity
+
+seats_table = Seat.__table__
+halls_table = Hall.__table__
+
+def layout_spec(seats_per_row: Dict[int, int], aisle_seats: Optional[Iterable[int]] = None,
+                seat_type_bands: Iterable[dict] = ()) -> dict:
+    """
+    A hall layout spec as stored in Hall.layout_spec: seats per row, the seat numbers next
+    to an aisle (the same in every row, default LAYOUT_DEFAULT_AISLE_SEATS) and seat-type
+    bands of rows ({"first_row", "last_row", "seat_type"}; rows outside every band are standard).
+    """
+    return {
+        "seats_per_row": {str(row_number): count for row_number, count in sorted(seats_per_row.items())},
+        "aisle_seats": sorted(set(settings.LAYOUT_DEFAULT_AISLE_SEATS if aisle_seats is None else aisle_seats)),
+        "seat_type_bands": [dict(band) for band in seat_type_bands]
+    }
+
+def spec_seats(spec: dict) -> Iterator[Tuple[int, int, str, bool]]:
+    """(row_number, seat_number, seat_type, is_aisle) for every seat of a spec, in row-major order."""
+    aisles = set(spec["aisle_seats"])
+    for row_number in sorted(int(row) for row in spec["seats_per_row"]):
+        seat_type = "standard"
+        for band in spec["seat_type_bands"]:
+            if band["first_row"] <= row_number <= band["last_row"]:
+                seat_type = band["seat_type"]
+        for seat_number in range(1, spec["seats_per_row"][str(row_number)] + 1):
+            yield row_number, seat_number, seat_type, seat_number in aisles
+
+def spec_geometry(spec: dict) -> Optional[list]:
+    """
+    Derive (seat_id, row_number, seat_number, seat_type, is_aisle, created_at) for every seat
+    from a spec whose seats were inserted with consecutive IDs, without reading the seats table.
+    None if the spec doesn't record its seat IDs.
+    """
+    first_seat_id = spec.get("first_seat_id")
+    if first_seat_id is None:
+        return None
+    created_at = datetime.fromisoformat(spec["created_at"])
+    return [
+        (first_seat_id + offset, row_number, seat_number, seat_type, is_aisle, created_at)
+        for offset, (row_number, seat_number, seat_type, is_aisle) in enumerate(spec_seats(spec))
+    ]
+
+def layout_rows(hall_id: int, spec: dict) -> List[dict]:
+    """Seat rows to insert for a hall laid out from a spec, in row-major order."""
+    return [
+        {
+            "hall_id": hall_id,
+            "row_number": row_number,
+            "seat_number": seat_number,
+            "seat_type": seat_type,
+            "is_aisle": is_aisle
+        }
+        for row_number, seat_number, seat_type, is_aisle in spec_seats(spec)
+    ]
+
+def insert_seats(db: Session, rows: List[dict]) -> list:
+    """
+    Insert seats with one multi-row INSERT ... RETURNING (batched by the driver if needed)
+    and keep every affected show's hall_capacity in step, in the caller's transaction.
+    Returns the inserted seat rows in the order given.
+    """
+    if not rows:
+        return []
+    created = db.execute(
+        insert(seats_table).returning(*seats_table.c, sort_by_parameter_order=True),
+        rows
+    ).all()
+
+    added = defaultdict(int)
+    for row in rows:
+        added[row["hall_id"]] += 1
+    for hall_id, count in added.items():
+        adjust_hall_capacity(db, hall_id, count)
+    return created
+
+def create_layouts(db: Session, layouts: List[Tuple[int, List[dict], Optional[dict]]]) -> Dict[int, list]:
+    """
+    Insert the seats of several halls at once, given (hall_id, rows, spec) per hall, and
+    store each spec on its hall together with the new seats' first ID, so the hall's
+    geometry can later be derived from the spec alone. A hall that already had seats, or
+    whose seats didn't get consecutive IDs, keeps no spec (its seats rows are authoritative).
+    Runs in the caller's transaction. Returns the inserted seat rows per hall.
+    """
+    hall_ids = [hall_id for hall_id, _, _ in layouts]
+    had_seats = {
+        hall_id for (hall_id,) in db.query(Seat.hall_id).filter(Seat.hall_id.in_(hall_ids)).group_by(Seat.hall_id).all()
+    }
+    created = insert_seats(db, [row for _, rows, _ in layouts for row in rows])
+
+    by_hall: Dict[int, list] = {hall_id: [] for hall_id in hall_ids}
+    for seat in created:
+        by_hall[seat.hall_id].append(seat)
+
+    stored = []
+    for hall_id, _, spec in layouts:
+        seats = by_hall[hall_id]
+        derivable = (
+            spec is not None and seats and hall_id not in had_seats
+            and all(seat.id == seats[0].id + offset for offset, seat in enumerate(seats))
+            and len({seat.created_at for seat in seats}) == 1 and seats[0].created_at is not None
+        )
+        if derivable:
+            spec = {**spec, "first_seat_id": seats[0].id, "created_at": seats[0].created_at.isoformat()}
+        else:
+            spec = None
+        stored.append({"target_id": hall_id, "spec": spec})
+    db.execute(
+        update(halls_table)
+        .where(halls_table.c.id == bindparam("target_id"))
+        .values(layout_spec=bindparam("spec"), updated_at=func.now()),
+        stored
+    )
+    return by_hall
+
+def clear_layout_spec(db: Session, hall_id: int):
+    """Drop a hall's layout spec after a per-seat change, in the caller's transaction."""
+    db.execute(update(halls_table).where(halls_table.c.id == hall_id).values(layout_spec=None))
@@ -0,0 +1,80 @@
+import base64
+from typing import List, Optional
+from app.utils.seat_index import ShowSeatState
+
+SEAT_MAP_ENCODINGS = ("base64", "rle")
+
+def layout_runs(state: ShowSeatState) -> List[List[int]]:
+    """
+    Row geometry as [row_number, first_seat_id, first_seat_number, count] runs, one per
+    stretch of adjacent seats whose IDs are also consecutive; a freshly created row is a
+    single run. Expanding the runs in order gives the seats in row-major order.
+    """
+    runs: List[List[int]] = []
+    previous: Optional[int] = None
+    for seat_id in state.cells:
+        if seat_id is None:
+            previous = None
+            continue
+        row_number, seat_number = state.positions[seat_id]
+        if previous is not None and seat_id == previous + 1:
+            runs[-1][3] += 1
+        else:
+            runs.append([row_number, seat_id, seat_number, 1])
+        previous = seat_id
+    return runs
+
+def encode_bitset(flags: List[int]) -> str:
+    """Pack flags into bytes, first seat in the most significant bit, and base64 them."""
+    packed = bytearray((len(flags) + 7) // 8)
+    for index, flag in enumerate(flags):
+        if flag:
+            packed[index >> 3] |= 0x80 >> (index & 7)
+    return base64.b64encode(bytes(packed)).decode("ascii")
+
+def encode_runs(flags: List[int]) -> List[int]:
+    """Run lengths alternating available / unavailable, starting with available (possibly 0)."""
+    runs: List[int] = []
+    current, length = 1, 0
+    for flag in flags:
+        if flag == current:
+            length += 1
+        else:
+            runs.append(length)
+            current, length = flag, 1
+    runs.append(length)
+    return runs
+
+def seat_map_etag(state: ShowSeatState, encoding: str, map_key: Optional[str] = None) -> str:
+    """
+    Strong ETag for a show's seat map, built from the show and its seat_map_version (see
+    ShowSeatState.map_key), so every process serving the same map gives the same tag.
+    """
+    if map_key is None:
+        map_key = state.map_key()
+    return f'"{encoding}-{state.show_id}-{map_key}"'
+
+def encode_seat_map(state: ShowSeatState, encoding: str) -> dict:
+    """
+    The compact seat map of a show. Availability is one flag per seat in the order given
+    by `rows`, as a base64 bitset or as run lengths. The encoded map is cached on the
+    state until its seats change, so polling an unchanged show does no work.
+    """
+    cached = state.encoded.get(encoding)
+    if cached is not None and cached[0] == state.changes:
+        return cached[1]
+
+    changes, map_key, flags = state.availability()
+    payload = {
+        "show_id": state.show_id,
+        "hall_id": state.hall_id,
+        "version": state.version,
+        "etag": seat_map_etag(state, encoding, map_key),
+        "encoding": encoding,
+        "rows": layout_runs(state),
+        "total_seats": len(flags),
+        "available_seats": sum(flags),
+        "availability": encode_bitset(flags) if encoding == "base64" else encode_runs(flags)
+    }
+    state.encoded[encoding] = (changes, payload)
+    return payload
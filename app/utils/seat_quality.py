@@ -0,0 +1,97 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.utils.hall_geometry import hall_geometry
+from app.utils.seat_index import ShowSeatState
+
+class HallQualityMap:
+    """
+    Precomputed seat-quality scores for one hall, laid out on the same line of cells
+    as ShowSeatState (row by row, blocked cells between rows), so a show's free-cell
+    mask can be scored with a few vectorized NumPy operations.
+    """
+
+    def __init__(self, hall_id: int, cells: List[Optional[int]], positions: Dict[int, Tuple[int, int]],
+                 seat_attributes: Dict[int, Tuple[str, bool]]):
+        self.hall_id = hall_id
+        self.size = len(cells)
+
+        exists = np.array([seat_id is not None for seat_id in cells], dtype=bool)
+        row_numbers = np.array([positions[seat_id][0] if seat_id is not None else 0 for seat_id in cells], dtype=float)
+        seat_numbers = np.array([positions[seat_id][1] if seat_id is not None else 0 for seat_id in cells], dtype=float)
+        scores = np.zeros(self.size, dtype=float)
+
+        if exists.any():
+            # Centrality: 1.0 at the middle seat number of the hall, 0.0 at the side walls
+            low, high = seat_numbers[exists].min(), seat_numbers[exists].max()
+            center = (low + high) / 2
+            half_width = max((high - low) / 2, 1.0)
+            centrality = 1.0 - np.abs(seat_numbers - center) / half_width
+
+            # Row distance: rows are ranked from the screen; 1.0 at the ideal depth, 0.0 at the far end
+            rows = np.unique(row_numbers[exists])
+            row_rank = np.searchsorted(rows, row_numbers)
+            ideal = settings.SEAT_QUALITY_IDEAL_ROW_DEPTH * (len(rows) - 1)
+            span = max(ideal, len(rows) - 1 - ideal, 1.0)
+            depth = 1.0 - np.abs(row_rank - ideal) / span
+
+            scores = settings.SEAT_QUALITY_CENTER_WEIGHT * centrality + settings.SEAT_QUALITY_ROW_WEIGHT * depth
+
+            for index, seat_id in enumerate(cells):
+                if seat_id is None or seat_id not in seat_attributes:
+                    continue
+                seat_type, is_aisle = seat_attributes[seat_id]
+                scores[index] += settings.SEAT_QUALITY_TYPE_BONUS.get(seat_type, 0.0)
+                if is_aisle:
+                    scores[index] += settings.SEAT_QUALITY_AISLE_BONUS
+
+        self.scores = np.where(exists, scores, 0.0)
+
+    def best_block(self, free: np.ndarray, num_seats: int) -> int:
+        """Return the start cell of the highest-scoring run of num_seats free cells, or -1."""
+        if num_seats <= 0 or num_seats > self.size:
+            return -1
+
+        free_counts = np.concatenate(([0], np.cumsum(free)))
+        score_sums = np.concatenate(([0.0], np.cumsum(np.where(free, self.scores, 0.0))))
+
+        window_free = free_counts[num_seats:] - free_counts[:-num_seats]
+        window_scores = score_sums[num_seats:] - score_sums[:-num_seats]
+        # Blocked cells separate rows, so a window with every cell free never spans two rows
+        window_scores[window_free < num_seats] = -np.inf
+
+        start = int(np.argmax(window_scores))
+        if window_scores[start] == -np.inf:
+            return -1
+        return start
+
+class QualityMapCache:
+    """Process-local HallQualityMap per hall, rebuilt after invalidate() when seats change."""
+
+    def __init__(self):
+        self._maps: Dict[int, HallQualityMap] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, state: ShowSeatState) -> HallQualityMap:
+        quality_map = self._maps.get(state.hall_id)
+        if quality_map is not None and quality_map.size == len(state.cells):
+            return quality_map
+
+        geometry = hall_geometry.get(db, state.hall_id)
+        seat_attributes = {
+            seat_id: (geometry.seat_type(seat_id), geometry.is_aisle(seat_id))
+            for seat_id in geometry.seat_ids
+        }
+        quality_map = HallQualityMap(state.hall_id, state.cells, state.positions, seat_attributes)
+        with self._lock:
+            self._maps[state.hall_id] = quality_map
+        return quality_map
+
+    def invalidate(self, hall_id: int):
+        with self._lock:
+            self._maps.pop(hall_id, None)
+
+# Shared per-process cache used by best-available seat selection
+quality_maps = QualityMapCache()
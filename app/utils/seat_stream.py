@@ -0,0 +1,131 @@
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Optional, Set
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.utils.seat_holds import seat_holds
+from app.utils.seat_index import ShowSeatState, seat_index
+from app.utils.seat_map import encode_seat_map
+
+# Queued instead of a delta when a subscriber must be sent a fresh snapshot
+RESYNC = None
+
+def server_sent_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+def load_state(show_id: int) -> Optional[ShowSeatState]:
+    """Seat state for a show from the index, loading it with a short-lived session on a miss."""
+    state = seat_index.peek(show_id)
+    if state is not None:
+        return state
+    db = SessionLocal()
+    try:
+        return seat_index.get(db, show_id)
+    finally:
+        db.close()
+
+class SeatMapStream:
+    """
+    Pushes seat changes of a show to its server-sent-event subscribers.
+    Seat index events arrive on any thread; each is encoded once (with the current
+    availability of the seats it names, so out-of-order events can't mislead clients)
+    and fanned out on the event loop to per-subscriber queues. Nothing is read from the
+    database per subscriber. A subscriber whose queue overflows, or whose show was
+    reloaded or invalidated, gets a fresh snapshot instead of the missed deltas.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # show_id -> in-flight load, shared by every subscriber waiting for that show
+        self._loading: Dict[int, asyncio.Future] = {}
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    async def state(self, show_id: int) -> Optional[ShowSeatState]:
+        """Seat state for a show; a miss is loaded once in the threadpool however many subscribers wait."""
+        state = seat_index.peek(show_id)
+        if state is not None:
+            return state
+        pending = self._loading.get(show_id)
+        if pending is None:
+            pending = asyncio.ensure_future(run_in_threadpool(load_state, show_id))
+            self._loading[show_id] = pending
+            pending.add_done_callback(lambda _: self._loading.pop(show_id, None))
+        # Shielded so a disconnecting subscriber doesn't cancel the load for the others
+        return await asyncio.shield(pending)
+
+    def subscribe(self, show_id: int) -> asyncio.Queue:
+        """Register a subscriber queue. Must be called on the event loop."""
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(show_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, show_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(show_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[show_id]
+
+    def on_seats_changed(self, show_id: int, event: str, seat_ids: List[int]):
+        """Seat index listener; may run on any thread."""
+        loop = self._loop
+        if loop is None or show_id not in self._subscribers:
+            return
+
+        state = seat_index.peek(show_id)
+        if state is None or not seat_ids:
+            # The show was reloaded or dropped from the index; subscribers need a new snapshot
+            message = RESYNC
+        else:
+            unavailable = set(state.unavailable(seat_ids))
+            message = server_sent_event("seats", {
+                "show_id": show_id,
+                "event": event,
+                "version": state.version,
+                "available": [seat_id for seat_id in seat_ids if seat_id not in unavailable],
+                "unavailable": [seat_id for seat_id in seat_ids if seat_id in unavailable]
+            })
+        loop.call_soon_threadsafe(self._fan_out, show_id, message)
+
+    def _fan_out(self, show_id: int, message: Optional[bytes]):
+        for queue in list(self._subscribers.get(show_id, ())):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # A slow client: drop what it missed and resend the whole map
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+    async def events(self, show_id: int, queue: asyncio.Queue, state: ShowSeatState) -> AsyncIterator[bytes]:
+        """Snapshot, then deltas and heartbeats, until the client disconnects or the show is gone."""
+        try:
+            yield server_sent_event("snapshot", encode_seat_map(state, "base64"))
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), settings.SEAT_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Holds otherwise only expire when someone books; let idle streams see them go
+                    await run_in_threadpool(seat_holds.expire)
+                    yield b": ping\n\n"
+                    continue
+
+                if message is RESYNC:
+                    state = await self.state(show_id)
+                    if state is None:
+                        yield server_sent_event("closed", {"show_id": show_id})
+                        return
+                    message = server_sent_event("snapshot", encode_seat_map(state, "base64"))
+                yield message
+        finally:
+            self.unsubscribe(show_id, queue)
+
+# Shared per-process stream hub used by GET /shows/{show_id}/seatmap/stream
+seat_map_stream = SeatMapStream(settings.SEAT_STREAM_QUEUE_SIZE)
+seat_index.subscribe(seat_map_stream.on_seats_changed)
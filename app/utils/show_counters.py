@@ -0,0 +1,51 @@
+from typing import Dict, Iterable, Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.models import Show, Seat, Booking
+
+shows_table = Show.__table__
+
+def record_seat_change(db: Session, show_id: int, sold_delta: int, expected_version: Optional[int] = None) -> Optional[int]:
+    """
+    Record a change to a show's seat map in the caller's transaction: add sold_delta to
+    seats_sold and bump seat_map_version. With expected_version the update only applies
+    if the show is still at that version (an optimistic concurrency check).
+    Returns the new version, or None if the show changed meanwhile (or doesn't exist).
+    """
+    statement = update(shows_table).where(shows_table.c.id == show_id)
+    if expected_version is not None:
+        statement = statement.where(shows_table.c.seat_map_version == expected_version)
+    return db.execute(
+        statement.values(
+            seats_sold=shows_table.c.seats_sold + sold_delta,
+            seat_map_version=shows_table.c.seat_map_version + 1
+        ).returning(shows_table.c.seat_map_version)
+    ).scalar()
+
+def adjust_hall_capacity(db: Session, hall_id: int, delta: int):
+    """Add a delta to Show.hall_capacity for every show in a hall, in the caller's transaction."""
+    if not delta:
+        return
+    db.execute(
+        update(shows_table)
+        .where(shows_table.c.hall_id == hall_id)
+        .values(hall_capacity=shows_table.c.hall_capacity + delta)
+    )
+
+def hall_capacity(db: Session, hall_id: int) -> int:
+    return db.query(func.count(Seat.id)).filter(Seat.hall_id == hall_id).scalar() or 0
+
+def hall_capacities(db: Session, hall_ids: Iterable[int]) -> Dict[int, int]:
+    """Seat counts of many halls with one query (halls without seats are omitted)."""
+    return dict(
+        db.query(Seat.hall_id, func.count(Seat.id)).filter(Seat.hall_id.in_(set(hall_ids))).group_by(Seat.hall_id).all()
+    )
+
+def recount_show_counters(db: Session):
+    """Recompute seats_sold and hall_capacity for every show from the bookings and seats tables."""
+    sold = select(func.count(Booking.id)).where(
+        Booking.show_id == shows_table.c.id,
+        Booking.status == "confirmed"
+    ).scalar_subquery()
+    capacity = select(func.count(Seat.id)).where(Seat.hall_id == shows_table.c.hall_id).scalar_subquery()
+    db.execute(update(shows_table).values(seats_sold=sold, hall_capacity=capacity))
@@ -0,0 +1,260 @@
+import threading
+import time as clock
+from bisect import bisect_left, insort
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import Show
+
+DAY_MINUTES = 24 * 60
+
+def minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+def as_date(value: date) -> date:
+    """Show.show_date is stored as a midnight DateTime; schemas use plain dates."""
+    return value.date() if isinstance(value, datetime) else value
+
+def show_interval(start_time: time, end_time: time) -> Tuple[int, int]:
+    """
+    Minutes from midnight of the show date that a show occupies its hall, including the
+    cleaning buffer after it. A show ending at or before its start time runs past midnight.
+    """
+    start, end = minutes(start_time), minutes(end_time)
+    if end <= start:
+        end += DAY_MINUTES
+    return start, end + settings.SHOW_CLEANING_BUFFER_MINUTES
+
+class ShowConflictError(Exception):
+    """Raised when a show would overlap (with cleaning buffer) another show in the same hall."""
+
+    def __init__(self, show_ids: List[int], conflicts: Optional[List[dict]] = None):
+        self.show_ids = show_ids
+        # Per new show that conflicts, when several were scheduled at once
+        self.conflicts = conflicts or []
+        super().__init__(f"Hall is already booked by shows {show_ids}")
+
+class HallDaySchedule:
+    """
+    Occupied intervals of one hall on one day, in minutes from midnight, sorted by start.
+    Shows from the previous day that run past midnight appear with negative starts.
+    ends_max[i] is the latest end among the first i+1 intervals, so "does anything overlap
+    [start, end)" is one bisect plus a walk over the overlapping intervals only, even if
+    legacy data already contains overlaps.
+    """
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.intervals: List[Tuple[int, int, int]] = []  # (start, end, show_id)
+        self.ends_max: List[int] = []
+
+    def _rebuild_ends(self, index: int):
+        latest = self.ends_max[index - 1] if index else None
+        del self.ends_max[index:]
+        for _, end, _ in self.intervals[index:]:
+            latest = end if latest is None else max(latest, end)
+            self.ends_max.append(latest)
+
+    def conflicts(self, start: int, end: int, ignore: Optional[int] = None) -> List[int]:
+        """IDs of shows whose intervals overlap [start, end)."""
+        found = []
+        index = bisect_left(self.intervals, (end,)) - 1
+        while index >= 0 and self.ends_max[index] > start:
+            other_start, other_end, show_id = self.intervals[index]
+            if other_end > start and show_id != ignore:
+                found.append(show_id)
+            index -= 1
+        return found
+
+    def add(self, start: int, end: int, show_id: int):
+        interval = (start, end, show_id)
+        insort(self.intervals, interval)
+        self._rebuild_ends(self.intervals.index(interval))
+
+    def remove(self, show_id: int):
+        for index, interval in enumerate(self.intervals):
+            if interval[2] == show_id:
+                del self.intervals[index]
+                self._rebuild_ends(index)
+                return
+
+    def free_windows(self, open_at: int, close_at: int, duration: int) -> List[Tuple[int, int]]:
+        """Gaps within [open_at, close_at) where a show of `duration` minutes plus cleaning fits."""
+        windows = []
+        cursor = open_at
+        for start, end, _ in self.intervals:
+            if start > cursor:
+                windows.append((cursor, min(start, close_at)))
+            cursor = max(cursor, end)
+            if cursor >= close_at:
+                break
+        if cursor < close_at:
+            windows.append((cursor, close_at))
+        needed = duration + settings.SHOW_CLEANING_BUFFER_MINUTES
+        return [(start, end) for start, end in windows if end - start >= needed]
+
+class ShowSchedule:
+    """
+    Process-local interval index of active shows per (hall_id, show_date), loaded lazily
+    from the shows table. Entries expire after SHOW_SCHEDULE_TTL_SECONDS so shows
+    scheduled by other processes are picked up. Checks and updates hold one lock, so two
+    requests in this process can't both claim the same slot.
+    """
+
+    def __init__(self):
+        self._days: Dict[Tuple[int, date], HallDaySchedule] = {}
+        # show_id -> the loaded days it was placed in, so moving a show touches only those
+        self._placed: Dict[int, Set[Tuple[int, date]]] = {}
+        self._lock = threading.RLock()
+
+    def _day(self, db: Session, hall_id: int, show_date: date) -> HallDaySchedule:
+        """Caller holds the lock."""
+        key = (hall_id, as_date(show_date))
+        schedule = self._days.get(key)
+        if schedule is None or schedule.deadline <= clock.monotonic():
+            self._load(db, [key])
+            schedule = self._days[key]
+        return schedule
+
+    def _load(self, db: Session, keys: List[Tuple[int, date]]):
+        """(Re)load the schedules of (hall_id, date) days with one query. Caller holds the lock."""
+        deadline = clock.monotonic() + settings.SHOW_SCHEDULE_TTL_SECONDS
+        loaded = {key: HallDaySchedule(deadline) for key in keys}
+        dates = [show_date for _, show_date in loaded]
+        # Shows of the day before count too if they run past midnight
+        for show_id, hall_id, day, start_time, end_time in db.query(
+            Show.id, Show.hall_id, Show.show_date, Show.start_time, Show.end_time
+        ).filter(
+            Show.hall_id.in_({hall_id for hall_id, _ in loaded}),
+            Show.show_date >= datetime.combine(min(dates) - timedelta(days=1), time.min),
+            Show.show_date < datetime.combine(max(dates) + timedelta(days=1), time.min),
+            Show.status != "cancelled"
+        ).all():
+            for placed_on, start, end in self._placements(day, start_time, end_time):
+                schedule = loaded.get((hall_id, placed_on))
+                if schedule is not None:
+                    schedule.add(start, end, show_id)
+                    self._placed.setdefault(show_id, set()).add((hall_id, placed_on))
+        self._days.update(loaded)
+
+    def _placements(self, show_date: date, start_time: time, end_time: time) -> List[Tuple[date, int, int]]:
+        """The days whose schedules a show appears in, with its interval on each."""
+        show_date = as_date(show_date)
+        start, end = show_interval(start_time, end_time)
+        placements = [(show_date, start, end)]
+        if end > DAY_MINUTES:
+            placements.append((show_date + timedelta(days=1), start - DAY_MINUTES, end - DAY_MINUTES))
+        return placements
+
+    def conflicts(self, db: Session, hall_id: int, show_date: date, start_time: time, end_time: time,
+                  ignore: Optional[int] = None) -> List[int]:
+        """IDs of active shows in the hall that a show at this time would overlap."""
+        with self._lock:
+            found = []
+            for day, start, end in self._placements(show_date, start_time, end_time):
+                found.extend(self._day(db, hall_id, day).conflicts(start, end, ignore))
+            return sorted(set(found))
+
+    def claim(self, db: Session, hall_id: int, show_date: date, start_time: time, end_time: time, show_id: int):
+        """
+        Place a show in the index (moving it if it was already there), raising
+        ShowConflictError if it would overlap any other show. Call after the show is
+        flushed, before committing; discard it again if the commit fails.
+        """
+        with self._lock:
+            conflicting = self.conflicts(db, hall_id, show_date, start_time, end_time, ignore=show_id)
+            if conflicting:
+                raise ShowConflictError(conflicting)
+            self.discard(show_id)
+            for day, start, end in self._placements(show_date, start_time, end_time):
+                schedule = self._day(db, hall_id, day)
+                schedule.remove(show_id)  # present already if the day was just loaded
+                schedule.add(start, end, show_id)
+                self._placed.setdefault(show_id, set()).add((hall_id, day))
+
+    def schedule_many(self, db: Session, shows: List[Tuple[int, date, time, time]],
+                      insert: Callable[[], List[Tuple[int, int, date, time, time]]]):
+        """
+        Check new shows, given as (hall_id, show_date, start_time, end_time), against the
+        schedule and against each other, then call insert() to write them and place the
+        shows it returns as (show_id, hall_id, show_date, start_time, end_time), in any order.
+        Every day involved is loaded with one query. Raises ShowConflictError, without
+        calling insert(), if any show would overlap.
+        """
+        with self._lock:
+            placements = [
+                (hall_id, self._placements(show_date, start_time, end_time))
+                for hall_id, show_date, start_time, end_time in shows
+            ]
+            now = clock.monotonic()
+            stale = {
+                (hall_id, day) for hall_id, days in placements for day, _, _ in days
+                if (hall_id, day) not in self._days or self._days[(hall_id, day)].deadline <= now
+            }
+            if stale:
+                self._load(db, list(stale))
+
+            # New shows are placed under negative stand-in IDs so later ones are checked against them
+            conflicts = []
+            try:
+                for index, (hall_id, days) in enumerate(placements):
+                    found = set()
+                    for day, start, end in days:
+                        found.update(self._days[(hall_id, day)].conflicts(start, end))
+                    if found:
+                        hall_id, show_date, start_time, _ = shows[index]
+                        conflicts.append({
+                            "hall_id": hall_id,
+                            "show_date": as_date(show_date).isoformat(),
+                            "start_time": start_time.isoformat(),
+                            "conflicting_show_ids": sorted(show_id for show_id in found if show_id > 0),
+                            "overlaps_new_show": any(show_id < 0 for show_id in found)
+                        })
+                        continue
+                    for day, start, end in days:
+                        self._days[(hall_id, day)].add(start, end, -(index + 1))
+                if conflicts:
+                    existing = {show_id for conflict in conflicts for show_id in conflict["conflicting_show_ids"]}
+                    raise ShowConflictError(sorted(existing), conflicts)
+                created = insert()
+            finally:
+                for index, (hall_id, days) in enumerate(placements):
+                    for day, _, _ in days:
+                        self._days[(hall_id, day)].remove(-(index + 1))
+
+            for show_id, hall_id, show_date, start_time, end_time in created:
+                for day, start, end in self._placements(show_date, start_time, end_time):
+                    schedule = self._days.get((hall_id, day))
+                    if schedule is not None:
+                        schedule.add(start, end, show_id)
+                        self._placed.setdefault(show_id, set()).add((hall_id, day))
+
+    def discard(self, show_id: int):
+        """Remove a show from every loaded day, e.g. after it was cancelled, deleted or moved."""
+        with self._lock:
+            for key in self._placed.pop(show_id, ()):
+                schedule = self._days.get(key)
+                if schedule is not None:
+                    schedule.remove(show_id)
+
+    def forget(self, hall_id: int, show_date: date):
+        """Drop the loaded days around a show date so they are reloaded from the database."""
+        show_date = as_date(show_date)
+        with self._lock:
+            for offset in (-1, 0, 1):
+                self._days.pop((hall_id, show_date + timedelta(days=offset)), None)
+
+    def free_windows(self, db: Session, hall_id: int, show_date: date, duration_minutes: int,
+                     open_time: time, close_time: time) -> List[Tuple[time, time]]:
+        """Open windows in a hall on a day that fit a show of duration_minutes (plus cleaning)."""
+        close_at = minutes(close_time) if close_time > open_time else DAY_MINUTES
+        with self._lock:
+            windows = self._day(db, hall_id, show_date).free_windows(minutes(open_time), close_at, duration_minutes)
+        return [
+            (time(start // 60, start % 60), time(end // 60, end % 60) if end < DAY_MINUTES else time.max.replace(microsecond=0))
+            for start, end in windows
+        ]
+
+# Shared per-process schedule used by show creation and updates
+show_schedule = ShowSchedule()
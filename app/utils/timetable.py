@@ -0,0 +1,217 @@
+import hashlib
+import json
+import threading
+import time as clock
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import Show, Movie, Hall, Theater
+from app.utils.seat_index import seat_index
+
+def availability_badge(available: int, capacity: int) -> str:
+    if available <= 0:
+        return "sold_out"
+    if available <= capacity * settings.TIMETABLE_FILLING_FAST_RATIO:
+        return "filling_fast"
+    return "available"
+
+def timetable_query(db: Session):
+    """Active shows with their movie, hall and theater, in one joined query."""
+    return db.query(
+        Show.id, Show.movie_id, Show.hall_id, Show.show_date, Show.start_time, Show.end_time,
+        Show.hall_capacity, Show.seats_sold, Show.status,
+        Movie.title, Movie.genre, Movie.language, Movie.duration_minutes,
+        Hall.name.label("hall_name"), Theater.id.label("theater_id"), Theater.name.label("theater_name"),
+        Theater.address, Theater.city
+    ).join(Movie, Movie.id == Show.movie_id).join(Hall, Hall.id == Show.hall_id).join(Theater, Theater.id == Hall.theater_id)
+
+class CityTimetable:
+    """
+    The timetable of one city on one day: movie -> theater -> showtimes. Each movie's
+    entry is serialized separately and kept until one of its showtimes changes, so a
+    booking re-encodes one movie, not the city. Callers hold Timetable's lock.
+    """
+
+    def __init__(self, city: str, show_date: date, deadline: float):
+        self.city = city
+        self.show_date = show_date
+        self.deadline = deadline
+        # movie_id -> {"movie": {...}, "theaters": {theater_id: {"theater": {...}, "showtimes": {show_id: {...}}}}}
+        self.movies: Dict[int, dict] = {}
+        self.fragments: Dict[int, bytes] = {}  # movie_id -> encoded movie entry
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+
+    def put(self, row) -> Tuple[int, int]:
+        """Add or replace a show from a timetable_query row. Returns its (movie_id, theater_id)."""
+        movie = self.movies.setdefault(row.movie_id, {
+            "movie": {
+                "movie_id": row.movie_id,
+                "title": row.title,
+                "genre": row.genre,
+                "language": row.language,
+                "duration_minutes": row.duration_minutes
+            },
+            "theaters": {}
+        })
+        theater = movie["theaters"].setdefault(row.theater_id, {
+            "theater": {"theater_id": row.theater_id, "name": row.theater_name, "address": row.address},
+            "showtimes": {}
+        })
+        state = seat_index.peek(row.id)
+        capacity = len(state.positions) if state is not None else row.hall_capacity
+        available = capacity - state.booked_count() if state is not None else row.hall_capacity - row.seats_sold
+        theater["showtimes"][row.id] = {
+            "show_id": row.id,
+            "hall_id": row.hall_id,
+            "hall_name": row.hall_name,
+            "start_time": row.start_time.isoformat(),
+            "end_time": row.end_time.isoformat(),
+            "capacity": capacity,
+            "available_seats": available,
+            "badge": availability_badge(available, capacity)
+        }
+        self.changed(row.movie_id)
+        return row.movie_id, row.theater_id
+
+    def remove(self, show_id: int, movie_id: int, theater_id: int):
+        movie = self.movies[movie_id]
+        showtimes = movie["theaters"][theater_id]["showtimes"]
+        showtimes.pop(show_id, None)
+        if not showtimes:
+            del movie["theaters"][theater_id]
+        if not movie["theaters"]:
+            del self.movies[movie_id]
+        self.changed(movie_id)
+
+    def set_available(self, show_id: int, movie_id: int, theater_id: int, available: int):
+        showtime = self.movies[movie_id]["theaters"][theater_id]["showtimes"][show_id]
+        if showtime["available_seats"] != available:
+            showtime["available_seats"] = available
+            showtime["badge"] = availability_badge(available, showtime["capacity"])
+            self.changed(movie_id)
+
+    def changed(self, movie_id: int):
+        self.fragments.pop(movie_id, None)
+        self.body = None
+
+    def encode(self) -> Tuple[bytes, str]:
+        """The timetable as JSON bytes plus a strong ETag, re-encoding only changed movies."""
+        if self.body is None:
+            entries = []
+            for movie_id, movie in sorted(self.movies.items(), key=lambda item: (item[1]["movie"]["title"], item[0])):
+                fragment = self.fragments.get(movie_id)
+                if fragment is None:
+                    fragment = json.dumps({
+                        **movie["movie"],
+                        "theaters": [
+                            {
+                                **theater["theater"],
+                                "showtimes": sorted(theater["showtimes"].values(), key=lambda show: (show["start_time"], show["show_id"]))
+                            }
+                            for _, theater in sorted(movie["theaters"].items(), key=lambda item: (item[1]["theater"]["name"], item[0]))
+                        ]
+                    }, separators=(",", ":")).encode()
+                    self.fragments[movie_id] = fragment
+                entries.append(fragment)
+            header = json.dumps({"city": self.city, "date": self.show_date.isoformat()}, separators=(",", ":")).encode()
+            self.body = header[:-1] + b',"movies":[' + b",".join(entries) + b"]}"
+            self.etag = f'"{hashlib.blake2b(self.body, digest_size=8).hexdigest()}"'
+        return self.body, self.etag
+
+class Timetable:
+    """
+    Process-local "now showing" timetables per (city, date), built on first request with
+    one joined query and then kept up to date in place: show changes re-read just those
+    shows, and seat index events update availability without touching the database.
+    Entries expire after TIMETABLE_TTL_SECONDS so changes made by other processes show up.
+    """
+
+    def __init__(self):
+        self._cities: Dict[Tuple[str, date], CityTimetable] = {}
+        # show_id -> (city key, movie_id, theater_id) of every show in a built timetable
+        self._shows: Dict[int, Tuple[Tuple[str, date], int, int]] = {}
+        self._lock = threading.RLock()
+
+    def get(self, db: Session, city: str, show_date: date) -> Tuple[bytes, str]:
+        """Encoded timetable and ETag of a city on a day, building it if needed."""
+        key = (city.lower(), show_date)
+        with self._lock:
+            timetable = self._cities.get(key)
+            if timetable is None or timetable.deadline <= clock.monotonic():
+                timetable = self._build(db, key, city)
+            return timetable.encode()
+
+    def _build(self, db: Session, key: Tuple[str, date], city: str) -> CityTimetable:
+        """Caller holds the lock."""
+        now = clock.monotonic()
+        for stale_key in [stale for stale, timetable in self._cities.items() if timetable.deadline <= now]:
+            self._drop(stale_key)
+
+        rows = timetable_query(db).filter(
+            func.lower(Theater.city) == key[0],
+            Show.show_date >= datetime.combine(key[1], time.min),
+            Show.show_date < datetime.combine(key[1] + timedelta(days=1), time.min),
+            Show.status == "active"
+        ).all()
+        timetable = CityTimetable(rows[0].city if rows else city, key[1], now + settings.TIMETABLE_TTL_SECONDS)
+        for row in rows:
+            self._shows[row.id] = (key, *timetable.put(row))
+        self._cities[key] = timetable
+        return timetable
+
+    def _drop(self, key: Tuple[str, date]):
+        timetable = self._cities.pop(key)
+        for movie in timetable.movies.values():
+            for theater in movie["theaters"].values():
+                for show_id in theater["showtimes"]:
+                    self._shows.pop(show_id, None)
+
+    def _remove(self, show_id: int):
+        placed = self._shows.pop(show_id, None)
+        if placed is not None:
+            key, movie_id, theater_id = placed
+            self._cities[key].remove(show_id, movie_id, theater_id)
+
+    def shows_changed(self, db: Session, show_ids: Iterable[int]):
+        """Re-read shows that were created, rescheduled or cancelled, in built timetables only."""
+        show_ids = set(show_ids)
+        with self._lock:
+            if not self._cities:
+                return
+            for show_id in show_ids:
+                self._remove(show_id)
+            for row in timetable_query(db).filter(Show.id.in_(show_ids), Show.status == "active").all():
+                key = (row.city.lower(), row.show_date.date())
+                timetable = self._cities.get(key)
+                if timetable is not None:
+                    self._shows[row.id] = (key, *timetable.put(row))
+
+    def remove_show(self, show_id: int):
+        with self._lock:
+            self._remove(show_id)
+
+    def clear(self):
+        """Drop every timetable, e.g. after a movie, theater or hall was renamed or moved."""
+        with self._lock:
+            self._cities.clear()
+            self._shows.clear()
+
+    def on_seats_changed(self, show_id: int, event: str, seat_ids: List[int]):
+        """Seat index listener: refresh a listed show's availability from its seat state."""
+        if show_id not in self._shows or event not in ("booked", "freed", "refreshed"):
+            return
+        state = seat_index.peek(show_id)
+        if state is None:
+            return
+        with self._lock:
+            placed = self._shows.get(show_id)
+            if placed is not None:
+                key, movie_id, theater_id = placed
+                self._cities[key].set_available(show_id, movie_id, theater_id, len(state.positions) - state.booked_count())
+
+# Shared per-process timetables served by GET /shows/timetable
+timetable = Timetable()
+seat_index.subscribe(timetable.on_seats_changed)
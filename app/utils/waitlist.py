@@ -0,0 +1,187 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.utils.booking_utils import check_show_bookable
+from app.utils.seat_index import ShowSeatState, seat_index
+from app.utils.seat_holds import SeatHold, SeatHoldError, seat_holds
+
+class WaitlistEntry:
+    """A user waiting for num_seats adjacent seats in a sold-out show."""
+
+    def __init__(self, show_id: int, user_id: int, num_seats: int):
+        self.entry_id = secrets.token_urlsafe(12)
+        self.show_id = show_id
+        self.user_id = user_id
+        self.num_seats = num_seats
+        self.created_at = datetime.now(timezone.utc)
+        self.status = "waiting"  # waiting, offered
+        self.hold: Optional[SeatHold] = None
+
+    @property
+    def hold_token(self) -> Optional[str]:
+        return self.hold.hold_token if self.hold else None
+
+    @property
+    def seat_ids(self) -> Optional[List[int]]:
+        return self.hold.seat_ids if self.hold else None
+
+    @property
+    def expires_at(self) -> Optional[datetime]:
+        return self.hold.expires_at if self.hold else None
+
+class Waitlist:
+    """
+    Process-local FIFO waitlists per show.
+    Listens to the seat index: when a cancellation or an expired/released hold frees seats,
+    only the runs of free seats around those seats are matched against the queue, in join
+    order, and each entry that fits is offered a seat hold it can confirm like any other.
+    Entries too large for the freed runs keep their place in the queue. A new entry is
+    matched against every free run, so it never waits while a block that fits is free.
+    """
+
+    def __init__(self, offer_ttl_seconds: int):
+        self.offer_ttl_seconds = offer_ttl_seconds
+        self._queues: Dict[int, "OrderedDict[str, WaitlistEntry]"] = {}
+        self._entries: Dict[str, WaitlistEntry] = {}
+        # Offered entries in offer order (all offers share one TTL), pruned once their hold has lapsed
+        self._offered: "OrderedDict[str, WaitlistEntry]" = OrderedDict()
+        # Reentrant so a seat event published while the lock is held can't deadlock
+        self._lock = threading.RLock()
+
+    def join(self, db: Session, show_id: int, user_id: int, num_seats: int) -> Optional[WaitlistEntry]:
+        """
+        Add a user to a show's waitlist. Returns None if the show doesn't exist; raises
+        ShowNotBookable if it was cancelled or has started.
+        """
+        seat_holds.expire()
+        check_show_bookable(db, show_id)
+        state = seat_index.get(db, show_id)
+        if state is None:
+            return None
+
+        entry = WaitlistEntry(show_id, user_id, num_seats)
+        with self._lock:
+            self._prune()
+            self._entries[entry.entry_id] = entry
+            self._queues.setdefault(show_id, OrderedDict())[entry.entry_id] = entry
+            # Free blocks go to whoever is ahead first, then possibly to this entry
+            self._match(state, state.free_runs_around(state.positions))
+        return entry
+
+    def get(self, entry_id: str) -> Optional[WaitlistEntry]:
+        with self._lock:
+            self._prune()
+            return self._entries.get(entry_id)
+
+    def position(self, entry: WaitlistEntry) -> Optional[int]:
+        """1-based place in the show's queue, or None once seats were offered."""
+        with self._lock:
+            queue = self._queues.get(entry.show_id)
+            if entry.status != "waiting" or queue is None:
+                return None
+            for position, entry_id in enumerate(queue, start=1):
+                if entry_id == entry.entry_id:
+                    return position
+            return None
+
+    def drop_show(self, show_id: int):
+        """Forget a show's waitlist, releasing offered holds not yet confirmed, e.g. when it is cancelled."""
+        with self._lock:
+            dropped = [entry for entry in self._entries.values() if entry.show_id == show_id]
+            for entry in dropped:
+                del self._entries[entry.entry_id]
+                self._offered.pop(entry.entry_id, None)
+            self._queues.pop(show_id, None)
+        for entry in dropped:
+            if entry.hold is not None:
+                seat_holds.release(entry.hold.hold_token)
+
+    def leave(self, entry_id: str) -> Optional[WaitlistEntry]:
+        """Remove an entry, releasing its offered hold if it wasn't confirmed yet."""
+        with self._lock:
+            entry = self._entries.pop(entry_id, None)
+            if entry is None:
+                return None
+            self._dequeue(entry)
+            self._offered.pop(entry_id, None)
+        if entry.hold is not None:
+            seat_holds.release(entry.hold.hold_token)
+        return entry
+
+    def _dequeue(self, entry: WaitlistEntry):
+        queue = self._queues.get(entry.show_id)
+        if queue is not None:
+            queue.pop(entry.entry_id, None)
+            if not queue:
+                del self._queues[entry.show_id]
+
+    def _prune(self):
+        """Forget offered entries whose hold has been confirmed or has lapsed. Caller holds the lock."""
+        now = time.monotonic()
+        while self._offered:
+            entry = next(iter(self._offered.values()))
+            if entry.hold.deadline > now:
+                break
+            self._offered.popitem(last=False)
+            self._entries.pop(entry.entry_id, None)
+
+    def _offer(self, state: ShowSeatState, entry: WaitlistEntry, seat_ids: List[int]) -> bool:
+        """Hold seat_ids for an entry and take it off the queue. Caller holds the lock."""
+        if not seat_ids:
+            return False
+        try:
+            entry.hold = seat_holds.create_on(state, entry.user_id, seat_ids, self.offer_ttl_seconds)
+        except SeatHoldError:
+            return False
+        entry.status = "offered"
+        self._dequeue(entry)
+        self._offered[entry.entry_id] = entry
+        return True
+
+    def has_queue(self, show_id: int) -> bool:
+        """Whether anyone is waiting for seats of a show."""
+        return show_id in self._queues
+
+    def on_seats_changed(self, show_id: int, event: str, seat_ids: List[int]):
+        """Seat index listener: match newly freed seats against the show's queue."""
+        if event not in ("freed", "released") or show_id not in self._queues:
+            return
+        state = seat_index.peek(show_id)
+        if state is None:
+            return
+
+        with self._lock:
+            self._match(state, state.free_runs_around(seat_ids))
+
+    def _match(self, state: ShowSeatState, runs: List[List[int]]):
+        """Offer [start_cell, length] runs of free seats to waiting entries in join order. Caller holds the lock."""
+        queue = self._queues.get(state.show_id)
+        if not queue:
+            return
+        for entry in list(queue.values()):
+            if not runs:
+                break
+            if entry.status != "waiting":
+                continue
+            for run in runs:
+                start, length = run
+                if length < entry.num_seats:
+                    continue
+                if self._offer(state, entry, state.cells[start:start + entry.num_seats]):
+                    run[0] += entry.num_seats
+                    run[1] -= entry.num_seats
+                else:
+                    # Taken concurrently; don't offer this run again
+                    run[1] = 0
+                break
+            runs = [run for run in runs if run[1] > 0]
+
+# Shared per-process waitlist used by the booking API
+waitlist = Waitlist(settings.WAITLIST_OFFER_TTL_SECONDS)
+seat_index.subscribe(waitlist.on_seats_changed)
+seat_index.retain(waitlist.has_queue)
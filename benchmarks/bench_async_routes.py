@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sync vs async routes
+Fires the same requests at /api/v1/... (sync, threadpool) and /api/v1/aio/... (async engine)
+with N concurrent clients and reports requests per second for each path.
+
+Start the server with the async engine enabled first:
+    ASYNC_DATABASE_ENABLED=true python -m app.main
+
+Usage: python -m benchmarks.bench_async_routes [--url http://localhost:8000] [--clients 200] [--duration 10]
+Requires httpx.
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+import httpx
+
+API = "/api/v1"
+
+async def seed(client: httpx.AsyncClient, rows: int, seats_per_row: int) -> dict:
+    """Create a movie, theater, hall, layout, two shows and a user to benchmark against."""
+    movie = (await client.post(f"{API}/movies/", json={
+        "title": "Benchmark", "duration_minutes": 120, "base_price": 10.0
+    })).json()
+    theater = (await client.post(f"{API}/theaters/", json={
+        "name": "Benchmark Cinema", "address": "1 Load St", "city": "Benchmark"
+    })).json()
+    hall = (await client.post(f"{API}/halls/", json={
+        "name": "Bench Hall", "theater_id": theater["id"], "total_rows": rows
+    })).json()
+    await client.post(f"{API}/seats/layout/{hall['id']}", json={str(row): seats_per_row for row in range(1, rows + 1)})
+
+    show_date = (date.today() + timedelta(days=1)).isoformat()
+    shows = []
+    for start, end in (("10:00:00", "12:00:00"), ("14:00:00", "16:00:00")):
+        shows.append((await client.post(f"{API}/shows/", json={
+            "movie_id": movie["id"], "hall_id": hall["id"], "show_date": show_date,
+            "start_time": start, "end_time": end
+        })).json())
+
+    stamp = int(time.time())
+    user = (await client.post(f"{API}/users/", json={
+        "username": f"bench{stamp}", "email": f"bench{stamp}@example.com", "password": "benchmark"
+    })).json()
+    return {"hall_id": hall["id"], "show_ids": [show["id"] for show in shows], "user_id": user["id"]}
+
+async def run(client: httpx.AsyncClient, method: str, path: str, clients: int, duration: float) -> dict:
+    """Hammer one endpoint with `clients` concurrent loops for `duration` seconds."""
+    deadline = time.perf_counter() + duration
+    counts = {"ok": 0, "client_error": 0, "server_error": 0}
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            try:
+                response = await client.request(method, path)
+            except httpx.HTTPError:
+                counts["server_error"] += 1
+                continue
+            if response.status_code < 400:
+                counts["ok"] += 1
+            elif response.status_code < 500:
+                counts["client_error"] += 1
+            else:
+                counts["server_error"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    return {"rps": total / elapsed, **counts}
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint and path")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60.0) as client:
+        # A large hall so the booking runs don't sell out
+        data = await seed(client, rows=40, seats_per_row=50)
+
+        booking = "/bookings/group/consecutive?show_id={}&num_seats=1&user_id=" + str(data["user_id"])
+        # (name, method, sync path, async path); each path books into its own show
+        scenarios = [
+            ("show listing", "GET", f"{API}/shows/?limit=100", f"{API}/aio/shows/?limit=100"),
+            ("seat layout", "GET", f"{API}/seats/layout/{data['hall_id']}", f"{API}/aio/seats/layout/{data['hall_id']}"),
+            ("booking", "POST", API + booking.format(data["show_ids"][0]), f"{API}/aio" + booking.format(data["show_ids"][1])),
+        ]
+
+        print(f"{args.clients} concurrent clients, {args.duration:.0f}s per run\n")
+        print(f"{'scenario':<16} {'path':<6} {'req/s':>10} {'2xx':>8} {'4xx':>8} {'5xx':>8}")
+        for name, method, sync_path, async_path in scenarios:
+            for label, path in (("sync", sync_path), ("async", async_path)):
+                result = await run(client, method, path, args.clients, args.duration)
+                print(f"{name:<16} {label:<6} {result['rps']:>10.1f} {result['ok']:>8} "
+                      f"{result['client_error']:>8} {result['server_error']:>8}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: booking reference generation
+Compares the Snowflake-style generator with the previous
+generate_unique_booking_reference, which did a SELECT per attempt.
+
+Usage: python -m benchmarks.bench_booking_reference [--existing 50000] [--count 5000]
+"""
+
+import argparse
+import hashlib
+import random
+import time
+import uuid
+from multiprocessing import Pool
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.booking import Booking
+from app.utils.reference_generator import BookingReferenceGenerator
+
+def legacy_generate_unique_booking_reference(db) -> str:
+    """The previous implementation, kept here verbatim for comparison."""
+    max_attempts = 20
+    
+    for attempt in range(max_attempts):
+        if attempt > 0:
+            time.sleep(0.001)
+        
+        if attempt < 10:
+            unique_id = str(uuid.uuid4()).replace('-', '')[:12].upper()
+            timestamp = int(time.time() * 1000000)
+            random_chars = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=6))
+            reference = f"BK{timestamp}{unique_id}{random_chars}"
+        elif attempt < 15:
+            timestamp = int(time.time() * 1000000000)
+            random_chars = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=15))
+            reference = f"BK{timestamp}{random_chars}"
+        else:
+            timestamp = int(time.time() * 1000000000000)
+            random_chars = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=20))
+            reference = f"BK{timestamp}{random_chars}"
+        
+        existing = db.query(Booking).filter(Booking.booking_reference == reference).first()
+        if not existing:
+            return reference
+    
+    timestamp = int(time.time() * 1000000000000000)
+    random_data = str(uuid.uuid4()) + str(random.random()) + str(time.time())
+    hash_hex = hashlib.md5(random_data.encode()).hexdigest().upper()[:20]
+    return f"BK{timestamp}{hash_hex}"
+
+def make_session(existing: int):
+    """Create an in-memory database holding `existing` bookings."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    generator = BookingReferenceGenerator(node_id=255)
+    with engine.begin() as conn:
+        conn.execute(
+            Booking.__table__.insert(),
+            [
+                {
+                    "user_id": 1,
+                    "show_id": 1 + i // 400,
+                    "seat_id": 1 + i % 400,
+                    "booking_reference": generator.next(),
+                    "amount_paid": 10.0,
+                    "status": "confirmed"
+                }
+                for i in range(existing)
+            ]
+        )
+    return sessionmaker(bind=engine)()
+
+def generate_in_worker(count: int):
+    generator = BookingReferenceGenerator()
+    return [generator.next() for _ in range(count)]
+
+def report(name: str, count: int, elapsed: float):
+    print(f"{name:<42} {count / elapsed:>12,.0f} refs/s   {elapsed / count * 1e6:>8.2f} us/ref")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--existing", type=int, default=50000, help="bookings already in the table")
+    parser.add_argument("--count", type=int, default=5000, help="references to generate per run")
+    parser.add_argument("--workers", type=int, default=4, help="processes for the uniqueness check")
+    args = parser.parse_args()
+    
+    db = make_session(args.existing)
+    
+    start = time.perf_counter()
+    for _ in range(args.count):
+        legacy_generate_unique_booking_reference(db)
+    report("legacy (SELECT per reference)", args.count, time.perf_counter() - start)
+    
+    generator = BookingReferenceGenerator()
+    start = time.perf_counter()
+    for _ in range(args.count):
+        generator.next()
+    report("snowflake (no database)", args.count, time.perf_counter() - start)
+    
+    # Uniqueness across processes, as with several uvicorn workers
+    with Pool(args.workers) as pool:
+        batches = pool.map(generate_in_worker, [args.count] * args.workers)
+    references = [reference for batch in batches for reference in batch]
+    duplicates = len(references) - len(set(references))
+    print(f"\n{len(references):,} references from {args.workers} processes, {duplicates} duplicates")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Load test: flash sale on one show
+Seeds a hall and a show, then fires a fixed number of concurrent booking requests at it,
+a mix of /bookings/group/consecutive (the server picks the seats) and /bookings/group
+(the client picks a random block, so clients collide on popular seats). Reports throughput,
+latency percentiles, the status code mix and, after the run, any (show_id, seat_id) pair
+with more than one confirmed booking and whether Show.seats_sold matches the bookings.
+
+By default the app runs in-process (httpx ASGI transport) on a fresh SQLite file; pass
+--url to load-test a running server instead. Use --seed to replay the same request mix.
+
+Usage: python -m benchmarks.flash_sale [--url http://localhost:8000] [--requests 5000]
+       [--concurrency 200] [--rows 20] [--seats-per-row 25] [--consecutive-share 0.5] [--seed 1]
+Requires httpx.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+import httpx
+
+API = "/api/v1"
+
+async def seed(client: httpx.AsyncClient, rows: int, seats_per_row: int) -> dict:
+    """Create a movie, theater, hall, layout, show and user to sell out."""
+    movie = (await client.post(f"{API}/movies/", json={
+        "title": "Flash Sale", "duration_minutes": 120, "base_price": 10.0
+    })).json()
+    theater = (await client.post(f"{API}/theaters/", json={
+        "name": "Flash Sale Cinema", "address": "1 Load St", "city": "Benchmark"
+    })).json()
+    hall = (await client.post(f"{API}/halls/", json={
+        "name": "Flash Hall", "theater_id": theater["id"], "total_rows": rows
+    })).json()
+    seats = (await client.post(
+        f"{API}/seats/layout/{hall['id']}", json={str(row): seats_per_row for row in range(1, rows + 1)}
+    )).json()
+    show = (await client.post(f"{API}/shows/", json={
+        "movie_id": movie["id"], "hall_id": hall["id"],
+        "show_date": (date.today() + timedelta(days=1)).isoformat(),
+        "start_time": "20:00:00", "end_time": "22:00:00"
+    })).json()
+
+    stamp = int(time.time())
+    user = (await client.post(f"{API}/users/", json={
+        "username": f"flash{stamp}", "email": f"flash{stamp}@example.com", "password": "benchmark"
+    })).json()
+
+    seat_rows = {}
+    for seat in sorted(seats, key=lambda seat: (seat["row_number"], seat["seat_number"])):
+        seat_rows.setdefault(seat["row_number"], []).append(seat["id"])
+    return {"show_id": show["id"], "user_id": user["id"], "rows": list(seat_rows.values())}
+
+def build_requests(data: dict, count: int, consecutive_share: float, rng: random.Random) -> list:
+    """(kind, method, path, json body) for every request of the run, group sizes 1-4."""
+    requests = []
+    for _ in range(count):
+        size = rng.randint(1, 4)
+        if rng.random() < consecutive_share:
+            path = (f"{API}/bookings/group/consecutive?show_id={data['show_id']}"
+                    f"&num_seats={size}&user_id={data['user_id']}&mode={rng.choice(('first', 'best'))}")
+            requests.append(("consecutive", "POST", path, None))
+        else:
+            row = rng.choice(data["rows"])
+            start = rng.randrange(0, len(row) - size + 1)
+            body = {"show_id": data["show_id"], "user_id": data["user_id"], "seat_ids": row[start:start + size]}
+            requests.append(("group", "POST", f"{API}/bookings/group", body))
+    return requests
+
+async def fire(client: httpx.AsyncClient, requests: list, concurrency: int) -> tuple:
+    """Send every request with at most `concurrency` in flight; returns (results, elapsed seconds)."""
+    results = []
+    pending = iter(requests)
+
+    async def worker():
+        for kind, method, path, body in pending:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = "error"
+            results.append((kind, status, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def report(label: str, results: list, elapsed: float):
+    latencies = sorted(latency * 1000 for _, _, latency in results)
+    statuses = Counter(status for _, status, _ in results)
+    total = len(results) or 1
+    print(f"{label:<12} {len(results):>7} {len(results) / elapsed:>9.1f} "
+          f"{percentile(latencies, 0.50):>8.1f} {percentile(latencies, 0.95):>8.1f} {percentile(latencies, 0.99):>8.1f} "
+          f"{statuses[201]:>6} {statuses[400] / total:>6.1%} {statuses[409] / total:>6.1%} "
+          f"{sum(n for status, n in statuses.items() if status == 'error' or status >= 500) / total:>6.1%}")
+
+async def check(client: httpx.AsyncClient, data: dict) -> tuple:
+    """Return (double-booked pairs, confirmed bookings, Show.seats_sold) after the run."""
+    bookings = (await client.get(f"{API}/bookings/show/{data['show_id']}")).json()
+    confirmed = Counter(booking["seat_id"] for booking in bookings if booking["status"] == "confirmed")
+    doubled = sum(1 for n in confirmed.values() if n > 1)
+    show = (await client.get(f"{API}/shows/{data['show_id']}")).json()
+    return doubled, sum(confirmed.values()), show.get("seats_sold")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="load-test a running server instead of the app in-process")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--seats-per-row", type=int, default=25)
+    parser.add_argument("--consecutive-share", type=float, default=0.5,
+                        help="fraction of requests sent to /bookings/group/consecutive")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.url:
+        transport, base_url = None, args.url
+    else:
+        # Settings are read at import time, so point the app at a fresh database first
+        database = os.path.join(tempfile.mkdtemp(prefix="flash_sale_"), "flash_sale.db")
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{database}")
+        from app.main import app
+        transport, base_url = httpx.ASGITransport(app=app), "http://flash-sale"
+        print(f"in-process app on {os.environ['DATABASE_URL']}")
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=60.0) as client:
+        data = await seed(client, args.rows, args.seats_per_row)
+        requests = build_requests(data, args.requests, args.consecutive_share, random.Random(args.seed))
+        results, elapsed = await fire(client, requests, args.concurrency)
+        doubled, confirmed, seats_sold = await check(client, data)
+
+    capacity = args.rows * args.seats_per_row
+    print(f"{args.requests} requests, {args.concurrency} concurrent, {capacity} seats, {elapsed:.2f}s\n")
+    print(f"{'endpoint':<12} {'count':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'201':>6} {'400':>6} {'409':>6} {'5xx':>6}")
+    for kind in ("consecutive", "group"):
+        report(kind, [result for result in results if result[0] == kind], elapsed)
+    report("all", results, elapsed)
+
+    print(f"\nmean latency {statistics.fmean(latency for _, _, latency in results) * 1000:.1f} ms")
+    print(f"seats sold {confirmed}/{capacity} (Show.seats_sold={seats_sold})")
+    print(f"double-booked (show_id, seat_id) pairs: {doubled}")
+    if doubled or seats_sold != confirmed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
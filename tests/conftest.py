@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+import pytest
+
+# The app creates its tables at import time, so point it at a scratch database first
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("ASYNC_DATABASE_ENABLED", "true")
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+API = "/api/v1"
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+@pytest.fixture
+def show(client):
+    """A show in a fresh 2 x 10 hall, plus a user to book it."""
+    movie = client.post(f"{API}/movies/", json={
+        "title": "Test Movie", "duration_minutes": 120, "genre": "Drama", "language": "English", "base_price": 10.0
+    }).json()
+    theater = client.post(f"{API}/theaters/", json={"name": "Test Theater", "address": "Main St", "city": "Pune"}).json()
+    hall = client.post(f"{API}/halls/", json={"name": "Hall", "theater_id": theater["id"], "total_rows": 2}).json()
+    seats = client.post(f"{API}/seats/layout/{hall['id']}", json={"1": 10, "2": 10}).json()
+    show = client.post(f"{API}/shows/", json={
+        "movie_id": movie["id"], "hall_id": hall["id"], "show_date": "2099-01-01",
+        "start_time": "10:00:00", "end_time": "12:00:00"
+    }).json()
+    user = client.post(f"{API}/users/", json={
+        "username": f"user{show['id']}", "email": f"user{show['id']}@example.com", "password": "secret123", "full_name": "Test User"
+    }).json()
+    return {"show": show, "seats": seats, "user": user}
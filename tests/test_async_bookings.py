@@ -0,0 +1,115 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from app.api import bookings
+from app.main import app
+from app.utils import booking_utils
+from app.utils.booking_executor import booking_executor
+from app.utils.booking_utils import SeatMapVersionConflict
+
+API = "/api/v1"
+
+# Only guards against a hang; the tests assert ordering with events, not timings
+TIMEOUT = 10
+
+async def wait_for(event: threading.Event):
+    """Wait for a thread-safe event without blocking the event loop."""
+    assert await asyncio.get_running_loop().run_in_executor(None, event.wait, TIMEOUT)
+
+async def book_while_listing(show, booking_waits: threading.Event, listed: threading.Event):
+    """
+    Start an async booking, wait until it is stalled (booking_waits), then list shows on
+    the same event loop and let the booking finish. The listing can only be served if
+    the stalled booking left the loop free.
+    """
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        booking = asyncio.ensure_future(client.post(f"{API}/aio/bookings/group", json={
+            "show_id": show["show"]["id"], "seat_ids": [show["seats"][0]["id"]], "user_id": show["user"]["id"]
+        }))
+        await wait_for(booking_waits)
+        assert not booking.done()
+
+        listing = await asyncio.wait_for(client.get(f"{API}/aio/shows/hall/{show['show']['hall_id']}"), TIMEOUT)
+        listed.set()
+        return await asyncio.wait_for(booking, TIMEOUT), listing
+
+@pytest.mark.skipif(booking_executor is not None, reason="the booking executor never retries")
+def test_async_booking_retries_on_the_async_session_without_blocking(show, monkeypatch):
+    loop_threads, attempts = [], []
+    booking_waits, listed = threading.Event(), threading.Event()
+
+    book_seats = bookings.book_seats
+    def contended_book_seats(session, show_id, *args):
+        loop_threads.append(threading.get_ident())
+        attempts.append(show_id)
+        if len(attempts) == 1:
+            raise SeatMapVersionConflict(show_id)
+        return book_seats(session, show_id, *args)
+    monkeypatch.setattr(bookings, "book_seats", contended_book_seats)
+
+    async def backoff(attempt):
+        booking_waits.set()
+        await wait_for(listed)
+    monkeypatch.setattr(booking_utils, "seat_map_backoff_async", backoff)
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        booked, listing = await book_while_listing(show, booking_waits, listed)
+        return loop_thread, booked, listing
+
+    loop_thread, booked, listing = asyncio.run(scenario())
+    assert booked.status_code == 201, booked.text
+    assert listing.status_code == 200
+    assert len(attempts) == 2
+    # Both attempts ran on the AsyncSession (run_sync keeps them on the loop thread), not in the threadpool
+    assert loop_threads == [loop_thread, loop_thread]
+
+@pytest.mark.skipif(booking_executor is None, reason="needs BOOKING_EXECUTOR_ENABLED")
+def test_async_booking_awaits_the_booking_executor(show, monkeypatch):
+    booking_waits, listed = threading.Event(), threading.Event()
+    book_seats = bookings.book_seats
+    def slow_book_seats(session, show_id, *args):
+        # On the shard thread: hold the write until the listing was served
+        booking_waits.set()
+        assert listed.wait(TIMEOUT)
+        return book_seats(session, show_id, *args)
+    monkeypatch.setattr(bookings, "book_seats", slow_book_seats)
+
+    checked_on = []
+    validate_seats_in_same_show = bookings.validate_seats_in_same_show
+    def recording_validate(session, show_id, seat_ids):
+        checked_on.append(threading.get_ident())
+        return validate_seats_in_same_show(session, show_id, seat_ids)
+    monkeypatch.setattr(bookings, "validate_seats_in_same_show", recording_validate)
+
+    async def scenario():
+        return threading.get_ident(), await book_while_listing(show, booking_waits, listed)
+
+    loop_thread, (booked, listing) = asyncio.run(scenario())
+    assert booked.status_code == 201, booked.text
+    assert listing.status_code == 200
+    # The checks ran on the AsyncSession; only the write went to the shard
+    assert checked_on == [loop_thread]
+
+def test_async_booking_routes_book_and_replay(show):
+    show_id = show["show"]["id"]
+    body = {"show_id": show_id, "seat_ids": [show["seats"][0]["id"]], "user_id": show["user"]["id"]}
+    headers = {"Idempotency-Key": f"aio-{show_id}"}
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.post(f"{API}/aio/bookings/group", json=body, headers=headers)
+            replay = await client.post(f"{API}/aio/bookings/group", json=body, headers=headers)
+            consecutive = await client.post(f"{API}/aio/bookings/group/consecutive", params={
+                "show_id": show_id, "num_seats": 3, "user_id": show["user"]["id"]
+            })
+            return first, replay, consecutive
+
+    first, replay, consecutive = asyncio.run(scenario())
+    assert first.status_code == 201, first.text
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.json() == first.json()
+    assert consecutive.status_code == 201, consecutive.text
+    assert len(consecutive.json()) == 3
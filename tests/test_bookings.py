@@ -0,0 +1,22 @@
+API = "/api/v1"
+
+def test_booking_a_missing_show_is_not_found(client, show):
+    seat_id = show["seats"][0]["id"]
+    response = client.post(f"{API}/bookings/", params={"user_id": show["user"]["id"]}, json={
+        "show_id": 999999, "seat_id": seat_id
+    })
+    assert response.status_code == 404, response.text
+    assert response.json()["detail"] == "Show not found"
+
+    response = client.post(f"{API}/bookings/group", json={
+        "show_id": 999999, "seat_ids": [seat_id], "user_id": show["user"]["id"]
+    })
+    assert response.status_code == 404, response.text
+
+def test_booking_a_cancelled_show_conflicts(client, show):
+    show_id = show["show"]["id"]
+    assert client.post(f"{API}/shows/{show_id}/cancel").status_code == 200
+    response = client.post(f"{API}/bookings/", params={"user_id": show["user"]["id"]}, json={
+        "show_id": show_id, "seat_id": show["seats"][0]["id"]
+    })
+    assert response.status_code == 409, response.text
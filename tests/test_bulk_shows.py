@@ -0,0 +1,44 @@
+API = "/api/v1"
+
+def bulk(client, show, start_times, start_date="2099-01-01", end_date="2099-01-02"):
+    return client.post(f"{API}/shows/bulk", json={
+        "movie_ids": [show["show"]["movie_id"]], "hall_ids": [show["show"]["hall_id"]],
+        "start_times": start_times, "start_date": start_date, "end_date": end_date
+    })
+
+def shows_in_hall(client, show):
+    return client.get(f"{API}/shows/hall/{show['show']['hall_id']}").json()
+
+def test_bulk_schedule_overlapping_an_existing_show_creates_nothing(client, show):
+    # The fixture's 10:00-12:00 show is only on the first day
+    response = bulk(client, show, ["11:00:00"])
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"]["conflicts"] == [{
+        "hall_id": show["show"]["hall_id"], "show_date": "2099-01-01", "start_time": "11:00:00",
+        "conflicting_show_ids": [show["show"]["id"]], "overlaps_new_show": False
+    }]
+    assert len(shows_in_hall(client, show)) == 1
+
+def test_bulk_schedule_overlapping_itself_is_rejected(client, show):
+    # The movie runs two hours, so 14:00 and 15:00 collide on both days
+    response = bulk(client, show, ["14:00:00", "15:00:00"])
+    assert response.status_code == 409, response.text
+    conflicts = response.json()["detail"]["conflicts"]
+    assert [(conflict["show_date"], conflict["overlaps_new_show"]) for conflict in conflicts] == [
+        ("2099-01-01", True), ("2099-01-02", True)
+    ]
+    assert len(shows_in_hall(client, show)) == 1
+
+def test_bulk_schedule_is_created_and_then_blocks_itself(client, show):
+    response = bulk(client, show, ["17:00:00", "14:00:00"])
+    assert response.status_code == 201, response.text
+    assert response.json()["shows_created"] == 4
+    created = [show_id for first, last in response.json()["show_id_ranges"] for show_id in range(first, last + 1)]
+    assert len(created) == 4
+
+    response = bulk(client, show, ["14:00:00", "17:00:00"])
+    assert response.status_code == 409, response.text
+    assert sorted(
+        show_id for conflict in response.json()["detail"]["conflicts"] for show_id in conflict["conflicting_show_ids"]
+    ) == sorted(created)
+    assert len(shows_in_hall(client, show)) == 5
@@ -0,0 +1,17 @@
+API = "/api/v1"
+
+def test_bulk_cancel_counts_booking_named_by_id_and_reference_once(client, show):
+    response = client.post(f"{API}/bookings/group", json={
+        "show_id": show["show"]["id"], "seat_ids": [show["seats"][0]["id"]], "user_id": show["user"]["id"]
+    })
+    assert response.status_code == 201, response.text
+    booking = response.json()[0]
+
+    response = client.put(f"{API}/bookings/cancel", json={
+        "booking_ids": [booking["id"]], "booking_references": [booking["booking_reference"], "UNKNOWN"]
+    })
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["requested"] == 1
+    assert result["cancelled"] == 1
+    assert result["cancelled_booking_ids"] == [booking["id"]]
@@ -0,0 +1,74 @@
+import random
+
+from app.utils.seat_index import FreeRunTree, ShowSeatState
+
+def leftmost_run(free, length):
+    """Brute-force start of the leftmost run of `length` free cells, or -1."""
+    run = 0
+    for index, is_free in enumerate(free):
+        run = run + 1 if is_free else 0
+        if length > 0 and run == length:
+            return index - length + 1
+    return -1
+
+def longest_run(free):
+    best = run = 0
+    for is_free in free:
+        run = run + 1 if is_free else 0
+        best = max(best, run)
+    return best
+
+def test_free_run_tree_matches_a_linear_scan():
+    rng = random.Random(7)
+    for size in [1, 2, 3, 7, 8, 9, 31, 64, 100]:
+        free = [rng.random() < 0.7 for _ in range(size)]
+        tree = FreeRunTree(free)
+        for _ in range(200):
+            index = rng.randrange(size)
+            free[index] = rng.random() < 0.6
+            tree.set(index, free[index])
+            assert tree.longest_run() == longest_run(free)
+            for length in range(0, size + 2):
+                assert tree.find(length) == leftmost_run(free, length), (free, length)
+
+def first_free_block(seats, taken, num_seats):
+    """Brute-force first block of adjacent free seats in a row, rows and seat numbers ascending."""
+    rows = {}
+    for seat_id, row_number, seat_number, _ in seats:
+        rows.setdefault(row_number, {})[seat_number] = seat_id
+    for row_number in sorted(rows):
+        numbers = rows[row_number]
+        for first in range(min(numbers), max(numbers) - num_seats + 2):
+            block = [numbers.get(number) for number in range(first, first + num_seats)]
+            if all(seat_id is not None and seat_id not in taken for seat_id in block):
+                return block
+    return []
+
+def test_find_block_matches_a_linear_scan():
+    rng = random.Random(11)
+    seats = []
+    for row_number in range(1, 6):
+        # Rows of different lengths with an aisle or missing seat numbers
+        for seat_number in range(1, rng.randint(4, 14)):
+            if rng.random() < 0.9:
+                seats.append((len(seats) + 1, row_number, seat_number, "standard"))
+    state = ShowSeatState(1, 1, seats)
+    seat_ids = [seat[0] for seat in seats]
+    booked, held = set(), set()
+
+    for _ in range(300):
+        seat_id = rng.choice(seat_ids)
+        action = rng.randrange(4)
+        if action == 0 and seat_id not in held:
+            state.mark_booked([seat_id])
+            booked.add(seat_id)
+        elif action == 1:
+            state.mark_free([seat_id])
+            booked.discard(seat_id)
+        elif action == 2 and not state.hold([seat_id]):
+            held.add(seat_id)
+        elif action == 3 and seat_id in held:
+            state.release([seat_id])
+            held.discard(seat_id)
+        for num_seats in range(1, 15):
+            assert state.find_block(num_seats) == first_free_block(seats, booked | held, num_seats)
@@ -0,0 +1,27 @@
+from app.api import bookings
+from app.utils.booking_utils import SeatMapVersionConflict
+
+API = "/api/v1"
+
+def test_busy_seat_map_is_not_replayed_for_idempotency_key(client, show, monkeypatch):
+    show_id = show["show"]["id"]
+    body = {"show_id": show_id, "seat_ids": [show["seats"][0]["id"]], "user_id": show["user"]["id"]}
+    headers = {"Idempotency-Key": f"busy-{show_id}"}
+
+    execute_booking = bookings.execute_booking
+    def busy(db, show_id, write):
+        raise SeatMapVersionConflict(show_id)
+    monkeypatch.setattr(bookings, "execute_booking", busy)
+    response = client.post(f"{API}/bookings/group", json=body, headers=headers)
+    assert response.status_code == 409
+    assert "busy" in response.json()["detail"]
+
+    monkeypatch.setattr(bookings, "execute_booking", execute_booking)
+    response = client.post(f"{API}/bookings/group", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+    assert "Idempotent-Replayed" not in response.headers
+
+    replay = client.post(f"{API}/bookings/group", json=body, headers=headers)
+    assert replay.status_code == 201
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.json() == response.json()
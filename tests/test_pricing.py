@@ -0,0 +1,39 @@
+from app.api import bookings
+from app.core.database import SessionLocal
+from app.utils.pricing import PricingEngine
+
+API = "/api/v1"
+
+def test_price_tables_are_bounded_least_recently_used_first(client, show):
+    show_ids = [show["show"]["id"]]
+    for _ in range(2):
+        show_ids.append(client.post(f"{API}/shows/", json={
+            "movie_id": show["show"]["movie_id"], "hall_id": show["show"]["hall_id"], "show_date": "2099-01-02",
+            "start_time": f"{10 + 3 * len(show_ids)}:00:00", "end_time": f"{12 + 3 * len(show_ids)}:00:00"
+        }).json()["id"])
+
+    engine = PricingEngine(60, 2)
+    db = SessionLocal()
+    try:
+        first = engine.table(db, show_ids[0])
+        engine.table(db, show_ids[1])
+        assert engine.table(db, show_ids[0]) is first
+        engine.table(db, show_ids[2])
+    finally:
+        db.close()
+    assert list(engine._tables) == [show_ids[0], show_ids[2]]
+
+def test_booking_is_not_found_when_the_show_cannot_be_priced(client, show, monkeypatch):
+    # The show vanished between the seat checks and the quote
+    monkeypatch.setattr(bookings.pricing, "quote", lambda db, show_id, seat_ids: None)
+    seat_ids = [seat["id"] for seat in show["seats"][:2]]
+
+    response = client.post(f"{API}/bookings/", params={"user_id": show["user"]["id"]}, json={
+        "show_id": show["show"]["id"], "seat_id": seat_ids[0]
+    })
+    assert response.status_code == 404, response.text
+
+    response = client.post(f"{API}/bookings/group", json={
+        "show_id": show["show"]["id"], "seat_ids": seat_ids, "user_id": show["user"]["id"]
+    })
+    assert response.status_code == 404, response.text
@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+from app.utils import reference_generator
+from app.utils.reference_generator import ALPHABET, REFERENCE_LENGTH, BookingReferenceGenerator
+
+class FrozenClock:
+    """Stands in for the time module with a clock that only moves when told to."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def time(self) -> float:
+        return self.seconds
+
+def test_references_are_unique_across_threads():
+    generator = BookingReferenceGenerator(node_id=3)
+    batches = [[] for _ in range(8)]
+
+    def generate(batch):
+        for _ in range(2000):
+            batch.append(generator.next())
+
+    threads = [threading.Thread(target=generate, args=(batch,)) for batch in batches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    references = [reference for batch in batches for reference in batch]
+    assert len(set(references)) == len(references)
+    for reference in references:
+        assert reference.startswith("BK") and len(reference) == 2 + REFERENCE_LENGTH
+        assert set(reference[2:]) <= set(ALPHABET)
+    # Each thread sees its own references in increasing order
+    for batch in batches:
+        assert batch == sorted(batch)
+
+def test_references_keep_increasing_within_a_millisecond_and_when_the_clock_steps_back(monkeypatch):
+    clock = FrozenClock(1_800_000_000.0)
+    monkeypatch.setattr(reference_generator, "time", clock)
+    generator = BookingReferenceGenerator()
+
+    # More than one millisecond's worth of sequence numbers borrows the next millisecond
+    references = [generator.next() for _ in range((1 << reference_generator.SEQUENCE_BITS) + 10)]
+    clock.seconds -= 5
+    references += [generator.next() for _ in range(10)]
+    clock.seconds += 60
+    references += [generator.next() for _ in range(10)]
+
+    assert references == sorted(references)
+    assert len(set(references)) == len(references)
+
+def test_nodes_never_share_references(monkeypatch):
+    monkeypatch.setattr(reference_generator, "time", FrozenClock(1_800_000_000.0))
+    first, second = BookingReferenceGenerator(node_id=1), BookingReferenceGenerator(node_id=2)
+    assert not {first.next() for _ in range(100)} & {second.next() for _ in range(100)}
+
+def test_node_id_must_fit_its_field():
+    with pytest.raises(ValueError):
+        BookingReferenceGenerator(node_id=1 << reference_generator.NODE_BITS)
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+from app.api import bookings
+from app.core.database import SessionLocal
+from app.models import SeatHoldRecord
+from app.utils.seat_index import seat_index
+
+API = "/api/v1"
+
+def hold_seats(client, show, count=2):
+    response = client.post(f"{API}/bookings/holds", json={
+        "show_id": show["show"]["id"], "user_id": show["user"]["id"], "num_seats": count
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+def test_hold_cannot_be_confirmed_after_show_is_cancelled(client, show):
+    hold = hold_seats(client, show)
+    assert client.post(f"{API}/shows/{show['show']['id']}/cancel").status_code == 200
+
+    response = client.post(f"{API}/bookings/holds/{hold['hold_token']}/confirm")
+    assert response.status_code == 409, response.text
+    assert client.get(f"{API}/bookings/show/{show['show']['id']}").json() == []
+
+def test_hold_cannot_be_confirmed_after_show_started(client, show):
+    hold = hold_seats(client, show)
+    started = datetime.now() - timedelta(minutes=5)
+    assert client.put(f"{API}/shows/{show['show']['id']}", json={
+        "show_date": started.date().isoformat(), "start_time": started.time().replace(microsecond=0).isoformat(),
+        "end_time": "23:59:00"
+    }).status_code == 200
+
+    response = client.post(f"{API}/bookings/holds/{hold['hold_token']}/confirm")
+    assert response.status_code == 400, response.text
+
+def test_live_hold_is_confirmed(client, show):
+    hold = hold_seats(client, show)
+    response = client.post(f"{API}/bookings/holds/{hold['hold_token']}/confirm")
+    assert response.status_code == 201, response.text
+    assert sorted(booking["seat_id"] for booking in response.json()) == sorted(hold["seat_ids"])
+
+def hold_elsewhere(show, seat_ids, token):
+    """Write a hold the way another API process would, without this process's seat index knowing."""
+    db = SessionLocal()
+    try:
+        for seat_id in seat_ids:
+            db.add(SeatHoldRecord(
+                hold_token=token, show_id=show["show"]["id"], seat_id=seat_id, user_id=show["user"]["id"],
+                expires_at=datetime.now(timezone.utc) + timedelta(minutes=5)
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+def test_seats_held_in_another_process_cannot_be_booked_or_held(client, show):
+    seat_ids = [seat["id"] for seat in show["seats"][:2]]
+    hold_elsewhere(show, seat_ids, f"elsewhere{show['show']['id']}")
+
+    response = client.post(f"{API}/bookings/group", json={
+        "show_id": show["show"]["id"], "seat_ids": seat_ids, "user_id": show["user"]["id"]
+    })
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"]["unavailable_seats"] == sorted(seat_ids)
+
+    response = client.post(f"{API}/bookings/holds", json={
+        "show_id": show["show"]["id"], "user_id": show["user"]["id"], "seat_ids": seat_ids
+    })
+    assert response.status_code == 409, response.text
+    # The failed hold left nothing flagged here
+    assert not seat_index.peek(show["show"]["id"]).unavailable(seat_ids)
+
+def test_hold_taken_in_another_process_is_confirmed_here(client, show):
+    seat_ids = [seat["id"] for seat in show["seats"][:2]]
+    token = f"elsewhere{show['show']['id']}"
+    hold_elsewhere(show, seat_ids, token)
+
+    assert client.get(f"{API}/bookings/holds/{token}").json()["seat_ids"] == seat_ids
+    response = client.post(f"{API}/bookings/holds/{token}/confirm")
+    assert response.status_code == 201, response.text
+    assert client.get(f"{API}/bookings/holds/{token}").status_code == 404
+
+def test_check_passed_before_a_hold_does_not_book_held_seats(client, show, monkeypatch):
+    hold = hold_seats(client, show)
+    # A request that checked availability just before the hold was taken
+    monkeypatch.setattr(bookings, "check_seat_availability", lambda db, show_id, seat_ids: (True, []))
+    response = client.post(f"{API}/bookings/group", json={
+        "show_id": show["show"]["id"], "seat_ids": hold["seat_ids"], "user_id": show["user"]["id"]
+    })
+    assert response.status_code == 409, response.text
+
+    response = client.post(f"{API}/bookings/holds/{hold['hold_token']}/confirm")
+    assert response.status_code == 201, response.text
@@ -0,0 +1,49 @@
+from app.utils.seat_index import seat_index
+
+API = "/api/v1"
+
+def second_show(client, show):
+    response = client.post(f"{API}/shows/", json={
+        "movie_id": show["show"]["movie_id"], "hall_id": show["show"]["hall_id"], "show_date": "2099-01-01",
+        "start_time": "14:00:00", "end_time": "16:00:00"
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+def seat_map(client, show_id):
+    response = client.get(f"{API}/shows/{show_id}/seatmap", params={"encoding": "rle"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_least_recently_used_show_is_evicted_and_reloaded(client, show, monkeypatch):
+    monkeypatch.setattr(seat_index, "max_shows", 1)
+    show_id, other_id = show["show"]["id"], second_show(client, show)["id"]
+    response = client.post(f"{API}/bookings/group", json={
+        "show_id": show_id, "seat_ids": [show["seats"][0]["id"]], "user_id": show["user"]["id"]
+    })
+    assert response.status_code == 201, response.text
+
+    seat_map(client, other_id)
+    assert seat_index.peek(show_id) is None
+    assert seat_index.peek(other_id) is not None
+
+    assert seat_map(client, show_id)["available_seats"] == 19
+    assert seat_index.peek(other_id) is None
+
+def test_show_with_held_seats_is_not_evicted(client, show, monkeypatch):
+    monkeypatch.setattr(seat_index, "max_shows", 1)
+    show_id, other_id = show["show"]["id"], second_show(client, show)["id"]
+    response = client.post(f"{API}/bookings/holds", json={
+        "show_id": show_id, "user_id": show["user"]["id"], "num_seats": 2
+    })
+    assert response.status_code == 201, response.text
+
+    seat_map(client, other_id)
+    assert seat_index.peek(show_id) is not None
+    assert seat_map(client, show_id)["available_seats"] == 18
+
+def test_cancelled_show_is_dropped(client, show):
+    show_id = show["show"]["id"]
+    seat_map(client, show_id)
+    assert client.post(f"{API}/shows/{show_id}/cancel").status_code == 200
+    assert seat_index.peek(show_id) is None
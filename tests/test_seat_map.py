@@ -0,0 +1,62 @@
+from app.core.database import SessionLocal
+from app.models import Booking
+from app.utils.seat_index import SeatIndex
+from app.utils.seat_map import seat_map_etag
+from app.utils.show_counters import record_seat_change
+
+API = "/api/v1"
+
+def get_seat_map(client, show_id, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get(f"{API}/shows/{show_id}/seatmap", params={"encoding": "rle"}, headers=headers)
+
+def test_etag_is_the_same_in_every_process(client, show):
+    show_id = show["show"]["id"]
+    response = get_seat_map(client, show_id)
+    assert response.status_code == 200, response.text
+    etag = response.headers["ETag"]
+    assert etag == f'"rle-{show_id}-{response.json()["version"]}"'
+
+    # A second worker loads its own seat state from the database
+    db = SessionLocal()
+    try:
+        assert seat_map_etag(SeatIndex(10).get(db, show_id), "rle") == etag
+    finally:
+        db.close()
+    assert get_seat_map(client, show_id, etag).status_code == 304
+
+def test_booking_by_another_process_changes_the_etag(client, show):
+    show_id = show["show"]["id"]
+    etag = get_seat_map(client, show_id).headers["ETag"]
+
+    # Booked without this process's seat index hearing about it
+    db = SessionLocal()
+    try:
+        record_seat_change(db, show_id, 1)
+        db.add(Booking(
+            user_id=show["user"]["id"], show_id=show_id, seat_id=show["seats"][0]["id"],
+            booking_reference=f"ELSEWHERE{show_id}", amount_paid=10.0
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+    response = get_seat_map(client, show_id, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["available_seats"] == 19
+
+def test_held_seats_change_the_etag(client, show):
+    show_id = show["show"]["id"]
+    etag = get_seat_map(client, show_id).headers["ETag"]
+    hold = client.post(f"{API}/bookings/holds", json={
+        "show_id": show_id, "user_id": show["user"]["id"], "num_seats": 2
+    })
+    assert hold.status_code == 201, hold.text
+
+    response = get_seat_map(client, show_id, etag)
+    assert response.status_code == 200
+    assert response.json()["available_seats"] == 18
+
+    assert client.delete(f"{API}/bookings/holds/{hold.json()['hold_token']}").status_code == 204
+    assert get_seat_map(client, show_id, etag).status_code == 304
@@ -0,0 +1,77 @@
+import random
+
+from app.core.config import settings
+from app.utils.show_schedule import HallDaySchedule
+
+API = "/api/v1"
+
+def test_day_schedule_conflicts_match_a_linear_scan():
+    rng = random.Random(5)
+    schedule = HallDaySchedule(deadline=float("inf"))
+    intervals = {}
+    for show_id in range(1, 400):
+        if intervals and rng.random() < 0.3:
+            removed = rng.choice(list(intervals))
+            schedule.remove(removed)
+            del intervals[removed]
+        # Overlapping intervals too, as legacy data may contain them
+        start = rng.randrange(-120, 1440)
+        end = start + rng.randrange(1, 300)
+        schedule.add(start, end, show_id)
+        intervals[show_id] = (start, end)
+
+        start = rng.randrange(-120, 1440)
+        end = start + rng.randrange(1, 300)
+        expected = [other for other, (other_start, other_end) in intervals.items() if other_start < end and other_end > start]
+        assert sorted(schedule.conflicts(start, end)) == sorted(expected)
+
+def test_free_windows_match_a_minute_by_minute_scan():
+    rng = random.Random(9)
+    for _ in range(50):
+        schedule = HallDaySchedule(deadline=float("inf"))
+        taken = set()
+        for show_id in range(rng.randrange(8)):
+            start = rng.randrange(-60, 1440)
+            end = start + rng.randrange(30, 200)
+            schedule.add(start, end, show_id + 1)
+            taken.update(range(start, end))
+        open_at, close_at = rng.randrange(0, 720), rng.randrange(720, 1441)
+        duration = rng.randrange(30, 180)
+
+        expected, run_start = [], None
+        for minute in range(open_at, close_at + 1):
+            if minute < close_at and minute not in taken:
+                run_start = minute if run_start is None else run_start
+            elif run_start is not None:
+                if minute - run_start >= duration + settings.SHOW_CLEANING_BUFFER_MINUTES:
+                    expected.append((run_start, minute))
+                run_start = None
+        assert schedule.free_windows(open_at, close_at, duration) == expected
+
+def schedule_show(client, show, show_date, start_time, end_time):
+    return client.post(f"{API}/shows/", json={
+        "movie_id": show["show"]["movie_id"], "hall_id": show["show"]["hall_id"], "show_date": show_date,
+        "start_time": start_time, "end_time": end_time
+    })
+
+def test_overlapping_shows_in_a_hall_are_rejected(client, show):
+    # The fixture's show runs 10:00-12:00, then the hall is cleaned
+    response = schedule_show(client, show, "2099-01-01", "12:10:00", "13:00:00")
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"]["conflicting_show_ids"] == [show["show"]["id"]]
+    assert schedule_show(client, show, "2099-01-01", "12:15:00", "13:00:00").status_code == 201
+
+    # A late show runs into the next day
+    late = schedule_show(client, show, "2099-01-01", "23:00:00", "01:00:00")
+    assert late.status_code == 201, late.text
+    response = schedule_show(client, show, "2099-01-02", "00:30:00", "02:00:00")
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"]["conflicting_show_ids"] == [late.json()["id"]]
+
+def test_free_slots_skip_scheduled_shows_and_short_gaps(client, show):
+    response = client.get(f"{API}/halls/{show['show']['hall_id']}/free-slots", params={
+        "show_date": "2099-01-01", "duration_minutes": 60, "open_time": "09:00:00", "close_time": "23:00:00"
+    })
+    assert response.status_code == 200, response.text
+    # 09:00-10:00 can't fit an hour plus cleaning
+    assert response.json() == [{"start_time": "12:15:00", "end_time": "23:00:00"}]
@@ -0,0 +1,42 @@
+import base64
+
+API = "/api/v1"
+
+def test_search_pages_through_every_show_once_in_order(client, show):
+    movie_id, hall_id = show["show"]["movie_id"], show["show"]["hall_id"]
+    theater_id = client.get(f"{API}/halls/{hall_id}").json()["theater_id"]
+    other_hall = client.post(f"{API}/halls/", json={"name": "Hall 2", "theater_id": theater_id, "total_rows": 1}).json()
+    # Shows at the same date and time in two halls are ordered by ID
+    for show_date in ["2099-01-01", "2099-01-02"]:
+        for hall in [hall_id, other_hall["id"]]:
+            for start_time, end_time in [("14:00:00", "16:00:00"), ("18:00:00", "20:00:00")]:
+                response = client.post(f"{API}/shows/", json={
+                    "movie_id": movie_id, "hall_id": hall, "show_date": show_date,
+                    "start_time": start_time, "end_time": end_time
+                })
+                assert response.status_code == 201, response.text
+
+    everything = client.get(f"{API}/shows/search", params={"movie_id": movie_id, "limit": 200}).json()
+    assert everything["next_cursor"] is None
+    assert len(everything["shows"]) == 9
+    keys = [(row["show_date"], row["start_time"], row["id"]) for row in everything["shows"]]
+    assert keys == sorted(keys)
+
+    pages, cursor = [], None
+    while True:
+        params = {"movie_id": movie_id, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"{API}/shows/search", params=params).json()
+        pages.append([row["id"] for row in page["shows"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert [len(page) for page in pages] == [2, 2, 2, 2, 1]
+    assert [show_id for page in pages for show_id in page] == [row["id"] for row in everything["shows"]]
+
+def test_search_rejects_a_malformed_cursor(client, show):
+    for cursor in ["not a cursor", base64.urlsafe_b64encode(b"2099-01-01|10:00:00").decode(), "é"]:
+        response = client.get(f"{API}/shows/search", params={"cursor": cursor})
+        assert response.status_code == 400, (cursor, response.text)
+        assert response.json()["detail"] == "Invalid cursor"
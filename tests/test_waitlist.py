@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+API = "/api/v1"
+
+def book(client, show, seats):
+    response = client.post(f"{API}/bookings/group", json={
+        "show_id": show["show"]["id"], "seat_ids": [seat["id"] for seat in seats], "user_id": show["user"]["id"]
+    })
+    assert response.status_code == 201, response.text
+
+def join(client, show, num_seats):
+    return client.post(f"{API}/bookings/waitlist", json={
+        "show_id": show["show"]["id"], "user_id": show["user"]["id"], "num_seats": num_seats
+    })
+
+def test_cancelling_a_show_drops_its_waitlist(client, show):
+    book(client, show, show["seats"])
+    entry = join(client, show, 2)
+    assert entry.status_code == 201, entry.text
+    assert entry.json()["status"] == "waiting"
+
+    assert client.post(f"{API}/shows/{show['show']['id']}/cancel").status_code == 200
+    assert client.get(f"{API}/bookings/waitlist/{entry.json()['entry_id']}").status_code == 404
+
+def test_cannot_join_waitlist_of_cancelled_show(client, show):
+    assert client.post(f"{API}/shows/{show['show']['id']}/cancel").status_code == 200
+    assert join(client, show, 2).status_code == 409
+
+def test_cannot_join_waitlist_of_started_show(client, show):
+    started = datetime.now() - timedelta(minutes=5)
+    assert client.put(f"{API}/shows/{show['show']['id']}", json={
+        "show_date": started.date().isoformat(), "start_time": started.time().replace(microsecond=0).isoformat(),
+        "end_time": "23:59:00"
+    }).status_code == 200
+    assert join(client, show, 2).status_code == 400
+
+def test_new_entry_is_offered_a_free_block_behind_a_larger_request(client, show):
+    book(client, show, show["seats"][2:])
+    ahead = join(client, show, 4)
+    assert ahead.json()["status"] == "waiting"
+
+    entry = join(client, show, 2)
+    assert entry.status_code == 201, entry.text
+    assert entry.json()["status"] == "offered"
+    assert sorted(entry.json()["seat_ids"]) == sorted(seat["id"] for seat in show["seats"][:2])
+    assert client.get(f"{API}/bookings/waitlist/{ahead.json()['entry_id']}").json()["position"] == 1